@@ -0,0 +1,77 @@
+# Arquivo: backend/walkie_backend/benchmarks/bench_serialization.py
+# Compara to_dict() + jsonify com o plano compilado + fast_jsonify
+# para respostas com N passeios (com route_data).
+#   python benchmarks/bench_serialization.py --walks 1000
+import argparse
+import json
+import os
+import random
+import sys
+import timeit
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ.setdefault('DATABASE_URL', 'sqlite://')
+os.environ.setdefault('SECRET_KEY', 'walkie-local-benchmarks-secret-key-0000')
+os.environ.setdefault('STUCK_WALK_SWEEP_INTERVAL', '0')
+os.environ['SCHEDULER_AUTOSTART'] = 'false'
+
+
+def build_walks(n, points_per_route=300, seed=7):
+    from src.models.models import Walk
+    rng = random.Random(seed)
+    walks = []
+    start = datetime(2025, 1, 1)
+    for i in range(n):
+        route = [{'lat': -23.55 + rng.random() / 100, 'lng': -46.63 + rng.random() / 100}
+                 for _ in range(points_per_route)]
+        walks.append(Walk(
+            id=i + 1, start_time=start + timedelta(hours=i), end_time=start + timedelta(hours=i, minutes=40),
+            duration=2400, distance=rng.uniform(500, 6000), calories=rng.randint(50, 400),
+            average_pace=rng.uniform(8, 16), route_data=json.dumps(route), feedback=None,
+            points_earned=rng.randint(10, 90), user_id=1, pet_id=1, created_at=start + timedelta(hours=i)
+        ))
+    return walks
+
+
+def run(n_walks=1000, repeat=5):
+    """Retorna {nome: segundos por resposta} para cada caminho de serialização."""
+    from src.main import app
+    from flask import jsonify
+    from src.models.models import Walk
+    from src.utils.serializers import serializer_for, fast_jsonify
+
+    walks = build_walks(n_walks)
+    serializer = serializer_for(Walk)
+    rows = [serializer._getter(walk) for walk in walks]
+
+    results = {}
+    with app.test_request_context():
+        baseline = jsonify({'walks': [w.to_dict() for w in walks]}).get_data()
+        fast = fast_jsonify({'walks': serializer.rows(rows)}).get_data()
+        assert baseline == fast, 'saída do serializador rápido difere do jsonify'
+
+        cases = {
+            'to_dict+jsonify': lambda: jsonify({'walks': [w.to_dict() for w in walks]}).get_data(),
+            'plan+fast_jsonify': lambda: fast_jsonify({'walks': serializer.rows(rows)}).get_data(),
+        }
+        for name, func in cases.items():
+            results[name] = min(timeit.repeat(func, number=1, repeat=repeat))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--walks', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    results = run(args.walks, args.repeat)
+    for name, seconds in results.items():
+        print(f"{name:20} {seconds * 1000:8.2f} ms / resposta ({args.walks} passeios)")
+    baseline, fast = results['to_dict+jsonify'], results['plan+fast_jsonify']
+    print(f"ganho: {baseline / fast:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
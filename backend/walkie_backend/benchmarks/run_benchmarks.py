@@ -0,0 +1,250 @@
+# Arquivo: backend/walkie_backend/benchmarks/run_benchmarks.py
+# Suíte de benchmarks dos caminhos quentes da API, em SQLite com dados sintéticos.
+#   python benchmarks/run_benchmarks.py                          # roda e imprime
+#   python benchmarks/run_benchmarks.py --save benchmarks/baselines/local.json
+#   python benchmarks/run_benchmarks.py --compare benchmarks/baselines/local.json
+#   python benchmarks/run_benchmarks.py --sizes 10000,100000,1000000 --only ranking
+# Micro: calculate_distance, distância da rota por número de pontos, Walk.to_dict.
+# Macro (uma vez por tamanho de base em --sizes): finish_walk de ponta a ponta,
+# check_and_award_badges com históricos grandes, get_ranking em todos os períodos
+# (global e local) e get_dashboard.
+# --compare sai com código 1 se algum caso regredir mais que --threshold.
+import argparse
+import fnmatch
+import json
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+from suite import (BENCHMARKS, Dataset, benchmark, compare, drain_jobs, load_baseline, measure,
+                   save_baseline)
+
+DEFAULT_SIZES = '10000,100000'
+ROUTE_SIZES = (100, 1000, 10000)
+RANKING_PERIODS = ('weekly', 'monthly', 'all_time')
+
+
+def make_route(points, seed=1):
+    """Rota de caminhada: passos de ~5 m com pequenas curvas, um ponto por segundo."""
+    import random
+    rng = random.Random(seed)
+    lat, lng = -23.55, -46.63
+    start = datetime(2025, 1, 1, 8, 0)
+    route = []
+    for i in range(points):
+        lat += rng.uniform(-1, 3) * 1.5e-5
+        lng += rng.uniform(-1, 3) * 1.5e-5
+        route.append({'lat': lat, 'lng': lng,
+                      'timestamp': (start + timedelta(seconds=i)).isoformat() + 'Z'})
+    return route
+
+
+class Context:
+    """O que os casos precisam: app, cliente de teste, base e cabeçalhos do usuário principal."""
+
+    def __init__(self, app, dataset, repeat):
+        from endpoint_scenarios import auth_headers
+        self.app = app
+        self.client = app.test_client()
+        self.dataset = dataset
+        self.repeat = repeat
+        self.headers = auth_headers(dataset.main_user_id)
+
+    def get(self, url):
+        response = self.client.get(url, headers=self.headers)
+        assert response.status_code == 200, f'{url} respondeu HTTP {response.status_code}'
+        return response
+
+
+# --- Micro ---
+
+@benchmark('calculate_distance')
+def bench_calculate_distance(ctx):
+    from src.routes.walks import calculate_distance
+    return {'': measure(lambda: calculate_distance(-23.55, -46.63, -23.551, -46.631),
+                        repeat=ctx.repeat, number=10000)}
+
+
+@benchmark('route_distance')
+def bench_route_distance(ctx):
+    from src.routes.walks import calculate_route_distance
+    results = {}
+    for points in ROUTE_SIZES:
+        route = make_route(points)
+        results[f'points={points}'] = measure(lambda: calculate_route_distance(route),
+                                              repeat=ctx.repeat, number=max(1, 10000 // points))
+    return results
+
+
+@benchmark('walk_to_dict')
+def bench_walk_to_dict(ctx):
+    from src.models.models import Walk
+    from src.services.walk_analytics import compute_walk_analytics, dumps_analytics
+    route = make_route(300)
+    start, end = datetime(2025, 1, 1, 8, 0), datetime(2025, 1, 1, 8, 5)
+    walk = Walk(id=1, start_time=start, end_time=end, duration=300, distance=1500.0, calories=80,
+                average_pace=12.5, route_data=json.dumps(route), points_earned=20, user_id=1, pet_id=1,
+                created_at=start, analytics=dumps_analytics(compute_walk_analytics(route, start, end)))
+    return {'route=300': measure(walk.to_dict, repeat=ctx.repeat, number=1000)}
+
+
+# --- Macro ---
+
+@benchmark('finish_walk', group='macro', dataset=True)
+def bench_finish_walk(ctx):
+    from src.models.models import db, Walk
+    client, headers = ctx.client, ctx.headers
+    body = {'route_data': make_route(1800)}  # 30 minutos, um ponto por segundo
+
+    def start_walk():
+        drain_jobs()  # badges e mapa de calor da finalização anterior
+        response = client.post('/api/walks/start', json={'pet_id': ctx.dataset.main_pet_id}, headers=headers)
+        assert response.status_code == 201, f'start_walk respondeu HTTP {response.status_code}'
+        walk_id = response.get_json()['walk']['id']
+        with ctx.app.app_context():
+            db.session.execute(db.update(Walk).where(Walk.id == walk_id)
+                               .values(start_time=datetime.utcnow() - timedelta(minutes=30)))
+            db.session.commit()
+        return walk_id
+
+    def finish(walk_id):
+        response = client.put(f'/api/walks/finish/{walk_id}', json=body, headers=headers)
+        assert response.status_code == 200, f'finish_walk respondeu HTTP {response.status_code}'
+
+    result = measure(finish, repeat=ctx.repeat, setup=start_walk)
+    drain_jobs()
+    return {'route=1800': result}
+
+
+@benchmark('check_and_award_badges', group='macro', dataset=True)
+def bench_badges(ctx):
+    from src.models.models import db
+    from src.routes.walks import check_and_award_badges
+    results = {}
+    with ctx.app.app_context():
+        for size, user_id in sorted(ctx.dataset.history_users.items()):
+            def run():
+                check_and_award_badges(user_id)
+                db.session.rollback()  # mede sempre a avaliação completa, sem gravar os badges
+            results[f'history={size}'] = measure(run, repeat=ctx.repeat)
+    return results
+
+
+@benchmark('get_ranking', group='macro', dataset=True)
+def bench_ranking(ctx):
+    results = {}
+    for rank_type in ('global', 'local'):
+        for period in RANKING_PERIODS:
+            url = f'/api/gamification/ranking?type={rank_type}&period={period}'
+            results[f'{rank_type}/{period}'] = measure(lambda: ctx.get(url), repeat=ctx.repeat)
+    return results
+
+
+@benchmark('get_dashboard', group='macro', dataset=True)
+def bench_dashboard(ctx):
+    return {'': measure(lambda: ctx.get('/api/users/dashboard'), repeat=ctx.repeat)}
+
+
+# --- Execução ---
+
+def _selected(name, patterns):
+    return not patterns or any(fnmatch.fnmatch(name, pattern) or pattern in name for pattern in patterns)
+
+
+def _case_name(name, variant, size=None):
+    """Ex: get_ranking[global/weekly,walks=100000]."""
+    params = ([variant] if variant else []) + ([f'walks={size}'] if size else [])
+    return f"{name}[{','.join(params)}]" if params else name
+
+
+def _report(name, stats):
+    print(f"{name:60} {stats['median'] * 1000:10.3f} ms  (min {stats['min'] * 1000:.3f}, "
+          f"max {stats['max'] * 1000:.3f})", flush=True)
+
+
+def run_suite(sizes, repeat=5, only=None, database_url=None):
+    """Executa os casos selecionados e retorna {nome_do_caso: estatísticas}."""
+    from endpoint_scenarios import load_app
+    if database_url is None:
+        database_url = 'sqlite:///' + os.path.join(tempfile.mkdtemp(prefix='walkie-bench-'), 'bench.db')
+    app = load_app(database_url)
+
+    results = {}
+    selected = [(name, group, func, needs_data) for name, group, func, needs_data in BENCHMARKS
+                if _selected(name, only)]
+    dataset = Dataset()
+    with app.app_context():
+        dataset.create()
+    ctx = Context(app, dataset, repeat)
+
+    for name, group, func, needs_data in selected:
+        if not needs_data:
+            for variant, stats in func(ctx).items():
+                case = _case_name(name, variant)
+                results[case] = stats
+                _report(case, stats)
+
+    for size in sizes:
+        if not any(needs_data for *_, needs_data in selected):
+            break
+        with app.app_context():
+            dataset.grow(size)
+        for name, group, func, needs_data in selected:
+            if needs_data:
+                for variant, stats in func(ctx).items():
+                    case = _case_name(name, variant, size)
+                    results[case] = stats
+                    _report(case, stats)
+    return results
+
+
+def print_comparison(rows, threshold):
+    labels = {'regression': 'REGRESSÃO', 'improvement': 'melhora', 'ok': 'ok',
+              'new': 'novo', 'missing': 'ausente'}
+    print(f"\nComparação com a baseline (limite {threshold:.0%}):")
+    for name, status, base, current, ratio in rows:
+        base_ms = f'{base * 1000:.3f}' if base is not None else '-'
+        current_ms = f'{current * 1000:.3f}' if current is not None else '-'
+        ratio_text = f'{ratio:.2f}x' if ratio is not None else ''
+        print(f"{labels[status]:10} {name:60} {base_ms:>10} -> {current_ms:>10} ms {ratio_text}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmarks dos caminhos quentes da API')
+    parser.add_argument('--sizes', default=DEFAULT_SIZES,
+                        help='tamanhos da base em passeios, separados por vírgula (ex: 10000,100000,1000000)')
+    parser.add_argument('--repeat', type=int, default=5, help='rodadas por caso (vale a mediana)')
+    parser.add_argument('--only', action='append', help='roda só os casos com esse nome/padrão (repetível)')
+    parser.add_argument('--database-url', help='SQLite da base sintética (padrão: arquivo temporário)')
+    parser.add_argument('--save', metavar='ARQUIVO', help='grava os resultados como baseline JSON')
+    parser.add_argument('--compare', metavar='ARQUIVO', help='compara com uma baseline JSON')
+    parser.add_argument('--threshold', type=float, default=0.2, help='regressão a partir de +20%% (padrão)')
+    parser.add_argument('--metric', default='median', choices=('median', 'min', 'mean'))
+    args = parser.parse_args()
+
+    sizes = sorted(int(size) for size in args.sizes.split(',') if size.strip())
+    baseline = load_baseline(args.compare) if args.compare else None
+
+    results = run_suite(sizes, args.repeat, args.only, args.database_url)
+
+    if args.save:
+        save_baseline(args.save, results)
+        print(f"\n✅ Baseline gravada em {args.save} ({len(results)} casos).")
+
+    if baseline:
+        baseline_results = baseline['results']
+        if args.only:
+            baseline_results = {name: stats for name, stats in baseline_results.items()
+                                if _selected(name.split('[')[0], args.only)}
+        rows = compare(baseline_results, results, args.threshold, args.metric)
+        print_comparison(rows, args.threshold)
+        regressions = [row for row in rows if row[1] == 'regression']
+        if regressions:
+            print(f"\n❌ {len(regressions)} caso(s) regrediram mais de {args.threshold:.0%}.")
+            sys.exit(1)
+        print("\n✅ Nenhuma regressão em relação à baseline.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+# Arquivo: backend/walkie_backend/benchmarks/suite.py
+# Infraestrutura da suíte de benchmarks (run_benchmarks.py): registro dos casos,
+# medição, base sintética em SQLite que cresce por etapas (10 mil, 100 mil,
+# 1 milhão de passeios...) e leitura/comparação das baselines em JSON.
+import json
+import os
+import platform
+import sqlite3
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'scripts'))
+os.environ.setdefault('LEDGER_VERIFY_INTERVAL', '0')
+os.environ['SCHEDULER_AUTOSTART'] = 'false'
+
+BASELINE_VERSION = 1
+# Usuários espalhados em um raio de 20 km (várias células do ranking local)
+RADIUS_KM = 20
+WALKS_PER_USER = 50
+
+# (nome, grupo, função, precisa_de_base)
+BENCHMARKS = []
+
+
+def benchmark(name, group='micro', dataset=False):
+    """Registra um caso. Com dataset=True ele roda uma vez para cada tamanho de base (--sizes)."""
+    def decorator(func):
+        BENCHMARKS.append((name, group, func, dataset))
+        return func
+    return decorator
+
+
+def measure(func, repeat=5, number=1, setup=None):
+    """
+    Executa func 'number' vezes por rodada, 'repeat' rodadas, e retorna as
+    estatísticas em segundos por chamada. setup() (fora do tempo) roda antes
+    de cada chamada e o resultado é passado para func.
+    """
+    timings = []
+    for _ in range(repeat):
+        elapsed = 0.0
+        for _ in range(number):
+            arg = setup() if setup else None
+            start = time.perf_counter()
+            func(arg) if setup else func()
+            elapsed += time.perf_counter() - start
+        timings.append(elapsed / number)
+    timings.sort()
+    return {
+        'min': timings[0],
+        'median': statistics.median(timings),
+        'mean': statistics.fmean(timings),
+        'max': timings[-1],
+        'stdev': statistics.stdev(timings) if len(timings) > 1 else 0.0,
+        'repeat': repeat,
+        'number': number,
+    }
+
+
+# --- Base sintética ---
+
+class Dataset:
+    """
+    Base de benchmark que só cresce (gerador de src/utils/synthetic_data.py, sem
+    percursos): grow(n) completa até n passeios distribuídos entre os usuários
+    comuns (os históricos dos badges ficam de fora da conta).
+    """
+
+    def __init__(self, seed=42):
+        self.seed = seed
+        self.generator = None
+        self.owners = []
+        self.walks = 0
+        self.history_users = {}
+
+    def create(self, history_sizes=(100, 1000, 10000)):
+        """Usuário principal e usuários com históricos grandes para os badges."""
+        from src.utils.synthetic_data import SyntheticData
+        self.generator = SyntheticData(seed=self.seed, days=120, route_ratio=0, radius_km=RADIUS_KM)
+        main = self.generator.add_users(1, max_pets=1)
+        self.main_user_id, self.main_pet_id = main[0][0], main[0][1][0]
+        for size in history_sizes:
+            owner = self.generator.add_users(1)
+            self.generator.add_walks(size, owner)
+            self.history_users[size] = owner[0][0]
+        self.owners = main
+
+    def grow(self, total_walks):
+        if total_walks <= self.walks:
+            return
+        target_users = max(total_walks // WALKS_PER_USER, 10)
+        if len(self.owners) < target_users:
+            self.owners += self.generator.add_users(target_users - len(self.owners))
+        self.generator.add_walks(total_walks - self.walks, self.owners)
+        self.walks = total_walks
+
+
+def drain_jobs(timeout=30):
+    """Espera a fila de tarefas em segundo plano esvaziar (fora da medição)."""
+    from src.utils.jobs import job_queue
+    deadline = time.monotonic() + timeout
+    while job_queue.backlog and time.monotonic() < deadline:
+        time.sleep(0.005)
+
+
+# --- Baselines ---
+
+def environment():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                                capture_output=True, text=True, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    try:
+        import numpy
+        numpy_version = numpy.__version__
+    except ImportError:
+        numpy_version = None
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'sqlite': sqlite3.sqlite_version,
+        'numpy': numpy_version,
+        'commit': commit,
+        'created_at': datetime.utcnow().isoformat(timespec='seconds') + 'Z',
+    }
+
+
+def save_baseline(path, results):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w') as baseline_file:
+        json.dump({'version': BASELINE_VERSION, 'environment': environment(), 'results': results},
+                  baseline_file, indent=2, sort_keys=True)
+        baseline_file.write('\n')
+
+
+def load_baseline(path):
+    with open(path) as baseline_file:
+        data = json.load(baseline_file)
+    if data.get('version') != BASELINE_VERSION:
+        raise ValueError(f'Baseline {path} tem versão {data.get("version")}, esperado {BASELINE_VERSION}')
+    return data
+
+
+def compare(baseline_results, results, threshold=0.2, metric='median', min_delta=50e-6):
+    """
+    Compara 'results' com a baseline. Um caso regride quando fica mais de
+    'threshold' (fração) mais lento E a diferença absoluta passa de 'min_delta'
+    segundos (ruído em casos de microssegundos). Retorna [(nome, status, base, atual, razão)],
+    com status 'regression', 'improvement', 'ok', 'new' ou 'missing'.
+    """
+    rows = []
+    # Na ordem da execução atual; casos que sumiram vão para o fim
+    names = list(results) + [name for name in baseline_results if name not in results]
+    for name in names:
+        if name not in results:
+            rows.append((name, 'missing', baseline_results[name][metric], None, None))
+            continue
+        if name not in baseline_results:
+            rows.append((name, 'new', None, results[name][metric], None))
+            continue
+        base, current = baseline_results[name][metric], results[name][metric]
+        ratio = current / base if base else float('inf')
+        status = 'ok'
+        if abs(current - base) > min_delta:
+            if ratio > 1 + threshold:
+                status = 'regression'
+            elif ratio < 1 / (1 + threshold):
+                status = 'improvement'
+        rows.append((name, status, base, current, ratio))
+    return rows
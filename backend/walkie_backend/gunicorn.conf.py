@@ -0,0 +1,151 @@
+# Arquivo: backend/walkie_backend/gunicorn.conf.py
+# Configuração do gunicorn para produção (pre-fork: um mestre e N workers):
+#   gunicorn -c gunicorn.conf.py wsgi:app
+#   GUNICORN_WORKERS=4 GUNICORN_THREADS=8 gunicorn -c gunicorn.conf.py wsgi:app
+# Variáveis: GUNICORN_BIND (ou PORT), GUNICORN_WORKERS (ou WEB_CONCURRENCY),
+# GUNICORN_THREADS, GUNICORN_LIVE_SOCKETS, GUNICORN_WORKER_CLASS, GUNICORN_PRELOAD, GUNICORN_TIMEOUT,
+# GUNICORN_GRACEFUL_TIMEOUT, GUNICORN_KEEPALIVE, GUNICORN_MAX_REQUESTS,
+# GUNICORN_LOG_LEVEL, GUNICORN_SCHEDULER, GUNICORN_SCHEDULER_LOCK e GUNICORN_MIGRATE.
+#
+# Antes de criar os workers o mestre roda scripts/migrate.py (tabelas, migrações,
+# saldos de abertura, dados iniciais) uma única vez, em um processo à parte; se
+# falhar, o gunicorn não sobe. Os workers importam o app sem mexer no banco
+# (DB_BOOTSTRAP=false). Com várias máquinas, GUNICORN_MIGRATE=false e rode o
+# script no passo de deploy.
+#
+# Cada worker, depois do fork e antes de aceitar requisições, abre as conexões
+# do pool (uma por thread), carrega o catálogo de badges, monta o manifesto dos
+# arquivos estáticos e inicia as tarefas periódicas (src/utils/lifecycle.py).
+# No desligamento (SIGTERM, reload) grava os pontos pendentes do rastreamento
+# ao vivo e espera a fila de tarefas em segundo plano.
+#
+# Tarefas periódicas: a gravação do rastreamento ao vivo roda em todo worker; as
+# de manutenção do banco (varredura, livro de pontos, arquivo de rotas) rodam em
+# um só. GUNICORN_SCHEDULER=worker (padrão) elege um worker por máquina com uma
+# trava de arquivo (GUNICORN_SCHEDULER_LOCK); com várias máquinas use
+# GUNICORN_SCHEDULER=off e rode scripts/run_scheduler.py em um único lugar.
+#
+# Mais de um worker exige STATE_STORE_URL (Redis) para o estado compartilhado
+# (o boot falha sem ele; sem Redis o padrão é um worker) e sticky session no
+# balanceador para o rastreamento ao vivo (estado por processo).
+# DB_POOL_SIZE + DB_MAX_OVERFLOW deve comportar GUNICORN_THREADS por worker, e
+# workers x (pool + overflow) precisa caber no max_connections do banco.
+#
+# Vazão medida com scripts/load_test.py (mistura padrão, carga aberta, 20 s por
+# taxa) contra uma base de scripts/generate_data.py --users 500 --walks 20000 em
+# SQLite, numa máquina de 1 vCPU compartilhada com o próprio gerador de carga.
+# Saturação = maior vazão alcançada subindo a taxa até 130 ações/s:
+#   modelo                         saturação    p95 a ~65 req/s
+#   sync,    3 workers x 1 thread   ~79 req/s    224 ms   (*)
+#   gthread, 1 worker  x 8 threads  ~90 req/s    364 ms
+#   gthread, 3 workers x 4 threads  ~89 req/s    363 ms   (*)
+# (*) medidos antes da exigência do STATE_STORE_URL, com estado por processo:
+# hoje só sobem com Redis, que acrescenta uma ida à rede às leituras do estado
+# (passeio ativo, leitura após escrita) e não foi medido aqui. Sem Redis o único
+# perfil possível é o de um worker.
+# Com um único núcleo a CPU é o limite: as threads ganham ~13% de vazão na
+# saturação (sobrepõem a espera do banco) ao custo de cauda maior abaixo dela,
+# e mais workers não ajudam. Meça de novo em produção, com o número real de
+# núcleos e o MySQL (workers ~ núcleos, threads pela espera de I/O).
+#
+# WebSockets do rastreamento ao vivo (flask-sock): cada socket prende uma thread
+# do gthread durante o passeio inteiro, fora da tabela acima. Por worker há
+# GUNICORN_THREADS threads para HTTP (inclusive /api/health/ready) mais
+# GUNICORN_LIVE_SOCKETS (padrão 16 com flask-sock) reservadas para sockets; o
+# app recusa o socket além disso (LIVE_SOCKET_MAX) e o cliente cai no POST de
+# pontos. Capacidade ao vivo = workers x GUNICORN_LIVE_SOCKETS passeios
+# simultâneos. Para muito mais sockets, GUNICORN_WORKER_CLASS=gevent (pacote
+# gevent; sem limite de sockets por thread) ou um gunicorn à parte só para
+# /api/walks/<id>/stream no balanceador.
+import importlib.util
+import multiprocessing
+import os
+import subprocess
+import sys
+
+# Tarefas periódicas só depois do fork (em post_worker_init), nunca no mestre
+os.environ.setdefault('SCHEDULER_AUTOSTART', 'false')
+# O banco é preparado uma vez, em on_starting, e não por cada worker ao importar o app
+os.environ.setdefault('DB_BOOTSTRAP', 'false')
+
+
+def _env_int(name, default):
+    value = os.getenv(name)
+    return int(value) if value not in (None, '') else default
+
+
+bind = os.getenv('GUNICORN_BIND', f"0.0.0.0:{os.getenv('PORT', '8000')}")
+# Sem estado compartilhado cada worker teria o seu (passeio ativo, leitura após
+# escrita, limites): um worker só, com threads, é o padrão e o único permitido
+shared_state = bool(os.getenv('STATE_STORE_URL'))
+workers = _env_int('GUNICORN_WORKERS', _env_int('WEB_CONCURRENCY',
+                                                multiprocessing.cpu_count() * 2 + 1 if shared_state else 1))
+if workers > 1 and not shared_state:
+    raise RuntimeError(f'GUNICORN_WORKERS={workers} exige STATE_STORE_URL (Redis): sem ele o estado '
+                       'em memória de cada worker diverge (ex: passeio ativo). Use um worker ou configure o Redis.')
+threads = _env_int('GUNICORN_THREADS', 4)
+live_sockets = _env_int('GUNICORN_LIVE_SOCKETS', 16 if importlib.util.find_spec('flask_sock') else 0)
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'gthread' if threads + live_sockets > 1 else 'sync')
+if worker_class == 'gthread':
+    # Threads dos sockets somadas às de HTTP: sockets abertos nunca ocupam as de HTTP
+    threads += live_sockets
+    os.environ.setdefault('LIVE_SOCKET_MAX', str(live_sockets))
+elif worker_class == 'sync':
+    # Um socket travaria o worker inteiro
+    os.environ.setdefault('LIVE_SOCKET_MAX', '0')
+# Com preload o app é importado uma vez no mestre (boot mais rápido, memória
+# compartilhada); o worker descarta as conexões herdadas em post_fork
+preload_app = os.getenv('GUNICORN_PRELOAD', 'false').lower() == 'true'
+
+timeout = _env_int('GUNICORN_TIMEOUT', 30)
+graceful_timeout = _env_int('GUNICORN_GRACEFUL_TIMEOUT', 30)
+keepalive = _env_int('GUNICORN_KEEPALIVE', 5)
+# Reciclar workers perde o estado em memória do rastreamento ao vivo (o cliente
+# reenvia a partir de flushed_seq); desligado por padrão
+max_requests = _env_int('GUNICORN_MAX_REQUESTS', 0)
+max_requests_jitter = max_requests // 10
+
+accesslog = os.getenv('GUNICORN_ACCESS_LOG', '-')
+# Como o padrão do gunicorn, mas com o caminho sem a query string (%(U)s em vez
+# de %(r)s): nada que venha na URL (tokens, e-mails) vai para o log de acesso
+access_log_format = '%(h)s %(l)s %(u)s %(t)s "%(m)s %(U)s %(H)s" %(s)s %(b)s "%(f)s" "%(a)s"'
+loglevel = os.getenv('GUNICORN_LOG_LEVEL', 'info')
+
+# 'worker': tarefas exclusivas no worker que obtiver a trava; 'off': em scripts/run_scheduler.py
+scheduler_mode = os.getenv('GUNICORN_SCHEDULER', 'worker').lower()
+scheduler_lock = os.getenv('GUNICORN_SCHEDULER_LOCK') or None
+migrate_on_start = os.getenv('GUNICORN_MIGRATE', 'true').lower() == 'true'
+
+
+def on_starting(server):
+    if not migrate_on_start:
+        return
+    # Processo à parte: o mestre não importa o app (nem abre conexões) sem preload
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scripts', 'migrate.py')
+    result = subprocess.run([sys.executable, script])
+    if result.returncode != 0:
+        raise RuntimeError(f'scripts/migrate.py falhou (código {result.returncode}); workers não iniciados')
+
+
+def post_fork(server, worker):
+    if server.cfg.preload_app:
+        from src.main import app
+        from src.utils.lifecycle import after_fork
+        after_fork(app)
+
+
+def post_worker_init(worker):
+    from src.main import app
+    from src.utils.jobs import scheduler
+    from src.utils.lifecycle import ProcessLock, warm_up
+    timings = warm_up(app, connections=worker.cfg.threads)
+    worker.log.info("Warm-up do worker %s: %s", worker.pid,
+                    ', '.join(f'{name} {value:.1f}' if isinstance(value, float) else f'{name} {value}'
+                              for name, value in timings.items()))
+    scheduler.start(exclusive=ProcessLock(scheduler_lock) if scheduler_mode == 'worker' else False)
+
+
+def worker_exit(server, worker):
+    from src.main import app
+    from src.utils.lifecycle import shutdown
+    shutdown(app)
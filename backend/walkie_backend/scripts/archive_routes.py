@@ -0,0 +1,50 @@
+# Arquivo: backend/walkie_backend/scripts/archive_routes.py
+# Move para o arquivo frio (segmentos comprimidos por mês, em disco ou S3) as
+# rotas dos passeios antigos; a mesma tarefa roda sozinha a cada ROUTE_ARCHIVE_INTERVAL.
+#   python scripts/archive_routes.py                      -> arquiva (ROUTE_ARCHIVE_AFTER_DAYS, padrão 730)
+#   python scripts/archive_routes.py --older-than-days 365 --limit 100000
+#   python scripts/archive_routes.py --vacuum             -> só limpa segmentos com registros mortos
+#   python scripts/archive_routes.py --restore            -> devolve todas as rotas para a tabela
+# Destino: ROUTE_ARCHIVE_URL (s3://bucket/prefixo ou caminho; padrão instance/route_archive).
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ.setdefault('STUCK_WALK_SWEEP_INTERVAL', '0')
+os.environ['SCHEDULER_AUTOSTART'] = 'false'
+os.environ.setdefault('ROUTE_ARCHIVE_INTERVAL', '0')
+
+from src.main import app
+from src.services.route_archive import (archive_old_routes, restore_archived_routes, vacuum_segments,
+                                        get_segment_store)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--older-than-days', type=int, default=None)
+    parser.add_argument('--segment-walks', type=int, default=None, help='passeios por segmento')
+    parser.add_argument('--limit', type=int, default=None, help='máximo de passeios nesta execução')
+    parser.add_argument('--vacuum', action='store_true', help='só limpa os segmentos')
+    parser.add_argument('--grace', type=int, default=3600,
+                        help='segundos antes de um segmento novo poder ser limpo (padrão 3600)')
+    parser.add_argument('--restore', action='store_true', help='desfaz o arquivamento')
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    with app.app_context():
+        print(f"Arquivo: {getattr(get_segment_store(), 'root', None) or os.getenv('ROUTE_ARCHIVE_URL')}")
+        if args.restore:
+            restored = restore_archived_routes()
+            print(f"✅ {restored} rotas devolvidas para a tabela em {time.perf_counter() - started:.1f}s.")
+            return
+        if not args.vacuum:
+            archived = archive_old_routes(args.older_than_days, args.segment_walks, args.limit)
+            print(f"✅ {archived} passeios arquivados em {time.perf_counter() - started:.1f}s.")
+        deleted, rewritten = vacuum_segments(args.grace)
+        print(f"✅ Limpeza: {deleted} segmentos apagados, {rewritten} regravados.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+# Arquivo: backend/walkie_backend/scripts/backfill_heatmap.py
+# Agrega no mapa de calor (route_tiles) os passeios finalizados ainda não indexados.
+# O processamento das rotas (JSON + limpeza + tiles) roda em um pool de processos;
+# o processo principal lê os lotes do banco e grava as contagens com upsert.
+#   python scripts/backfill_heatmap.py [--workers 4] [--batch 500]
+#   python scripts/backfill_heatmap.py --rebuild   -> zera route_tiles e refaz tudo
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ.setdefault('STUCK_WALK_SWEEP_INTERVAL', '0')
+os.environ['SCHEDULER_AUTOSTART'] = 'false'
+
+from sqlalchemy import delete, update
+from src.main import app, db
+from src.models.models import Walk, RouteTile
+from src.services.heatmap import tiles_from_route_data, index_walks_batch
+from src.services.route_archive import with_archived_routes
+
+
+def _tiles_for_batch(rows):
+    """Executado nos processos do pool: [(walk_id, route_data)] -> {walk_id: tiles}."""
+    return {walk_id: tiles_from_route_data(route_data) for walk_id, route_data in rows}
+
+
+def _batches(batch_size):
+    last_id = 0
+    while True:
+        rows = db.session.query(Walk.id, Walk.route_data, Walk.route_archive_ref)\
+                         .filter(Walk.id > last_id, Walk.end_time.isnot(None),
+                                 Walk.heatmap_indexed.is_(False))\
+                         .order_by(Walk.id).limit(batch_size).all()
+        if not rows:
+            return
+        last_id = rows[-1][0]
+        # Passeios com a rota no arquivo frio (--rebuild) são reidratados
+        yield [tuple(row)[:2] for row in with_archived_routes(rows, route_index=1, ref_index=2)]
+
+
+def backfill(workers=None, batch_size=500):
+    """Retorna quantos passeios foram indexados."""
+    indexed = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = []
+        for rows in _batches(batch_size):
+            pending.append(pool.submit(_tiles_for_batch, rows))
+            # Mantém poucos lotes em voo para não carregar o histórico inteiro na memória
+            if len(pending) >= (workers or os.cpu_count() or 1) * 2:
+                indexed += index_walks_batch(pending.pop(0).result())
+                print(f"... {indexed} passeios indexados")
+        for future in pending:
+            indexed += index_walks_batch(future.result())
+    return indexed
+
+
+def rebuild():
+    db.session.execute(delete(RouteTile))
+    db.session.execute(update(Walk).values(heatmap_indexed=False))
+    db.session.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--batch', type=int, default=500)
+    parser.add_argument('--rebuild', action='store_true')
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    with app.app_context():
+        if args.rebuild:
+            rebuild()
+        indexed = backfill(args.workers, args.batch)
+    print(f"✅ {indexed} passeio(s) indexados no mapa de calor em {time.perf_counter() - started:.1f}s.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+# Arquivo: backend/walkie_backend/scripts/backfill_start_cells.py
+# Preenche Walk.start_cell (célula geohash do início da rota) nos passeios
+# finalizados antes da coluna existir, em lotes por chave primária.
+#   python scripts/backfill_start_cells.py [--batch 1000]
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ.setdefault('STUCK_WALK_SWEEP_INTERVAL', '0')
+os.environ['SCHEDULER_AUTOSTART'] = 'false'
+
+from sqlalchemy import update
+from src.main import app, db
+from src.models.models import Walk
+from src.utils.geohash import route_start_cell
+
+
+def backfill(batch_size=1000):
+    """Retorna quantos passeios receberam célula."""
+    updated = 0
+    last_id = 0
+    while True:
+        rows = db.session.query(Walk.id, Walk.route_data)\
+                         .filter(Walk.id > last_id, Walk.start_cell.is_(None),
+                                 Walk.end_time.isnot(None), Walk.route_data.isnot(None))\
+                         .order_by(Walk.id).limit(batch_size).all()
+        if not rows:
+            break
+        last_id = rows[-1][0]
+
+        values = []
+        for walk_id, route_data in rows:
+            try:
+                cell = route_start_cell(json.loads(route_data))
+            except ValueError:
+                cell = None
+            if cell:
+                values.append({'id': walk_id, 'start_cell': cell})
+        if values:
+            # UPDATE em lote por chave primária
+            db.session.execute(update(Walk), values)
+        db.session.commit()
+        updated += len(values)
+        print(f"... até o passeio {last_id}: {updated} atualizados")
+    return updated
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--batch', type=int, default=1000)
+    args = parser.parse_args()
+    with app.app_context():
+        updated = backfill(args.batch)
+    print(f"✅ {updated} passeio(s) com célula de início preenchida.")
+
+
+if __name__ == "__main__":
+    main()
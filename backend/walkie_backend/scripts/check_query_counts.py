@@ -0,0 +1,70 @@
+# Arquivo: backend/walkie_backend/scripts/check_query_counts.py
+# Verifica o número máximo de comandos SQL por endpoint (pega regressões N+1).
+# Sai com código 1 se algum endpoint passar do orçamento.
+#   python scripts/check_query_counts.py
+import sys
+
+from endpoint_scenarios import load_app, seed_sample_data, run_scenarios, report_server_errors
+
+# Máximo de comandos SQL por requisição (inclui a autenticação do token_required)
+QUERY_BUDGETS = {
+    'users.get_profile': 4,
+    'users.get_pets': 2,
+    'users.get_dashboard': 3,
+    'walks.get_walk_history': 3,
+    'walks.get_active_walk': 2,
+    'walks.get_walk_details': 2,
+    'walks.start_walk': 6,
+    'walks.update_walk': 4,
+    'walks.push_walk_points': 2,
+    'walks.finish_walk': 14,
+    'gamification.get_available_badges': 3,
+    'gamification.get_user_badges': 2,
+    'gamification.get_ranking': 4,
+    'gamification.get_challenges': 4,
+    'gamification.get_leaderboard': 2,
+    'heatmap.get_heatmap_tile': 2,
+    'admin.list_users': 3,
+    'admin.list_all_pets': 3,
+    'admin.list_stuck_walks': 2,
+}
+
+
+def main():
+    app = load_app()
+    from src.models.models import db
+    from src.utils.sql_capture import assert_max_queries
+
+    with app.app_context():
+        seed_sample_data()
+        engine = db.engine
+
+    client = app.test_client()
+    failures = []
+
+    def on_request(name, method, url, do_request):
+        budget = QUERY_BUDGETS[name]
+        response = None
+        try:
+            with assert_max_queries(engine, budget) as capture:
+                response = do_request()
+            print(f"ok     {capture.count:3}/{budget:<3} {method:6} {url}")
+        except AssertionError as error:
+            failures.append((name, url, str(error)))
+            print(f"FALHOU       {method:6} {url}")
+        return response
+
+    server_errors = run_scenarios(app, client, on_request)
+    if report_server_errors(server_errors):
+        sys.exit(1)
+
+    if failures:
+        print("\n❌ Endpoints acima do orçamento de queries:")
+        for name, url, error in failures:
+            print(f"\n[{name}] {url}\n{error}")
+        sys.exit(1)
+    print("\n✅ Todos os endpoints dentro do orçamento de queries.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+# Arquivo: backend/walkie_backend/scripts/check_query_plans.py
+# Roda EXPLAIN em todas as queries emitidas pelos blueprints contra um banco populado
+# e falha (exit 1) quando uma query quente cai em full scan ou filesort.
+#   python scripts/check_query_plans.py
+#   DATABASE_URL=mysql+mysqlconnector://... python scripts/check_query_plans.py --no-seed
+import sys
+
+from endpoint_scenarios import load_app, seed_sample_data, run_scenarios, report_server_errors
+
+# Planos aceitos por endpoint (o problema é inerente à consulta, não falta de índice)
+ALLOWED = {
+    # Catálogo completo de badges é pequeno e listado inteiro
+    'gamification.get_available_badges': ['full scan'],
+    # Ranking ordena pela soma de pontos: ordenação de agregado sempre exige sort
+    'gamification.get_ranking': ['filesort', 'full scan'],
+    # Listagens administrativas percorrem a tabela inteira por definição
+    'admin.list_users': ['full scan'],
+    'admin.list_all_pets': ['full scan'],
+}
+
+
+def main():
+    app = load_app()
+    from src.models.models import db
+    from src.utils.sql_capture import QueryCapture
+    from src.utils.query_plan import check_queries
+
+    with app.app_context():
+        if '--no-seed' not in sys.argv:
+            seed_sample_data()
+        engine = db.engine
+
+    client = app.test_client()
+    failures = []
+
+    def on_request(name, method, url, do_request):
+        with QueryCapture(engine) as capture:
+            response = do_request()
+        problems = check_queries(engine, capture.queries)
+        allowed = ALLOWED.get(name, [])
+        for statement, found, _ in problems:
+            unexpected = [p for p in found if not any(p.startswith(a) for a in allowed)]
+            if unexpected:
+                failures.append((name, url, statement, unexpected))
+        status = 'ok' if not any(f[0] == name and f[1] == url for f in failures) else 'FALHOU'
+        print(f"{status:6} {method:6} {url} ({capture.count} queries, HTTP {response.status_code})")
+        return response
+
+    server_errors = run_scenarios(app, client, on_request)
+    if report_server_errors(server_errors):
+        sys.exit(1)
+
+    if failures:
+        print("\n❌ Queries com plano ruim:")
+        for name, url, statement, problems in failures:
+            print(f"\n[{name}] {url}\n  {'; '.join(problems)}\n  {' '.join(statement.split())}")
+        sys.exit(1)
+    print("\n✅ Nenhuma query quente em full scan ou filesort.")
+
+
+if __name__ == "__main__":
+    main()
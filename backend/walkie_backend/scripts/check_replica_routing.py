@@ -0,0 +1,105 @@
+# Arquivo: backend/walkie_backend/scripts/check_replica_routing.py
+# Verifica a separação de leitura e escrita com dois arquivos SQLite fazendo o
+# papel de primário e réplica (a "replicação" é uma cópia do arquivo):
+#   - GETs dos blueprints de leitura não tocam o primário; admin e escritas não tocam a réplica;
+#   - depois de uma escrita o usuário lê do primário por REPLICA_STICKY_SECONDS e depois volta à réplica;
+#   - usuário que ainda não chegou à réplica consegue se autenticar.
+# Sai com código 1 se alguma verificação falhar.
+#   python scripts/check_replica_routing.py
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+from endpoint_scenarios import SCENARIOS, auth_headers, load_app, seed_sample_data
+
+STICKY_SECONDS = 1
+REPLICA_NAME = 'Nome só na réplica'
+
+
+def main():
+    directory = tempfile.mkdtemp(prefix='walkie-replica-')
+    primary_path, replica_path = os.path.join(directory, 'primary.db'), os.path.join(directory, 'replica.db')
+    os.environ['DATABASE_REPLICA_URLS'] = f'sqlite:///{replica_path}'
+    os.environ['REPLICA_STICKY_SECONDS'] = str(STICKY_SECONDS)
+    app = load_app(f'sqlite:///{primary_path}')
+
+    from sqlalchemy import event
+    from src.models.models import db, Walk
+
+    with app.app_context():
+        seed_sample_data()
+        walk_id = Walk.query.filter_by(user_id=2).first().id
+        engines = dict(db.engines)
+
+    # "Replicação": cópia consistente do primário; o usuário 2 ganha um nome que só a réplica tem
+    with sqlite3.connect(primary_path) as source, sqlite3.connect(replica_path) as target:
+        source.backup(target)
+        target.execute('UPDATE users SET name = ? WHERE id = 2', (REPLICA_NAME,))
+
+    counts = {}
+    for key, engine in engines.items():
+        name = 'primary' if key is None else 'replica'
+        event.listen(engine, 'before_cursor_execute',
+                     lambda *args, name=name: counts.__setitem__(name, counts.get(name, 0) + 1))
+
+    client = app.test_client()
+    headers = {'admin': auth_headers(1), 'user': auth_headers(2)}
+    failures = []
+
+    def request(method, url, who='user', **kwargs):
+        counts.clear()
+        response = client.open(url, method=method, headers=headers[who], **kwargs)
+        return response, counts.get('primary', 0), counts.get('replica', 0)
+
+    def check(ok, label, detail):
+        print(f"{'ok    ' if ok else 'FALHOU'} {label:58} {detail}")
+        if not ok:
+            failures.append(label)
+
+    print("--- GETs ---")
+    for name, method, path, body, who in SCENARIOS:
+        if method != 'GET':
+            continue
+        url = path.format(walk_id=walk_id)
+        response, primary, replica = request(method, url, who)
+        if response.status_code not in (200, 404):  # 404: /api/walks/active sem passeio aberto
+            check(False, f'{method} {url}', f'HTTP {response.status_code}')
+        elif who == 'admin':
+            check(replica == 0, f'{method} {url}', f'primário {primary}, réplica {replica} (admin: só primário)')
+        else:
+            check(primary == 0 and replica > 0, f'{method} {url}', f'primário {primary}, réplica {replica}')
+
+    print("--- Leitura após escrita ---")
+    response, primary, replica = request('GET', '/api/users/profile')
+    check(response.get_json().get('name') == REPLICA_NAME, 'perfil lido da réplica', response.get_json().get('name'))
+
+    response, primary, replica = request('PUT', '/api/users/profile', json={'name': 'Nome novo'})
+    check(response.status_code == 200 and replica == 0, 'PUT /api/users/profile só no primário',
+          f'HTTP {response.status_code}, primário {primary}, réplica {replica}')
+
+    response, primary, replica = request('GET', '/api/users/profile')
+    check(response.get_json().get('name') == 'Nome novo' and replica == 0,
+          'logo depois da escrita: primário', f"{response.get_json().get('name')} (réplica {replica})")
+
+    time.sleep(STICKY_SECONDS + 0.2)
+    response, primary, replica = request('GET', '/api/users/profile')
+    check(response.get_json().get('name') == REPLICA_NAME and primary == 0,
+          f'depois de {STICKY_SECONDS}s: réplica de novo', f"{response.get_json().get('name')} (primário {primary})")
+
+    print("--- Usuário ainda fora da réplica ---")
+    response = client.post('/api/auth/register', json={'email': 'novo@walkie.local', 'password': 'walkie123',
+                                                       'name': 'Novo'})
+    token = (response.get_json() or {}).get('token')
+    response = client.get('/api/users/profile', headers={'Authorization': f'Bearer {token}'})
+    check(response.status_code == 200, 'GET /api/users/profile de usuário novo', f'HTTP {response.status_code}')
+
+    if failures:
+        print(f"\n❌ {len(failures)} verificação(ões) de roteamento falharam.")
+        sys.exit(1)
+    print("\n✅ Leituras nas réplicas, escritas e leitura após escrita no primário.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+# Arquivo: backend/walkie_backend/scripts/endpoint_scenarios.py
+# Base comum dos scripts de verificação: sobe a app em um SQLite temporário,
+# popula dados de exemplo e descreve as chamadas feitas pelo app em cada blueprint.
+import json
+import os
+import random
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+
+def load_app(database_url=None):
+    """Importa a app apontando para 'database_url' (padrão: SQLite temporário)."""
+    if database_url is None and not os.getenv('DATABASE_URL'):
+        database_url = 'sqlite:///' + os.path.join(tempfile.mkdtemp(prefix='walkie-'), 'walkie.db')
+    if database_url:
+        os.environ['DATABASE_URL'] = database_url
+    os.environ.setdefault('SECRET_KEY', 'walkie-local-scripts-secret-key-000000')
+    os.environ.setdefault('STUCK_WALK_SWEEP_INTERVAL', '0')
+    os.environ['SCHEDULER_AUTOSTART'] = 'false'
+
+    from src.main import app
+    return app
+
+
+def seed_sample_data(users=50, walks_per_user=20, seed=42):
+    """Popula usuários, pets, passeios e badges conquistados (precisa de app_context)."""
+    from src.models.models import db, User, Pet, Walk, Badge, UserBadge
+    from src.utils.geohash import route_start_cell
+
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    badge_ids = [badge_id for (badge_id,) in db.session.query(Badge.id).all()]
+
+    for u in range(users):
+        user = User(email=f'user{u}@walkie.local', name=f'Usuário {u}',
+                    role='admin' if u == 0 else 'user')
+        user.set_password('walkie')
+        db.session.add(user)
+        db.session.flush()
+
+        pet = Pet(name=f'Pet {u}', breed='SRD', owner_id=user.id)
+        db.session.add(pet)
+        db.session.flush()
+
+        total_points = 0
+        for w in range(walks_per_user):
+            start = now - timedelta(days=rng.randint(0, 60), minutes=rng.randint(0, 1440))
+            duration = rng.randint(600, 3600)
+            # Usuários espalhados em uma grade de ~3 km (várias células do ranking local)
+            origin_lat, origin_lng = -23.55 + (u % 7) * 0.03, -46.63 + (u // 7) * 0.03
+            route = [{'lat': origin_lat + i * 0.0005, 'lng': origin_lng + i * 0.0003} for i in range(20)]
+            points = rng.randint(10, 80)
+            total_points += points
+            db.session.add(Walk(
+                start_time=start, end_time=start + timedelta(seconds=duration),
+                duration=duration, distance=rng.uniform(500, 5000), calories=rng.randint(50, 300),
+                average_pace=rng.uniform(8, 16), route_data=json.dumps(route),
+                points_earned=points, user_id=user.id, pet_id=pet.id, created_at=start,
+                start_cell=route_start_cell(route)
+            ))
+        user.total_points = total_points
+
+        for badge_id in rng.sample(badge_ids, min(3, len(badge_ids))):
+            db.session.add(UserBadge(user_id=user.id, badge_id=badge_id))
+
+    db.session.commit()
+
+
+def auth_headers(user_id):
+    from src.routes.auth import generate_token
+    return {'Authorization': f'Bearer {generate_token(user_id)}'}
+
+
+# (nome, método, caminho, corpo JSON, usuário: 'admin' ou 'user')
+# Caminhos com {walk_id}/{pet_id} são preenchidos com registros do usuário comum.
+SCENARIOS = [
+    ('users.get_profile', 'GET', '/api/users/profile', None, 'user'),
+    ('users.get_pets', 'GET', '/api/users/pets', None, 'user'),
+    ('users.get_dashboard', 'GET', '/api/users/dashboard', None, 'user'),
+    ('walks.get_walk_history', 'GET', '/api/walks/history', None, 'user'),
+    ('walks.get_active_walk', 'GET', '/api/walks/active', None, 'user'),
+    ('walks.get_walk_details', 'GET', '/api/walks/{walk_id}', None, 'user'),
+    ('walks.start_walk', 'POST', '/api/walks/start', {'pet_id': '{pet_id}'}, 'user'),
+    ('walks.update_walk', 'PUT', '/api/walks/update/{active_walk_id}',
+     {'route_data': [{'lat': -23.55, 'lng': -46.63}, {'lat': -23.551, 'lng': -46.631}]}, 'user'),
+    ('walks.push_walk_points', 'POST', '/api/walks/{active_walk_id}/points',
+     {'points': [{'seq': 1, 'lat': -23.55, 'lng': -46.63}, {'seq': 2, 'lat': -23.551, 'lng': -46.631}]}, 'user'),
+    ('walks.finish_walk', 'PUT', '/api/walks/finish/{active_walk_id}',
+     {'route_data': [{'lat': -23.55, 'lng': -46.63}, {'lat': -23.551, 'lng': -46.631}]}, 'user'),
+    ('gamification.get_available_badges', 'GET', '/api/gamification/badges', None, 'user'),
+    ('gamification.get_user_badges', 'GET', '/api/gamification/my-badges', None, 'user'),
+    ('gamification.get_ranking', 'GET', '/api/gamification/ranking?period=weekly', None, 'user'),
+    ('gamification.get_ranking', 'GET', '/api/gamification/ranking?period=all_time', None, 'user'),
+    ('gamification.get_ranking', 'GET', '/api/gamification/ranking?type=local&period=weekly', None, 'user'),
+    ('gamification.get_ranking', 'GET', '/api/gamification/ranking?type=local&period=all_time', None, 'user'),
+    ('gamification.get_challenges', 'GET', '/api/gamification/challenges', None, 'user'),
+    ('gamification.get_leaderboard', 'GET', '/api/gamification/leaderboard', None, 'user'),
+    ('heatmap.get_heatmap_tile', 'GET', '/api/heatmap/tiles/13/3034/4647', None, 'user'),
+    ('admin.list_users', 'GET', '/api/admin/users?page=1', None, 'admin'),
+    ('admin.list_all_pets', 'GET', '/api/admin/pets?page=1', None, 'admin'),
+    ('admin.list_stuck_walks', 'GET', '/api/admin/walks/stuck', None, 'admin'),
+]
+
+
+def run_scenarios(app, client, on_request):
+    """
+    Executa cada cenário chamando on_request(nome, método, caminho, função_que_faz_a_requisição).
+    Precisa de dados populados por seed_sample_data (admin = usuário 1, usuário comum = 2).
+    Retorna os cenários que responderam com erro do servidor (5xx).
+    """
+    from src.models.models import Walk, Pet
+
+    with app.app_context():
+        admin_id, user_id = 1, 2
+        walk_id = Walk.query.filter_by(user_id=user_id).first().id
+        pet_id = Pet.query.filter_by(owner_id=user_id).first().id
+
+    headers = {'admin': auth_headers(admin_id), 'user': auth_headers(user_id)}
+    context = {'walk_id': walk_id, 'pet_id': pet_id, 'active_walk_id': None}
+    server_errors = []
+
+    for name, method, path, body, who in SCENARIOS:
+        url = path.format(**context)
+        payload = json.loads(json.dumps(body).replace('"{pet_id}"', str(pet_id))) if body else None
+
+        def do_request(url=url, method=method, payload=payload, who=who):
+            return client.open(url, method=method, json=payload, headers=headers[who])
+
+        response = on_request(name, method, url, do_request)
+        if response.status_code >= 500:
+            server_errors.append((name, url, response.status_code))
+        if name == 'walks.start_walk' and response.status_code == 201:
+            context['active_walk_id'] = response.get_json()['walk']['id']
+
+    return server_errors
+
+
+def report_server_errors(server_errors):
+    """Imprime os cenários que falharam com 5xx; retorna True se houve algum."""
+    for name, url, status in server_errors:
+        print(f"❌ [{name}] {url} respondeu HTTP {status}")
+    return bool(server_errors)
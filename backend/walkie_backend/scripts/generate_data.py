@@ -0,0 +1,58 @@
+# Arquivo: backend/walkie_backend/scripts/generate_data.py
+# Gera uma base sintética em escala de produção (usuários, pets, passeios com
+# percursos de GPS, livro de pontos) com INSERT em lote.
+#   python scripts/generate_data.py --users 20000 --walks 1000000
+#   python scripts/generate_data.py --database-url sqlite:////tmp/walkie-load.db --routes 0.2
+# Os usuários gerados entram com user<id>@synthetic.walkie e a senha 'walkie'
+# (ou --password), como o scripts/load_test.py espera.
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Gera dados sintéticos para testes de carga')
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--walks', type=int, default=50000)
+    parser.add_argument('--routes', type=float, default=0.1,
+                        help='fração dos passeios com percurso de GPS gravado (padrão 0.1)')
+    parser.add_argument('--days', type=int, default=180, help='passeios distribuídos nos últimos N dias')
+    parser.add_argument('--track-interval', type=int, default=5, help='segundos entre pontos do percurso')
+    parser.add_argument('--chunk', type=int, default=10000, help='linhas por INSERT em lote')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--password', default=None, help="senha dos usuários gerados (padrão 'walkie')")
+    parser.add_argument('--database-url', help='banco de destino (padrão: DATABASE_URL / configuração da app)')
+    args = parser.parse_args()
+
+    if args.database_url:
+        os.environ['DATABASE_URL'] = args.database_url
+    os.environ.setdefault('STUCK_WALK_SWEEP_INTERVAL', '0')
+    os.environ['SCHEDULER_AUTOSTART'] = 'false'
+    os.environ.setdefault('LEDGER_VERIFY_INTERVAL', '0')
+
+    from src.main import app
+    from src.utils.synthetic_data import SyntheticData, DEFAULT_PASSWORD
+
+    started = time.perf_counter()
+    with app.app_context():
+        generator = SyntheticData(seed=args.seed, days=args.days, route_ratio=args.routes,
+                                  chunk_size=args.chunk, track_interval=args.track_interval,
+                                  password=args.password or DEFAULT_PASSWORD)
+
+        def progress(done):
+            elapsed = time.perf_counter() - started
+            print(f"... {done}/{args.walks} passeios ({elapsed:.1f}s)", flush=True)
+
+        owners = generator.generate(args.users, args.walks, on_progress=progress)
+        pets = sum(len(pet_ids) for _, pet_ids, _, _ in owners)
+
+    elapsed = time.perf_counter() - started
+    print(f"✅ {args.users} usuários, {pets} pets e {args.walks} passeios gerados em {elapsed:.1f}s "
+          f"({args.walks / max(elapsed, 1e-9):.0f} passeios/s).")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,349 @@
+# Arquivo: backend/walkie_backend/scripts/load_test.py
+# Teste de carga contra um servidor rodando localmente: repete uma mistura
+# realista das chamadas do app a uma taxa fixa (carga aberta: as requisições
+# saem no horário programado, mesmo que o servidor atrase) e mostra os
+# percentis de latência por endpoint.
+#   python scripts/generate_data.py --users 2000 --walks 200000   # base sintética
+#   python src/main.py                                            # em outro terminal
+#   python scripts/load_test.py --url http://localhost:8000 --rps 50 --duration 60
+# Faz login com os usuários do gerador (user<id>@synthetic.walkie / 'walkie').
+# Só usa a biblioteca padrão.
+import argparse
+import http.client
+import json
+import math
+import random
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+EMAIL_DOMAIN = 'synthetic.walkie'
+TILE_ZOOM = 13
+CENTER = (-23.5505, -46.6333)
+PERCENTILES = (50, 90, 95, 99)
+# Atraso de saída acima disso indica que o próprio gerador de carga saturou
+LATE_START_SECONDS = 0.1
+
+# Peso de cada ação na mistura (aproxima o uso do app: telas iniciais e
+# histórico dominam; um passeio completo é início + envios de pontos + fim)
+DEFAULT_MIX = {
+    'dashboard': 20,
+    'walk_history': 14,
+    'walk_details': 10,
+    'profile': 8,
+    'pets': 6,
+    'active_walk': 6,
+    'ranking_global': 8,
+    'ranking_local': 5,
+    'leaderboard': 4,
+    'badges': 4,
+    'my_badges': 4,
+    'challenges': 4,
+    'heatmap_tile': 4,
+    'walk_session': 3,
+}
+
+
+def tile_for(lat, lng, zoom):
+    n = 1 << zoom
+    x = int((lng + 180.0) / 360.0 * n)
+    y = int((1.0 - math.asinh(math.tan(math.radians(lat))) / math.pi) / 2.0 * n)
+    return x, y
+
+
+def percentile(sorted_values, p):
+    """Percentil pelo posto mais próximo."""
+    if not sorted_values:
+        return None
+    rank = max(math.ceil(p / 100 * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+class Client:
+    """Uma conexão HTTP persistente por thread."""
+
+    def __init__(self, base_url, timeout):
+        parts = urlsplit(base_url)
+        self.scheme, self.netloc = parts.scheme, parts.netloc
+        self.prefix = parts.path.rstrip('/')
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            factory = http.client.HTTPSConnection if self.scheme == 'https' else http.client.HTTPConnection
+            connection = self._local.connection = factory(self.netloc, timeout=self.timeout)
+        return connection
+
+    def request(self, method, path, body=None, token=None):
+        """Retorna (status, corpo JSON ou None). Reabre a conexão uma vez se ela caiu."""
+        headers = {'Accept': 'application/json', 'Accept-Encoding': 'identity'}
+        payload = None
+        if body is not None:
+            payload = json.dumps(body).encode()
+            headers['Content-Type'] = 'application/json'
+        if token:
+            headers['Authorization'] = f'Bearer {token}'
+        for attempt in range(2):
+            connection = self._connection()
+            try:
+                connection.request(method, self.prefix + path, body=payload, headers=headers)
+                response = connection.getresponse()
+                data = response.read()
+                break
+            except (http.client.HTTPException, OSError):
+                connection.close()
+                self._local.connection = None
+                if attempt:
+                    raise
+        try:
+            return response.status, json.loads(data) if data else None
+        except ValueError:
+            return response.status, None
+
+
+class Stats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.statuses = defaultdict(lambda: defaultdict(int))
+        self.late_starts = 0
+
+    def record(self, endpoint, seconds, status):
+        with self._lock:
+            self.latencies[endpoint].append(seconds)
+            self.statuses[endpoint][status] += 1
+            if status is None or status >= 500:
+                self.errors[endpoint] += 1
+
+    def late(self):
+        with self._lock:
+            self.late_starts += 1
+
+    def summary(self, elapsed):
+        endpoints = {}
+        every = []
+        for endpoint, values in sorted(self.latencies.items()):
+            values = sorted(values)
+            every.extend(values)
+            endpoints[endpoint] = self._summarize(values, elapsed, self.errors[endpoint])
+            endpoints[endpoint]['statuses'] = {str(status): n for status, n in self.statuses[endpoint].items()}
+        total = self._summarize(sorted(every), elapsed, sum(self.errors.values()))
+        return {'elapsed': elapsed, 'late_starts': self.late_starts, 'total': total, 'endpoints': endpoints}
+
+    @staticmethod
+    def _summarize(values, elapsed, errors):
+        summary = {'count': len(values), 'errors': errors,
+                   'rps': len(values) / elapsed if elapsed else 0.0,
+                   'mean_ms': sum(values) / len(values) * 1000 if values else None,
+                   'max_ms': values[-1] * 1000 if values else None}
+        for p in PERCENTILES:
+            value = percentile(values, p)
+            summary[f'p{p}_ms'] = value * 1000 if value is not None else None
+        return summary
+
+
+class VirtualUser:
+    def __init__(self, user_id, token, pet_id, walk_ids, cell_hint):
+        self.user_id = user_id
+        self.token = token
+        self.pet_id = pet_id
+        self.walk_ids = walk_ids
+        self.cell_hint = cell_hint
+        self.busy = threading.Lock()  # um passeio por vez
+
+
+class LoadTest:
+    def __init__(self, client, users, mix, stats, rng, session_points=3):
+        self.client = client
+        self.users = users
+        self.actions = list(mix)
+        self.weights = [mix[action] for action in self.actions]
+        self.stats = stats
+        self.rng = rng
+        self.session_points = session_points
+        self._rng_lock = threading.Lock()
+
+    def call(self, endpoint, method, path, user, body=None):
+        start = time.perf_counter()
+        try:
+            status, data = self.client.request(method, path, body, user.token)
+        except (http.client.HTTPException, OSError):
+            status, data = None, None
+        self.stats.record(endpoint, time.perf_counter() - start, status)
+        return status, data
+
+    def pick(self):
+        with self._rng_lock:
+            action = self.rng.choices(self.actions, self.weights)[0]
+            return action, self.rng.choice(self.users), self.rng.random()
+
+    def run_action(self, action, user, roll):
+        if action == 'dashboard':
+            self.call(action, 'GET', '/api/users/dashboard', user)
+        elif action == 'walk_history':
+            page = 1 if roll < 0.8 else 2
+            self.call(action, 'GET', f'/api/walks/history?page={page}', user)
+        elif action == 'walk_details':
+            if user.walk_ids:
+                self.call(action, 'GET', f'/api/walks/{user.walk_ids[int(roll * len(user.walk_ids))]}', user)
+        elif action == 'profile':
+            self.call(action, 'GET', '/api/users/profile', user)
+        elif action == 'pets':
+            self.call(action, 'GET', '/api/users/pets', user)
+        elif action == 'active_walk':
+            self.call(action, 'GET', '/api/walks/active', user)
+        elif action == 'ranking_global':
+            period = ('weekly', 'monthly', 'all_time')[int(roll * 3)]
+            self.call(action, 'GET', f'/api/gamification/ranking?period={period}', user)
+        elif action == 'ranking_local':
+            period = ('weekly', 'monthly', 'all_time')[int(roll * 3)]
+            self.call(action, 'GET', f'/api/gamification/ranking?type=local&period={period}{user.cell_hint}', user)
+        elif action == 'leaderboard':
+            self.call(action, 'GET', '/api/gamification/leaderboard', user)
+        elif action == 'badges':
+            self.call(action, 'GET', '/api/gamification/badges', user)
+        elif action == 'my_badges':
+            self.call(action, 'GET', '/api/gamification/my-badges', user)
+        elif action == 'challenges':
+            self.call(action, 'GET', '/api/gamification/challenges', user)
+        elif action == 'heatmap_tile':
+            x, y = tile_for(CENTER[0] + (roll - 0.5) * 0.2, CENTER[1] + (roll - 0.5) * 0.2, TILE_ZOOM)
+            self.call(action, 'GET', f'/api/heatmap/tiles/{TILE_ZOOM}/{x}/{y}', user)
+        elif action == 'walk_session':
+            self.walk_session(user)
+
+    def walk_session(self, user):
+        """Passeio completo: início, alguns envios de pontos e finalização (cada etapa medida)."""
+        if user.pet_id is None or not user.busy.acquire(blocking=False):
+            return
+        try:
+            status, data = self.call('walk_start', 'POST', '/api/walks/start', user, {'pet_id': user.pet_id})
+            if status == 409:
+                # Passeio anterior ficou aberto (ex: teste interrompido): finaliza e segue
+                status, data = self.call('active_walk', 'GET', '/api/walks/active', user)
+                if status == 200 and data:
+                    self.call('walk_finish', 'PUT', f"/api/walks/finish/{data['id']}", user, {})
+                return
+            if status != 201 or not data:
+                return
+            walk_id = data['walk']['id']
+            lat, lng = CENTER
+            seq = 0
+            for _ in range(self.session_points):
+                points = []
+                for _ in range(10):
+                    seq += 1
+                    lat += 0.00004
+                    lng += 0.00003
+                    points.append({'seq': seq, 'lat': lat, 'lng': lng, 'timestamp': int(time.time() * 1000)})
+                self.call('walk_points', 'POST', f'/api/walks/{walk_id}/points', user, {'points': points})
+            self.call('walk_finish', 'PUT', f'/api/walks/finish/{walk_id}', user, {})
+        finally:
+            user.busy.release()
+
+    def run(self, rps, duration, concurrency):
+        """Dispara rps ações por segundo durante 'duration' segundos."""
+        total = int(rps * duration)
+        started = time.perf_counter()
+
+        def task(due):
+            if time.perf_counter() - due > LATE_START_SECONDS:
+                self.stats.late()
+            self.run_action(*self.pick())
+
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            for i in range(total):
+                due = started + i / rps
+                delay = due - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                pool.submit(task, due)
+        return time.perf_counter() - started
+
+
+def login_users(client, user_ids, password, rng):
+    """Faz login e carrega pet, passeios e célula de cada usuário."""
+    users = []
+    for user_id in user_ids:
+        status, data = client.request('POST', '/api/auth/login',
+                                      {'email': f'user{user_id}@{EMAIL_DOMAIN}', 'password': password})
+        if status != 200:
+            continue
+        token = data['token']
+        _, pets = client.request('GET', '/api/users/pets', token=token)
+        _, history = client.request('GET', '/api/walks/history?per_page=20', token=token)
+        pet_id = pets[0]['id'] if isinstance(pets, list) and pets else None
+        walk_ids = [walk['id'] for walk in (history or {}).get('walks', [])]
+        # Metade dos usuários manda a localização no ranking local; os outros usam o último passeio
+        cell_hint = ''
+        if rng.random() < 0.5:
+            cell_hint = f'&lat={CENTER[0] + rng.uniform(-0.1, 0.1):.5f}&lng={CENTER[1] + rng.uniform(-0.1, 0.1):.5f}'
+        users.append(VirtualUser(user_id, token, pet_id, walk_ids, cell_hint))
+    return users
+
+
+def print_report(summary):
+    header = f"{'endpoint':16} {'n':>7} {'erros':>6} {'req/s':>7} " + \
+             ' '.join(f"{f'p{p}':>8}" for p in PERCENTILES) + f" {'máx':>8}  (ms)"
+    print(header)
+    rows = list(summary['endpoints'].items()) + [('TOTAL', summary['total'])]
+    for endpoint, stats in rows:
+        if not stats['count']:
+            continue
+        values = ' '.join(f"{stats[f'p{p}_ms']:8.1f}" for p in PERCENTILES)
+        print(f"{endpoint:16} {stats['count']:7} {stats['errors']:6} {stats['rps']:7.1f} {values} {stats['max_ms']:8.1f}")
+    if summary['late_starts']:
+        print(f"⚠️  {summary['late_starts']} ações saíram atrasadas (> {LATE_START_SECONDS * 1000:.0f} ms): "
+              f"aumente --concurrency ou reduza --rps para não medir o próprio gerador de carga.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Teste de carga com a mistura de chamadas do app')
+    parser.add_argument('--url', default='http://localhost:8000')
+    parser.add_argument('--rps', type=float, default=20, help='ações por segundo (um passeio completo conta como uma)')
+    parser.add_argument('--duration', type=float, default=30, help='segundos')
+    parser.add_argument('--concurrency', type=int, default=32, help='requisições simultâneas no máximo')
+    parser.add_argument('--users', type=int, default=50, help='usuários virtuais (logados no início)')
+    parser.add_argument('--population', type=int, default=1000,
+                        help='usuários gerados na base (ids 1..N de onde os virtuais são sorteados)')
+    parser.add_argument('--password', default='walkie')
+    parser.add_argument('--mix', help='pesos no formato acao=peso,... (sobrescreve os padrões; peso 0 desliga)')
+    parser.add_argument('--timeout', type=float, default=30)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--json', metavar='ARQUIVO', help='grava o resumo em JSON')
+    args = parser.parse_args()
+
+    mix = dict(DEFAULT_MIX)
+    for item in filter(None, (args.mix or '').split(',')):
+        action, _, weight = item.partition('=')
+        if action not in DEFAULT_MIX:
+            parser.error(f'ação desconhecida em --mix: {action} (use: {", ".join(DEFAULT_MIX)})')
+        mix[action] = float(weight)
+    mix = {action: weight for action, weight in mix.items() if weight > 0}
+
+    rng = random.Random(args.seed)
+    client = Client(args.url, args.timeout)
+    user_ids = rng.sample(range(1, args.population + 1), min(args.users, args.population))
+    users = login_users(client, user_ids, args.password, rng)
+    if not users:
+        raise SystemExit(f"❌ Nenhum login funcionou em {args.url}. Gere a base com scripts/generate_data.py.")
+    print(f"... {len(users)} usuários logados; {args.rps:g} ações/s por {args.duration:g}s", flush=True)
+
+    stats = Stats()
+    elapsed = LoadTest(client, users, mix, stats, rng).run(args.rps, args.duration, args.concurrency)
+    summary = stats.summary(elapsed)
+    print_report(summary)
+
+    if args.json:
+        with open(args.json, 'w') as summary_file:
+            json.dump(dict(summary, config=vars(args)), summary_file, indent=2)
+        print(f"Resumo gravado em {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+# Arquivo: backend/walkie_backend/scripts/migrate.py
+# Prepara o banco: tabelas novas, colunas e índices novos dos modelos em tabelas
+# já existentes, saldos de abertura do livro de pontos e dados iniciais. O
+# gunicorn.conf.py roda este script uma vez, antes de criar os workers.
+#   python scripts/migrate.py            -> aplica
+#   python scripts/migrate.py --dry-run  -> só lista o que falta
+import os
+import sys
+
+# Configura o caminho para encontrar os módulos 'src'
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+# O import do app não mexe no banco; bootstrap_database() abaixo faz tudo
+os.environ['DB_BOOTSTRAP'] = 'false'
+os.environ.setdefault('STUCK_WALK_SWEEP_INTERVAL', '0')
+os.environ['SCHEDULER_AUTOSTART'] = 'false'
+
+from src.main import app, db
+from src.utils.migrations import bootstrap_database, pending_migrations
+
+
+def main():
+    with app.app_context():
+        if '--dry-run' in sys.argv:
+            columns, indexes = pending_migrations(db.engine)
+            for table, column in columns:
+                print(f"coluna pendente: {table.name}.{column.name}")
+            for index in indexes:
+                print(f"índice pendente: {index.name} ({index.table.name})")
+            if not columns and not indexes:
+                print("✅ Banco em dia com os modelos.")
+            return
+
+        applied = bootstrap_database()
+        for change in applied:
+            print(f"✅ {change}")
+        if not applied:
+            print("ℹ️  Nenhuma migração pendente.")
+
+
+if __name__ == "__main__":
+    main()
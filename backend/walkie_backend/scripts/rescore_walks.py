@@ -0,0 +1,49 @@
+# Arquivo: backend/walkie_backend/scripts/rescore_walks.py
+# Recalcula pontos, calorias e demais métricas de todos os passeios finalizados
+# com as fórmulas atuais e reconcilia User.total_points e a tabela rankings.
+#   python scripts/rescore_walks.py --dry-run                 -> só mostra o que mudaria
+#   python scripts/rescore_walks.py --checkpoint rescore.json -> grava, salvando o progresso
+#   python scripts/rescore_walks.py --checkpoint rescore.json --resume
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ.setdefault('STUCK_WALK_SWEEP_INTERVAL', '0')
+os.environ['SCHEDULER_AUTOSTART'] = 'false'
+
+from src.main import app
+from src.services.rescoring import rescore_walks, DEFAULT_CHUNK_SIZE
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--dry-run', action='store_true')
+    parser.add_argument('--chunk', type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--checkpoint', default=None, help='arquivo JSON com o progresso')
+    parser.add_argument('--resume', action='store_true', help='continua do checkpoint')
+    args = parser.parse_args()
+    if args.resume and not args.checkpoint:
+        parser.error('--resume exige --checkpoint')
+
+    def progress(state):
+        print(f"... até o passeio {state['last_id']}: {state['scanned']} lidos, {state['changed']} alterados")
+
+    started = time.perf_counter()
+    with app.app_context():
+        summary = rescore_walks(args.chunk, args.workers, args.dry_run,
+                                args.checkpoint, args.resume, on_chunk=progress)
+
+    if args.dry_run:
+        for sample in summary['samples']:
+            print(json.dumps(sample, ensure_ascii=False, default=str))
+    print(f"{'🔎 Simulação' if args.dry_run else '✅ Concluído'}: {summary['scanned']} passeios lidos, "
+          f"{summary['changed']} alterados, {summary['points_delta']:+d} pontos "
+          f"({summary['users']} usuários) em {time.perf_counter() - started:.1f}s.")
+
+
+if __name__ == "__main__":
+    main()
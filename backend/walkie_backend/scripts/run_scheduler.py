@@ -0,0 +1,38 @@
+# Arquivo: backend/walkie_backend/scripts/run_scheduler.py
+# Processo dedicado às tarefas periódicas exclusivas (varredura de passeios
+# travados, livro de pontos, arquivo de rotas), para quando o gunicorn roda com
+# GUNICORN_SCHEDULER=off (várias máquinas): deve existir um único em toda a implantação.
+#   python scripts/run_scheduler.py          -> roda até SIGTERM/Ctrl+C, nos intervalos de cada tarefa
+#   python scripts/run_scheduler.py --once   -> uma rodada de cada tarefa e sai (cron)
+import argparse
+import os
+import signal
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ['SCHEDULER_AUTOSTART'] = 'false'
+
+# Importar de src.main cria o app e registra as tarefas no scheduler
+from src.main import job_queue, scheduler
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--once', action='store_true', help='uma rodada de cada tarefa e sai')
+    args = parser.parse_args()
+
+    if args.once:
+        scheduler.run_once()
+    else:
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            signal.signal(signum, lambda *_: scheduler.shutdown())
+        print("⏱️  Tarefas periódicas em execução (Ctrl+C para sair)...")
+        scheduler.start()
+        scheduler.wait()
+    # Badges e mapa de calor enfileirados pela varredura
+    job_queue.shutdown(wait=True)
+    print("✅ Tarefas periódicas encerradas.")
+
+
+if __name__ == "__main__":
+    main()
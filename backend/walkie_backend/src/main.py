@@ -19,15 +19,23 @@ dotenv_path = os.path.join(PROJECT_ROOT, '.env')
 # 4. Carrega o .env ANTES de qualquer outra importação do projeto
 load_dotenv(dotenv_path=dotenv_path)
 
-from flask import Flask, send_from_directory
+from flask import Flask, jsonify, send_from_directory
 from flask_cors import CORS
 from src.models.models import db
+from src.utils.database import get_database_uri, get_engine_options, configure_engine
+from src.utils.jobs import job_queue, scheduler
+from src.utils.compression import Compression
+from src.utils.instrumentation import Instrumentation
+from src.utils.health import HealthChecks
+from src.utils.read_replicas import ReadReplicas, get_replica_binds
 from src.routes.auth import auth_bp
 from src.routes.users import users_bp
 from src.routes.walks import walks_bp
 from src.routes.gamification import gamification_bp
 # ⬇️ NOVO IMPORT ⬇️
 from src.routes.admin import admin_bp 
+from src.routes.heatmap import heatmap_bp
+from src.routes.live import init_live_socket
 
 # Carrega as variáveis de ambiente do arquivo .env
 # Esta linha é redundante por causa da linha 4, mas não causa problema.
@@ -70,11 +78,19 @@ CORS(
     app, 
     origins=origins, 
     methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"], # Permite todos os métodos
-    allow_headers=["Authorization", "Content-Type"],   # Permite os headers que você precisa
+    allow_headers=["Authorization", "Content-Type", "Content-Encoding", "If-None-Match"],   # Permite os headers que você precisa
+    expose_headers=["ETag"],
     supports_credentials=True
 )
 # --- FIM DA CORREÇÃO CORS ---
 
+# Métricas por requisição (registrada antes da compressão para medir o tempo dela também)
+instrumentation = Instrumentation(app)
+# Compressão gzip/brotli das respostas (COMPRESSION_* no .env)
+Compression(app)
+# Liveness/readiness para o balanceador de carga (HEALTH_* no .env)
+health = HealthChecks(app)
+
 
 
 # Registrar blueprints
@@ -84,6 +100,9 @@ app.register_blueprint(walks_bp, url_prefix='/api/walks')
 app.register_blueprint(gamification_bp, url_prefix='/api/gamification')
 # ⬇️ NOVO REGISTRO ⬇️
 app.register_blueprint(admin_bp, url_prefix='/api/admin') 
+app.register_blueprint(heatmap_bp, url_prefix='/api/heatmap')
+# WebSocket do rastreamento ao vivo (só com flask-sock instalado)
+init_live_socket(app)
 
 
 #Blueprint para testes
@@ -94,25 +113,57 @@ app.register_blueprint(admin_bp, url_prefix='/api/admin')
 
 
 # --- CONFIGURAÇÃO CORRETA DO BANCO DE DADOS ---
-# Pega as credenciais do arquivo .env
-db_user = os.getenv('DB_USER')
-db_password = os.getenv('DB_PASSWORD')
-db_host = os.getenv('DB_HOST')
-db_name = os.getenv('DB_NAME')
-
-# Monta a string de conexão do banco de dados
-app.config['SQLALCHEMY_DATABASE_URI'] = f'mysql+mysqlconnector://{db_user}:{db_password}@{db_host}/{db_name}'
+# DATABASE_URL (ex: 'sqlite:///walkie.db') tem prioridade; senão usa as credenciais DB_* do .env
+app.config['SQLALCHEMY_DATABASE_URI'] = get_database_uri()
+# Pool configurável via DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT, DB_POOL_RECYCLE, DB_POOL_PRE_PING
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = get_engine_options(app.config['SQLALCHEMY_DATABASE_URI'])
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+# Réplicas de leitura (DATABASE_REPLICA_URLS, separadas por vírgula) viram binds replica_0, replica_1...
+app.config['SQLALCHEMY_BINDS'] = get_replica_binds()
 db.init_app(app)
+# GETs dos blueprints de leitura vão para as réplicas (REPLICA_* no .env)
+ReadReplicas(app)
 
 # Criar tabelas e popular dados iniciais
 with app.app_context():
-    db.create_all()
-
-    from src.models.models import Badge
-    if Badge.query.count() == 0:
-        from src.utils.seed_data import seed_all
-        seed_all()
+    for engine in db.engines.values():
+        configure_engine(engine)
+
+    # Tabelas, migrações (AUTO_MIGRATE=false desativa) e dados iniciais. Com
+    # DB_BOOTSTRAP=false quem prepara o banco é outro processo, uma vez só: o
+    # gunicorn roda scripts/migrate.py no mestre antes de criar os workers
+    if os.getenv('DB_BOOTSTRAP', 'true').lower() == 'true':
+        from src.utils.migrations import bootstrap_database
+        bootstrap_database(migrate=os.getenv('AUTO_MIGRATE', 'true').lower() == 'true')
+
+# Tarefas em segundo plano e varredura periódica de passeios travados
+job_queue.init_app(app)
+scheduler.init_app(app)
+
+sweep_interval = int(os.getenv('STUCK_WALK_SWEEP_INTERVAL', 900))  # segundos (0 desativa)
+if sweep_interval > 0:
+    from src.services.walk_sweeper import sweep_stuck_walks
+    scheduler.add_job('stuck_walks', sweep_interval, sweep_stuck_walks, exclusive=True)
+# Gravação em lote dos pontos do rastreamento ao vivo
+from src.services.live_tracking import live_tracker
+scheduler.add_job('live_walks', live_tracker.flush_interval, live_tracker.flush_due)
+# Compactação do livro de pontos e conferência dos saldos
+ledger_interval = int(os.getenv('LEDGER_VERIFY_INTERVAL', 3600))  # segundos (0 desativa)
+if ledger_interval > 0:
+    from src.services.points import maintain_ledger
+    scheduler.add_job('points_ledger', ledger_interval, maintain_ledger, exclusive=True)
+# Arquivo frio das rotas antigas (ROUTE_ARCHIVE_* no .env)
+archive_interval = int(os.getenv('ROUTE_ARCHIVE_INTERVAL', 86400))  # segundos (0 desativa)
+if archive_interval > 0:
+    from src.services.route_archive import maintain_route_archive
+    scheduler.add_job('route_archive', archive_interval, maintain_route_archive, exclusive=True)
+# Importar o app só inicia as tarefas do processo; as exclusivas (manutenção do banco)
+# rodam no servidor de desenvolvimento (abaixo), em um único worker do gunicorn
+# (gunicorn.conf.py, depois do fork) ou em scripts/run_scheduler.py. Scripts usam
+# SCHEDULER_AUTOSTART=false.
+scheduler_autostart = os.getenv('SCHEDULER_AUTOSTART', 'true').lower() == 'true'
+if scheduler_autostart:
+    scheduler.start(exclusive=False)
 
 @app.route('/', defaults={'path': ''})
 @app.route('/<path:path>')
@@ -121,7 +172,14 @@ def serve(path):
     if static_folder_path is None:
             return "Static folder not configured", 404
 
-    if path != "" and os.path.exists(os.path.join(static_folder_path, path)):
+    # Manifesto montado no warm-up do worker; sem ele (servidor de desenvolvimento) consulta o disco
+    manifest = app.extensions.get('static_manifest')
+    if manifest is not None:
+        exists = path in manifest
+    else:
+        exists = os.path.exists(os.path.join(static_folder_path, path))
+
+    if path != "" and exists:
         return send_from_directory(static_folder_path, path)
     else:
         index_path = os.path.join(static_folder_path, 'index.html')
@@ -159,5 +217,26 @@ def health_check():
     """Endpoint para verificar se a API está funcionando"""
     return {'status': 'OK', 'message': 'Walkie API is running!'}, 200
 
+@app.route('/api/health/live', methods=['GET'])
+def liveness_check():
+    """Liveness: o processo responde (não consulta dependências)"""
+    return jsonify(health.liveness()), 200
+
+@app.route('/api/health/ready', methods=['GET'])
+def readiness_check():
+    """Readiness: banco, pool, fila de tarefas e uploads; 503 tira o worker da rotação"""
+    result, ready = health.readiness()
+    return jsonify(result), 200 if ready else 503
+
+@app.route('/api/metrics', methods=['GET'])
+def metrics():
+    """Métricas por endpoint no formato do Prometheus"""
+    return instrumentation.metrics_response()
+
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=8000, debug=True)
\ No newline at end of file
+    # Só para desenvolvimento; em produção use o gunicorn (wsgi.py + gunicorn.conf.py)
+    debug = os.getenv('FLASK_DEBUG', 'true').lower() in ('1', 'true')
+    # Com o reloader, só o processo filho (o que atende) roda as tarefas exclusivas
+    if scheduler_autostart and (not debug or os.environ.get('WERKZEUG_RUN_MAIN') == 'true'):
+        scheduler.start(per_process=False)
+    app.run(host='0.0.0.0', port=int(os.getenv('PORT', 8000)), debug=debug)
\ No newline at end of file
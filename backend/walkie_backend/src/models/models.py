@@ -4,8 +4,10 @@
 from flask_sqlalchemy import SQLAlchemy
 from datetime import datetime
 from werkzeug.security import generate_password_hash, check_password_hash
+from src.utils.read_replicas import RoutingSession
 
-db = SQLAlchemy()
+# RoutingSession manda as leituras das requisições GET para as réplicas (DATABASE_REPLICA_URLS)
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 
 class User(db.Model):
     __tablename__ = 'users'
@@ -15,12 +17,18 @@ class User(db.Model):
     password_hash = db.Column(db.String(255), nullable=False)
     name = db.Column(db.String(100), nullable=False)
     profile_picture = db.Column(db.String(255), nullable=True)
-    total_points = db.Column(db.Integer, default=0)
+    total_points = db.Column(db.Integer, default=0, index=True)  # índice para o leaderboard
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     # ⬇️ NOVO CAMPO ADICIONADO ⬇️
     role = db.Column(db.String(10), default='user', nullable=False) # 'user' ou 'admin'
     
+    # Fuso horário IANA do usuário (usado para "hoje", "esta semana", etc.)
+    timezone = db.Column(db.String(64), nullable=False, default='America/Sao_Paulo', server_default='America/Sao_Paulo')
+    
+    # Versão dos dados do usuário (avança a cada escrita; base dos ETags das leituras)
+    data_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    
     # Relacionamentos
     pets = db.relationship('Pet', backref='owner', lazy=True, cascade='all, delete-orphan')
     walks = db.relationship('Walk', backref='user', lazy=True, cascade='all, delete-orphan')
@@ -40,7 +48,8 @@ class User(db.Model):
             'profile_picture': self.profile_picture,
             'total_points': self.total_points,
             'created_at': self.created_at.isoformat() if self.created_at else None,
-            'role': self.role  # ⬅️ CAMPO ADICIONADO AO to_dict()
+            'role': self.role,  # ⬅️ CAMPO ADICIONADO AO to_dict()
+            'timezone': self.timezone
         }
 
 class Pet(db.Model):
@@ -53,7 +62,7 @@ class Pet(db.Model):
     weight = db.Column(db.Float, nullable=True)
     profile_picture = db.Column(db.String(255), nullable=True)
     preferences = db.Column(db.Text, nullable=True)  # JSON string com preferências
-    owner_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    owner_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     # Relacionamentos
@@ -86,11 +95,37 @@ class Walk(db.Model):
     feedback = db.Column(db.Text, nullable=True)
     points_earned = db.Column(db.Integer, default=0)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
-    pet_id = db.Column(db.Integer, db.ForeignKey('pets.id'), nullable=False)
+    pet_id = db.Column(db.Integer, db.ForeignKey('pets.id'), nullable=False, index=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # Último seq de GPS gravado pelo rastreamento ao vivo (recuperação após queda)
+    last_flushed_seq = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    # Célula geohash do início da rota (ranking local)
+    start_cell = db.Column(db.String(12), nullable=True)
+    # Pontos da rota já agregados no mapa de calor (route_tiles)
+    heatmap_indexed = db.Column(db.Boolean, nullable=False, default=False, server_default='0')
+    # Resumo do percurso calculado na finalização (JSON: parciais, ritmo, tempo parado, calorias)
+    analytics = db.Column(db.Text, nullable=True)
+    # Rota movida para o arquivo frio (src/services/route_archive.py): 'segmento:offset:tamanho';
+    # com ela preenchida, route_data fica nulo
+    route_archive_ref = db.Column(db.String(255), nullable=True)
+    
+    __table_args__ = (
+        # Passeio ativo do usuário (end_time nulo)
+        db.Index('ix_walks_user_id_end_time', 'user_id', 'end_time'),
+        # Histórico, dashboard e desafios do usuário
+        db.Index('ix_walks_user_id_created_at', 'user_id', 'created_at'),
+        # Ranking semanal/mensal
+        db.Index('ix_walks_created_at', 'created_at'),
+        # Passeios abertos antigos (varredura de passeios travados)
+        db.Index('ix_walks_end_time_start_time', 'end_time', 'start_time'),
+        # Ranking local: passeios que começaram nas células vizinhas, por período
+        db.Index('ix_walks_start_cell_created_at', 'start_cell', 'created_at'),
+        # Limpeza do arquivo de rotas (referências por segmento)
+        db.Index('ix_walks_route_archive_ref', 'route_archive_ref'),
+    )
     
     def to_dict(self):
-        return {
+        data = {
             'id': self.id,
             'start_time': self.start_time.isoformat() if self.start_time else None,
             'end_time': self.end_time.isoformat() if self.end_time else None,
@@ -105,6 +140,11 @@ class Walk(db.Model):
             'pet_id': self.pet_id,
             'created_at': self.created_at.isoformat() if self.created_at else None
         }
+        if self.route_archive_ref:
+            # Rota no arquivo frio: reidratada (com cache) para a resposta continuar igual
+            from src.services.route_archive import rehydrate
+            rehydrate([data], [self.route_archive_ref])
+        return data
 
 class Badge(db.Model):
     __tablename__ = 'badges'
@@ -114,7 +154,7 @@ class Badge(db.Model):
     description = db.Column(db.Text, nullable=False)
     icon = db.Column(db.String(255), nullable=True)
     points_required = db.Column(db.Integer, default=0)
-    condition_type = db.Column(db.String(50), nullable=False)  # 'first_walk', 'daily_streak', 'distance', etc.
+    condition_type = db.Column(db.String(50), nullable=False, index=True)  # 'first_walk', 'daily_streak', 'distance', etc.
     condition_value = db.Column(db.Integer, nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
@@ -142,7 +182,16 @@ class UserBadge(db.Model):
     earned_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     # Constraint para evitar badges duplicados por usuário
-    __table_args__ = (db.UniqueConstraint('user_id', 'badge_id', name='unique_user_badge'),)
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'badge_id', name='unique_user_badge'),
+        # Badges recentes do usuário
+        db.Index('ix_user_badges_user_id_earned_at', 'user_id', 'earned_at'),
+    )
+    
+    @staticmethod
+    def serializer_options():
+        """Opções de carregamento para listas serializadas com to_dict() (evita N+1 em self.badge)"""
+        return (db.joinedload(UserBadge.badge),)
     
     def to_dict(self):
         return {
@@ -157,7 +206,7 @@ class Ranking(db.Model):
     __tablename__ = 'rankings'
     
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
     rank_type = db.Column(db.String(20), nullable=False)  # 'global' ou 'local'
     position = db.Column(db.Integer, nullable=False)
     points = db.Column(db.Integer, nullable=False)
@@ -167,6 +216,11 @@ class Ranking(db.Model):
     # Relacionamento
     user = db.relationship('User', backref='rankings')
     
+    @staticmethod
+    def serializer_options():
+        """Opções de carregamento para listas serializadas com to_dict() (evita N+1 em self.user)"""
+        return (db.joinedload(Ranking.user),)
+    
     def to_dict(self):
         return {
             'id': self.id,
@@ -177,4 +231,56 @@ class Ranking(db.Model):
             'period': self.period,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None,
             'user': self.user.to_dict() if self.user else None
-        }
\ No newline at end of file
+        }
+
+
+class RouteTile(db.Model):
+    """Contagem de passeios que passaram por cada tile (z/x/y, Web Mercator) do mapa de calor."""
+    __tablename__ = 'route_tiles'
+    
+    zoom = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    x = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    y = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    count = db.Column(db.Integer, nullable=False, default=0)
+    
+    def to_dict(self):
+        return {
+            'zoom': self.zoom,
+            'x': self.x,
+            'y': self.y,
+            'count': self.count
+        }
+
+
+class PointsEntry(db.Model):
+    """
+    Livro de pontos (só inserção): cada variação de User.total_points vira uma linha,
+    gravada na mesma transação do UPDATE atômico do saldo. O id crescente serve de
+    cursor para quem lê o fluxo de forma incremental.
+    """
+    __tablename__ = 'points_ledger'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    # Sem FK: a entrada continua válida depois que o passeio é excluído
+    walk_id = db.Column(db.Integer, nullable=True)
+    delta = db.Column(db.Integer, nullable=False)
+    reason = db.Column(db.String(32), nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    
+    __table_args__ = (
+        # Saldo e histórico de um usuário
+        db.Index('ix_points_ledger_user_id_id', 'user_id', 'id'),
+        # Ids nunca reaproveitados no SQLite (o cursor de leitura depende disso)
+        {'sqlite_autoincrement': True},
+    )
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'user_id': self.user_id,
+            'walk_id': self.walk_id,
+            'delta': self.delta,
+            'reason': self.reason,
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
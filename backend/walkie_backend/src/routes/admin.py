@@ -2,36 +2,127 @@
 # (Arquivo Novo)
 
 from flask import Blueprint, jsonify, request
-from datetime import datetime, timedelta
+from datetime import datetime
+import json
 # Importa o decorador de segurança
 from src.utils.decorators import admin_required 
 # Importa os modelos e o 'db'
 from src.models.models import User, Pet, Walk, db 
+from src.utils.database import pool_status
+from src.utils.export import EXPORT_FORMATS, stream_export
+from src.routes.walks import compute_walk_metrics
+from src.services.walk_sweeper import stuck_walks_query, sweep_stuck_walks, evaluate_badges
+from src.services.deletion import delete_user_data, delete_pet_data, run_deletion
+from src.utils.caching import bump_user_version
+from src.utils.jobs import job_queue
+from src.services.live_tracking import live_tracker
+from src.services.heatmap import index_walk
+from src.services.points import record_points, read_ledger, verify_balances, WALK_COMPLETED, WALK_DELETED
+from src.services.active_walks import clear_active_walk, invalidate_active_walks
+from src.utils.serializers import serializer_for, fast_jsonify
 
 admin_bp = Blueprint('admin', __name__)
 
+USER_EXPORT_FIELDS = ['id', 'email', 'name', 'profile_picture', 'total_points', 'created_at', 'role']
+PET_EXPORT_FIELDS = ['id', 'name', 'breed', 'age', 'weight', 'profile_picture', 'preferences', 'owner_id', 'created_at']
+
+def _parse_date_arg(name):
+    value = request.args.get(name)
+    if not value:
+        return None
+    return datetime.fromisoformat(value)
+
+def _filtered_users_query():
+    """Monta a query de usuários a partir dos filtros da querystring (role, q, created_from, created_to)."""
+    query = User.query
+    role = request.args.get('role')
+    if role:
+        query = query.filter(User.role == role)
+    search = request.args.get('q')
+    if search:
+        pattern = f"%{search}%"
+        query = query.filter(db.or_(User.name.ilike(pattern), User.email.ilike(pattern)))
+    created_from = _parse_date_arg('created_from')
+    if created_from:
+        query = query.filter(User.created_at >= created_from)
+    created_to = _parse_date_arg('created_to')
+    if created_to:
+        query = query.filter(User.created_at < created_to)
+    return query.order_by(User.id)
+
+def _filtered_pets_query():
+    """Monta a query de pets a partir dos filtros da querystring (owner_id, q)."""
+    query = Pet.query
+    owner_id = request.args.get('owner_id', type=int)
+    if owner_id:
+        query = query.filter(Pet.owner_id == owner_id)
+    search = request.args.get('q')
+    if search:
+        pattern = f"%{search}%"
+        query = query.filter(db.or_(Pet.name.ilike(pattern), Pet.breed.ilike(pattern)))
+    return query.order_by(Pet.id)
+
+def _paginated(query, key):
+    """Resposta paginada no mesmo formato do histórico de passeios."""
+    page = request.args.get('page', 1, type=int)
+    per_page = min(request.args.get('per_page', 50, type=int), 500)
+    result = query.paginate(page=page, per_page=per_page, error_out=False)
+    return jsonify({
+        key: [item.to_dict() for item in result.items],
+        'total': result.total,
+        'pages': result.pages,
+        'current_page': page
+    })
+
+def _export(query, fields, filename):
+    export_format = request.args.get('format', 'ndjson')
+    if export_format not in EXPORT_FORMATS:
+        return jsonify({"error": "Formato inválido (use 'ndjson' ou 'csv')"}), 400
+    return stream_export(query, fields, export_format, filename)
+
 # --- Gestão de Usuários ---
 @admin_bp.route("/users", methods=["GET"])
 @admin_required
 def list_users():
-    """Lista todos os usuários para a interface administrativa."""
-    users = User.query.all()
-    # User.to_dict() agora inclui 'role'
-    return jsonify([u.to_dict() for u in users])
+    """
+    Lista os usuários para a interface administrativa.
+    Com 'page' na querystring, retorna uma página; sem ela, mantém a lista completa.
+    """
+    try:
+        query = _filtered_users_query()
+    except ValueError:
+        return jsonify({"error": "Data inválida"}), 400
+    if 'page' in request.args:
+        return _paginated(query, 'users')
+    # Serializa direto das tuplas de colunas (mesma saída do User.to_dict())
+    return fast_jsonify(serializer_for(User).query(query))
+
+@admin_bp.route("/users/export", methods=["GET"])
+@admin_required
+def export_users():
+    """Exporta os usuários em streaming (format=ndjson|csv), com os mesmos filtros da listagem."""
+    try:
+        query = _filtered_users_query()
+    except ValueError:
+        return jsonify({"error": "Data inválida"}), 400
+    return _export(query, USER_EXPORT_FIELDS, 'users')
 
 @admin_bp.route("/users/<int:user_id>", methods=["DELETE"])
 @admin_required
 def delete_user(user_id):
-    """Exclui um usuário e suas entidades associadas (pets, etc.)."""
-    user = User.query.get(user_id)
-    if not user:
+    """
+    Exclui um usuário e suas entidades associadas (pets, passeios, badges, rankings).
+    Com ?background=true a exclusão é agendada e a resposta é 202.
+    """
+    if not db.session.query(User.id).filter_by(id=user_id).first():
         return jsonify({"error": "Usuário não encontrado"}), 404
     
-    # Seus modelos já estão configurados com 'cascade='all, delete-orphan'
-    # o que deve lidar com a exclusão de pets e passeios associados.
+    # DELETEs em lote no banco, sem carregar pets/passeios/badges na sessão
+    if request.args.get('background', 'false').lower() == 'true':
+        run_deletion(delete_user_data, user_id, background=True)
+        return jsonify({"message": f"Exclusão do usuário {user_id} agendada."}), 202
     
-    db.session.delete(user)
-    db.session.commit()
+    run_deletion(delete_user_data, user_id)
     # Retorno 204 (No Content) é comum para DELETE, mas 200 com msg tbm é ok.
     return jsonify({"message": f"Usuário {user_id} excluído."}), 200
 
@@ -60,6 +151,7 @@ def update_user(user_id):
             return jsonify({"error": "Email já em uso"}), 409
         user.email = data['email']
     
+    bump_user_version(user_id)
     db.session.commit()
     return jsonify(user.to_dict()), 200
 
@@ -67,20 +159,33 @@ def update_user(user_id):
 @admin_bp.route("/pets", methods=["GET"])
 @admin_required
 def list_all_pets():
-    """Lista todos os pets cadastrados no sistema."""
-    pets = Pet.query.all()
-    return jsonify([p.to_dict() for p in pets])
+    """
+    Lista os pets cadastrados no sistema.
+    Com 'page' na querystring, retorna uma página; sem ela, mantém a lista completa.
+    """
+    query = _filtered_pets_query()
+    if 'page' in request.args:
+        return _paginated(query, 'pets')
+    return fast_jsonify(serializer_for(Pet).query(query))
+
+@admin_bp.route("/pets/export", methods=["GET"])
+@admin_required
+def export_pets():
+    """Exporta os pets em streaming (format=ndjson|csv), com os mesmos filtros da listagem."""
+    return _export(_filtered_pets_query(), PET_EXPORT_FIELDS, 'pets')
 
 @admin_bp.route("/pets/<int:pet_id>", methods=["DELETE"])
 @admin_required
 def delete_pet(pet_id):
-    """Exclui um pet do sistema."""
-    pet = Pet.query.get(pet_id)
-    if not pet:
+    """Exclui um pet do sistema, junto com seus passeios (?background=true agenda a exclusão)."""
+    if not db.session.query(Pet.id).filter_by(id=pet_id).first():
         return jsonify({"error": "Pet não encontrado"}), 404
     
-    db.session.delete(pet)
-    db.session.commit()
+    if request.args.get('background', 'false').lower() == 'true':
+        run_deletion(delete_pet_data, pet_id, background=True)
+        return jsonify({"message": f"Exclusão do pet {pet_id} agendada."}), 202
+    
+    run_deletion(delete_pet_data, pet_id)
     return jsonify({"message": f"Pet {pet_id} excluído."}), 200
 
 # --- Gestão de Passeios (Foco em Travados) ---
@@ -88,17 +193,22 @@ def delete_pet(pet_id):
 @admin_required
 def list_stuck_walks():
     """
-    Lista passeios 'abertos' (end_time is null) há mais de 4 horas.
+    Lista passeios 'abertos' (end_time is null) há mais de 4 horas
+    (ou STUCK_WALK_MAX_AGE_HOURS / ?hours=).
     """
-    # 4 horas de limite
-    four_hours_ago = datetime.utcnow() - timedelta(hours=4)
-    
-    stuck_walks = Walk.query.filter(
-        Walk.end_time == None, 
-        Walk.start_time < four_hours_ago
-    ).all()
-    
-    return jsonify([w.to_dict() for w in stuck_walks])
+    max_age_hours = request.args.get('hours', type=float)
+    return fast_jsonify(serializer_for(Walk).query(stuck_walks_query(max_age_hours)))
+
+@admin_bp.route("/walks/sweep", methods=["POST"])
+@admin_required
+def sweep_walks():
+    """Finaliza em lote todos os passeios travados (mesma rotina da varredura agendada)."""
+    max_age_hours = request.args.get('hours', type=float)
+    result = sweep_stuck_walks(max_age_hours)
+    return jsonify({
+        "message": f"{len(result['finalized_walks'])} passeio(s) finalizado(s).",
+        **result
+    }), 200
 
 @admin_bp.route("/walks/<int:walk_id>/complete", methods=["POST"])
 @admin_required
@@ -113,12 +223,22 @@ def complete_walk(walk_id):
     
     # Define o fim do passeio como agora
     walk.end_time = datetime.utcnow()
-    # Calcula a duração
-    duration_seconds = (walk.end_time - walk.start_time).total_seconds()
-    walk.duration = int(duration_seconds)
-    # Você pode adicionar lógicas de pontos aqui se desejar
+    # Calcula duração, distância, calorias e pontos como no finish_walk
+    route_points = live_tracker.take_route(walk.id)
+    if route_points:
+        walk.route_data = json.dumps(route_points)
+    else:
+        route_points = json.loads(walk.route_data) if walk.route_data else None
+    metrics = compute_walk_metrics(walk.start_time, walk.end_time, route_points)
+    for field, value in metrics.items():
+        setattr(walk, field, value)
+    record_points([(walk.user_id, walk.points_earned, WALK_COMPLETED, walk.id)])
     
+    bump_user_version(walk.user_id)
     db.session.commit()
+    clear_active_walk(walk.user_id)
+    job_queue.enqueue(evaluate_badges, walk.user_id, key=('badges', walk.user_id))
+    job_queue.enqueue(index_walk, walk_id, key=('heatmap', walk_id))
     return jsonify({"message": f"Passeio {walk_id} concluído com sucesso."}), 200
 
 @admin_bp.route("/walks/<int:walk_id>", methods=["DELETE"])
@@ -129,6 +249,41 @@ def delete_walk(walk_id):
     if not walk:
         return jsonify({"error": "Passeio não encontrado"}), 404
     
+    live_tracker.discard(walk.id)
+    user_id = walk.user_id
+    # Desconta os pontos que o passeio tinha dado
+    record_points([(user_id, -(walk.points_earned or 0), WALK_DELETED, walk.id)])
+    bump_user_version(user_id)
     db.session.delete(walk)
     db.session.commit()
-    return jsonify({"message": f"Passeio {walk_id} excluído."}), 200
\ No newline at end of file
+    invalidate_active_walks(user_id)
+    return jsonify({"message": f"Passeio {walk_id} excluído."}), 200
+
+# --- Livro de Pontos ---
+@admin_bp.route("/points/ledger", methods=["GET"])
+@admin_required
+def get_points_ledger():
+    """Entradas do livro de pontos depois de ?after= (cursor), até ?limit= (máx. 1000)."""
+    after_id = request.args.get('after', 0, type=int)
+    limit = min(max(request.args.get('limit', 500, type=int), 1), 1000)
+    entries, cursor = read_ledger(after_id, limit)
+    return jsonify({'entries': [entry.to_dict() for entry in entries], 'cursor': cursor}), 200
+
+@admin_bp.route("/points/verify", methods=["POST"])
+@admin_required
+def verify_points():
+    """Confere User.total_points contra o livro; ?repair=true corrige os saldos divergentes."""
+    repair = request.args.get('repair', 'false').lower() == 'true'
+    mismatches = verify_balances(repair=repair)
+    return jsonify({
+        'mismatches': [{'user_id': user_id, 'total_points': balance, 'ledger_total': int(total)}
+                       for user_id, balance, total in mismatches],
+        'repaired': repair
+    }), 200
+
+# --- Banco de Dados ---
+@admin_bp.route("/db/pool", methods=["GET"])
+@admin_required
+def get_pool_status():
+    """Retorna estatísticas do pool de conexões do banco."""
+    return jsonify(pool_status(db.engine)), 200
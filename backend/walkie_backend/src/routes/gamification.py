@@ -1,17 +1,21 @@
 from flask import Blueprint, request, jsonify
-from src.models.models import db, User, Badge, UserBadge, Ranking, Walk
+from src.models.models import db, User, UserBadge, Ranking, Walk
 from src.routes.users import token_required
-from datetime import datetime, timedelta
 from sqlalchemy import desc, func
+from src.utils.caching import conditional_get
+from src.services.badge_catalog import get_badge_catalog
+from src.utils.geohash import encode, neighbors
+from src.utils.time_windows import user_zone, day_range, week_range, month_range, in_range
 
 gamification_bp = Blueprint('gamification', __name__)
 
 @gamification_bp.route('/badges', methods=['GET'])
 @token_required
+@conditional_get('badges')
 def get_available_badges(current_user):
     """Obter todos os badges disponíveis"""
     try:
-        badges = Badge.query.all()
+        badges = get_badge_catalog()
         
         # Verificar quais badges o usuário já possui
         user_badges = UserBadge.query.filter_by(user_id=current_user.id).all()
@@ -19,13 +23,13 @@ def get_available_badges(current_user):
         
         badges_data = []
         for badge in badges:
-            badge_dict = badge.to_dict()
-            badge_dict['earned'] = badge.id in user_badge_ids
+            badge_dict = dict(badge)  # cópia: o catálogo é compartilhado entre as requisições
+            badge_dict['earned'] = badge['id'] in user_badge_ids
             badge_dict['earned_at'] = None
             
             # Se o usuário possui o badge, adicionar data de conquista
-            if badge.id in user_badge_ids:
-                user_badge = next(ub for ub in user_badges if ub.badge_id == badge.id)
+            if badge['id'] in user_badge_ids:
+                user_badge = next(ub for ub in user_badges if ub.badge_id == badge['id'])
                 badge_dict['earned_at'] = user_badge.earned_at.isoformat()
             
             badges_data.append(badge_dict)
@@ -37,10 +41,12 @@ def get_available_badges(current_user):
 
 @gamification_bp.route('/my-badges', methods=['GET'])
 @token_required
+@conditional_get('my-badges')
 def get_user_badges(current_user):
     """Obter badges conquistados pelo usuário"""
     try:
-        user_badges = UserBadge.query.filter_by(user_id=current_user.id)\
+        user_badges = UserBadge.query.options(*UserBadge.serializer_options())\
+                                    .filter_by(user_id=current_user.id)\
                                     .order_by(UserBadge.earned_at.desc()).all()
         
         return jsonify([ub.to_dict() for ub in user_badges]), 200
@@ -48,6 +54,24 @@ def get_user_badges(current_user):
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def period_window(period, zone):
+    """Janela UTC do ranking no fuso 'zone': 'weekly' = semana local, 'monthly' = mês local, senão None (todo o período)."""
+    if period == 'weekly':
+        return week_range(zone)
+    if period == 'monthly':
+        return month_range(zone)
+    return None
+
+def _local_cell(current_user):
+    """Célula geohash do usuário: ?lat=&lng= da requisição ou o início do último passeio com rota."""
+    lat = request.args.get('lat', type=float)
+    lng = request.args.get('lng', type=float)
+    if lat is not None and lng is not None and -90 <= lat <= 90 and -180 <= lng <= 180:
+        return encode(lat, lng)
+    return db.session.query(Walk.start_cell)\
+                     .filter(Walk.user_id == current_user.id, Walk.start_cell.isnot(None))\
+                     .order_by(Walk.created_at.desc()).limit(1).scalar()
+
 @gamification_bp.route('/ranking', methods=['GET'])
 @token_required
 def get_ranking(current_user):
@@ -57,21 +81,35 @@ def get_ranking(current_user):
         period = request.args.get('period', 'all_time')  # 'weekly', 'monthly', 'all_time'
         limit = request.args.get('limit', 50, type=int)
         
+        # Filtros aplicados aos passeios somados (período e, no ranking local, região)
+        filters = []
+        # Semana/mês corrente no fuso de quem consulta (como os desafios e o dashboard)
+        window = period_window(period, user_zone(current_user))
+        if window is not None:
+            filters.append(in_range(Walk.created_at, window))
+        
+        cell = None
+        if rank_type == 'local':
+            cell = _local_cell(current_user)
+            if cell is None:
+                # Sem localização conhecida (nenhum passeio com rota e sem lat/lng)
+                return jsonify({
+                    'ranking': [],
+                    'current_user_position': None,
+                    'period': period,
+                    'type': rank_type,
+                    'cell': None
+                }), 200
+            # Só passeios iniciados na célula do usuário e nas vizinhas (índice start_cell, created_at)
+            filters.append(Walk.start_cell.in_(neighbors(cell)))
+        
         # Calcular pontos baseado no período
         query = db.session.query(
             User.id,
             User.name,
             User.profile_picture,
             func.sum(Walk.points_earned).label('total_points')
-        ).join(Walk, User.id == Walk.user_id)
-        
-        # Filtrar por período
-        if period == 'weekly':
-            week_ago = datetime.utcnow() - timedelta(days=7)
-            query = query.filter(Walk.created_at >= week_ago)
-        elif period == 'monthly':
-            month_ago = datetime.utcnow() - timedelta(days=30)
-            query = query.filter(Walk.created_at >= month_ago)
+        ).join(Walk, User.id == Walk.user_id).filter(*filters)
         
         # Agrupar e ordenar
         ranking_data = query.group_by(User.id, User.name, User.profile_picture)\
@@ -99,40 +137,29 @@ def get_ranking(current_user):
         
         if not current_user_position:
             # Calcular posição do usuário atual
-            user_points_query = db.session.query(func.sum(Walk.points_earned))\
-                                         .filter_by(user_id=current_user.id)
-            
-            if period == 'weekly':
-                week_ago = datetime.utcnow() - timedelta(days=7)
-                user_points_query = user_points_query.filter(Walk.created_at >= week_ago)
-            elif period == 'monthly':
-                month_ago = datetime.utcnow() - timedelta(days=30)
-                user_points_query = user_points_query.filter(Walk.created_at >= month_ago)
-            
-            user_points = user_points_query.scalar() or 0
+            user_points = db.session.query(func.sum(Walk.points_earned))\
+                                    .filter(Walk.user_id == current_user.id, *filters).scalar() or 0
             
             # Contar quantos usuários têm mais pontos
-            better_users_query = db.session.query(func.count(func.distinct(User.id)))\
-                                          .join(Walk, User.id == Walk.user_id)
-            
-            if period == 'weekly':
-                better_users_query = better_users_query.filter(Walk.created_at >= week_ago)
-            elif period == 'monthly':
-                better_users_query = better_users_query.filter(Walk.created_at >= month_ago)
-            
-            better_users_subquery = better_users_query.group_by(User.id)\
-                                                     .having(func.sum(Walk.points_earned) > user_points)\
-                                                     .subquery()
+            better_users_subquery = db.session.query(func.count(func.distinct(User.id)))\
+                                              .join(Walk, User.id == Walk.user_id)\
+                                              .filter(*filters)\
+                                              .group_by(User.id)\
+                                              .having(func.sum(Walk.points_earned) > user_points)\
+                                              .subquery()
             
             better_users_count = db.session.query(func.count()).select_from(better_users_subquery).scalar()
             current_user_position = better_users_count + 1
         
-        return jsonify({
+        response = {
             'ranking': ranking,
             'current_user_position': current_user_position,
             'period': period,
             'type': rank_type
-        }), 200
+        }
+        if rank_type == 'local':
+            response['cell'] = cell
+        return jsonify(response), 200
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -178,29 +205,26 @@ def get_challenges(current_user):
             }
         ]
         
-        # Calcular progresso real dos desafios
-        from datetime import date
-        today = date.today()
+        # Calcular progresso real dos desafios (dia/semana/mês no fuso do usuário)
+        zone = user_zone(current_user)
         
         # Desafio diário
         today_walks = Walk.query.filter_by(user_id=current_user.id)\
-                               .filter(func.date(Walk.created_at) == today).count()
+                               .filter(in_range(Walk.created_at, day_range(zone))).count()
         challenges[0]['progress'] = today_walks
         challenges[0]['completed'] = today_walks >= 1
         
         # Desafio semanal
-        week_start = today - timedelta(days=today.weekday())
         week_distance = db.session.query(func.sum(Walk.distance))\
                                  .filter_by(user_id=current_user.id)\
-                                 .filter(Walk.created_at >= week_start).scalar() or 0
+                                 .filter(in_range(Walk.created_at, week_range(zone))).scalar() or 0
         challenges[1]['progress'] = int(week_distance)
         challenges[1]['completed'] = week_distance >= 10000
         
         # Desafio mensal
-        month_start = today.replace(day=1)
         month_distance = db.session.query(func.sum(Walk.distance))\
                                   .filter_by(user_id=current_user.id)\
-                                  .filter(Walk.created_at >= month_start).scalar() or 0
+                                  .filter(in_range(Walk.created_at, month_range(zone))).scalar() or 0
         challenges[2]['progress'] = int(month_distance)
         challenges[2]['completed'] = month_distance >= 50000
         
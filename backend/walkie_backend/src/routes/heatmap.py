@@ -0,0 +1,38 @@
+# Em: backend/walkie_backend/src/routes/heatmap.py
+# (Arquivo Novo)
+
+from flask import Blueprint, jsonify
+from src.routes.users import token_required
+from src.services.heatmap import HEATMAP_MIN_ZOOM, HEATMAP_MAX_ZOOM, TILE_DETAIL, tile_cells
+
+heatmap_bp = Blueprint('heatmap', __name__)
+
+@heatmap_bp.route('/tiles/<int:zoom>/<int:x>/<int:y>', methods=['GET'])
+@token_required
+def get_heatmap_tile(current_user, zoom, x, y):
+    """Contagens pré-calculadas de passeios nas células de um tile z/x/y do mapa"""
+    try:
+        if not HEATMAP_MIN_ZOOM - TILE_DETAIL <= zoom <= HEATMAP_MAX_ZOOM:
+            return jsonify({
+                'error': f'Zoom deve estar entre {HEATMAP_MIN_ZOOM - TILE_DETAIL} e {HEATMAP_MAX_ZOOM}'
+            }), 400
+        
+        if x >= (1 << zoom) or y >= (1 << zoom):
+            return jsonify({'error': 'Tile fora do mapa'}), 400
+        
+        cell_zoom, cells = tile_cells(zoom, x, y)
+        
+        response = jsonify({
+            'zoom': zoom,
+            'x': x,
+            'y': y,
+            'cell_zoom': cell_zoom,
+            'cells': cells,
+            'max_count': max((cell['count'] for cell in cells), default=0)
+        })
+        # As contagens mudam devagar: o cliente pode reutilizar o tile por alguns minutos
+        response.headers['Cache-Control'] = 'private, max-age=300'
+        return response, 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
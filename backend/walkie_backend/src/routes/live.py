@@ -0,0 +1,116 @@
+# Em: backend/walkie_backend/src/routes/live.py
+# (Arquivo Novo)
+#
+# Canal WebSocket do rastreamento ao vivo: /api/walks/<id>/stream
+# A primeira mensagem autentica: {"token": "<jwt>"} (nunca na URL, que vai para o
+# log de acesso); a resposta é o status {"last_seq", "flushed_seq", ...} para o
+# cliente retomar. Depois o cliente envia {"points": [{"seq", "lat", "lng",
+# "timestamp"?}, ...]} e recebe em cada uma a mesma confirmação. Sem a
+# autenticação em LIVE_AUTH_TIMEOUT segundos o socket é fechado. Sem flask-sock
+# instalado, o cliente usa o POST /api/walks/<id>/points.
+#
+# Cada socket ocupa uma thread do worker durante o passeio inteiro: LIVE_SOCKET_MAX
+# limita os sockets simultâneos por processo (o gunicorn.conf.py reserva essas
+# threads além das de HTTP; 0 recusa todos). Acima do limite o socket é fechado
+# e o cliente usa o POST /api/walks/<id>/points.
+
+import json
+import logging
+import os
+import threading
+from src.models.models import db, User, Walk
+from src.routes.auth import verify_token
+from src.services.live_tracking import live_tracker, InvalidPointsError
+
+try:
+    from flask_sock import Sock, ConnectionClosed
+except ImportError:  # flask-sock é opcional
+    Sock = None
+
+logger = logging.getLogger(__name__)
+
+
+LIVE_AUTH_TIMEOUT = float(os.getenv('LIVE_AUTH_TIMEOUT', '10'))
+
+
+def _open_walk(walk_id, message):
+    """Autentica pela primeira mensagem {"token"} e retorna o passeio aberto do usuário, ou None."""
+    try:
+        data = json.loads(message) if message else None
+    except ValueError:
+        data = None
+    token = data.get('token') if isinstance(data, dict) else None
+    if not isinstance(token, str):
+        return None
+    if token.startswith('Bearer '):
+        token = token[7:]
+    user_id = verify_token(token) if token else None
+    if not user_id or not db.session.get(User, user_id):
+        return None
+    return Walk.query.filter_by(id=walk_id, user_id=user_id, end_time=None).first()
+
+
+def _handle_message(state, message):
+    try:
+        data = json.loads(message)
+        return live_tracker.push(state, data.get('points') if isinstance(data, dict) else None)
+    except (ValueError, InvalidPointsError) as e:
+        db.session.rollback()
+        return {'error': str(e)}
+
+
+def init_live_socket(app):
+    """Registra a rota WebSocket se o flask-sock estiver instalado. Retorna True se registrou."""
+    if Sock is None:
+        return False
+
+    sock = Sock(app)
+    max_sockets = os.getenv('LIVE_SOCKET_MAX', '')
+    slots = threading.BoundedSemaphore(int(max_sockets)) if max_sockets.strip() else None
+
+    @sock.route('/api/walks/<int:walk_id>/stream')
+    def walk_stream(ws, walk_id):
+        if slots is not None and not slots.acquire(blocking=False):
+            ws.send(json.dumps({'error': 'Limite de conexões ao vivo atingido; use POST /api/walks/<id>/points'}))
+            ws.close()
+            return
+        try:
+            _stream(ws, walk_id)
+        finally:
+            if slots is not None:
+                slots.release()
+
+    def _stream(ws, walk_id):
+        try:
+            walk = _open_walk(walk_id, ws.receive(timeout=LIVE_AUTH_TIMEOUT))
+        except ConnectionClosed:
+            return
+        if walk is None:
+            db.session.close()
+            ws.send(json.dumps({'error': 'Passeio não encontrado ou token inválido'}))
+            ws.close()
+            return
+        state = live_tracker.open(walk)
+        # Não prende uma conexão do pool enquanto o socket estiver aberto
+        db.session.close()
+        ws.send(json.dumps(state.status()))
+
+        try:
+            while True:
+                message = ws.receive()
+                if message is None:
+                    break
+                ws.send(json.dumps(_handle_message(state, message)))
+                db.session.close()
+        except ConnectionClosed:
+            pass
+        finally:
+            # Cliente desconectou: grava o que estiver pendente
+            try:
+                live_tracker.flush(walk_id)
+            except Exception:
+                db.session.rollback()
+                logger.exception("Erro ao gravar pontos do passeio %s", walk_id)
+
+    app.extensions['live_socket'] = sock
+    return True
@@ -4,6 +4,12 @@ from flask import Blueprint, request, jsonify
 # Importe os models corretos
 from src.models.models import db, User, Pet, Walk, UserBadge 
 from src.routes.auth import verify_token
+from src.services.deletion import delete_pet_data
+from src.services.route_archive import ArchiveUnavailableError, archive_unavailable_response
+from src.utils.time_windows import user_zone, day_range, in_range, is_valid_timezone
+from src.utils.parallel import run_parallel
+from src.utils.read_replicas import reading_from_replica, use_primary
+from src.utils.caching import bump_user_version, conditional_get
 from functools import wraps
 from werkzeug.utils import secure_filename
 from dotenv import load_dotenv
@@ -47,6 +53,10 @@ def token_required(f):
                 return jsonify({'error': 'Token inválido'}), 401
             
             current_user = User.query.get(user_id)
+            if not current_user and reading_from_replica():
+                # Conta recém-criada que a réplica ainda não recebeu
+                with use_primary():
+                    current_user = User.query.get(user_id)
             if not current_user:
                 return jsonify({'error': 'Usuário não encontrado'}), 404
             
@@ -60,6 +70,7 @@ def token_required(f):
 # --- Rotas de Perfil (Sem alteração) ---
 @users_bp.route('/profile', methods=['GET'])
 @token_required
+@conditional_get('profile')
 def get_profile(current_user):
     """Obter perfil do usuário logado"""
     try:
@@ -85,13 +96,18 @@ def get_profile(current_user):
 @users_bp.route('/profile', methods=['PUT'])
 @token_required
 def update_profile(current_user):
-    """Atualizar perfil do usuário (APENAS DADOS DE TEXTO, ex: nome)"""
+    """Atualizar perfil do usuário (APENAS DADOS DE TEXTO, ex: nome e fuso horário)"""
     try:
         data = request.get_json()
         
         if data.get('name'):
             current_user.name = data['name']
+        if data.get('timezone'):
+            if not is_valid_timezone(data['timezone']):
+                return jsonify({'error': 'Fuso horário inválido'}), 400
+            current_user.timezone = data['timezone']
         
+        bump_user_version(current_user.id)
         db.session.commit()
         
         return jsonify({
@@ -130,6 +146,7 @@ def upload_profile_picture(current_user):
         # --- FIM DA CORREÇÃO ---
 
         current_user.profile_picture = file_url
+        bump_user_version(current_user.id)
         db.session.commit()
 
         return jsonify({
@@ -173,6 +190,7 @@ def create_pet(current_user):
         )
         
         db.session.add(pet)
+        bump_user_version(current_user.id)
         db.session.commit()
         
         return jsonify({
@@ -208,6 +226,7 @@ def update_pet(current_user, pet_id):
             pet.preferences = data['preferences']
         # profile_picture é ignorado aqui, será salvo via upload
         
+        bump_user_version(current_user.id)
         db.session.commit()
         
         return jsonify({
@@ -229,8 +248,8 @@ def delete_pet(current_user, pet_id):
         if not pet:
             return jsonify({'error': 'Pet não encontrado'}), 404
         
-        db.session.delete(pet)
-        db.session.commit()
+        # Remove o pet e seus passeios com DELETEs em lote
+        delete_pet_data(pet.id)
         
         return jsonify({'message': 'Pet removido com sucesso'}), 200
         
@@ -277,6 +296,7 @@ def upload_pet_picture(current_user, pet_id):
 
         # 4. Atualiza o pet no banco
         pet.profile_picture = file_url
+        bump_user_version(current_user.id)
         db.session.commit()
 
         return jsonify({
@@ -286,41 +306,61 @@ def upload_pet_picture(current_user, pet_id):
     else:
         return jsonify({"error": "Tipo de arquivo não permitido"}), 400
 
-# --- Rota de Dashboard (Sem alteração) ---
+# --- Rota de Dashboard ---
 @users_bp.route('/dashboard', methods=['GET'])
 @token_required
 def get_dashboard(current_user):
-    """Obter dados do dashboard"""
+    """
+    Obter dados do dashboard.
+    Orçamento: 3 queries (autenticação + passeios recentes com as estatísticas do dia
+    + badges recentes com o badge já carregado); as duas leituras rodam em paralelo.
+    """
     try:
-        # Últimos passeios
-        recent_walks = Walk.query.filter_by(user_id=current_user.id)\
-                                .order_by(Walk.created_at.desc())\
-                                .limit(5).all()
-        
-        # Estatísticas do dia atual
-        from datetime import date
-        today = date.today()
-        today_walks = Walk.query.filter_by(user_id=current_user.id)\
-                               .filter(db.func.date(Walk.created_at) == today).all()
+        user_id = current_user.id
+        today_window = day_range(user_zone(current_user))
+        
+        def load_walks_and_today_stats():
+            # Últimos passeios + agregados do dia (no fuso do usuário) na mesma ida ao banco
+            def today_aggregate(expression):
+                return db.session.query(expression)\
+                                 .filter(Walk.user_id == user_id, in_range(Walk.created_at, today_window))\
+                                 .correlate(None).scalar_subquery()
+            
+            rows = db.session.query(
+                Walk,
+                today_aggregate(db.func.count(Walk.id)),
+                today_aggregate(db.func.sum(Walk.distance)),
+                today_aggregate(db.func.sum(Walk.points_earned))
+            ).filter(Walk.user_id == user_id)\
+             .order_by(Walk.created_at.desc())\
+             .limit(5).all()
+            
+            # Sem nenhum passeio também não há passeios hoje
+            walks_count, distance, points = rows[0][1:] if rows else (0, 0, 0)
+            return [row[0].to_dict() for row in rows], {
+                'walks_count': walks_count,
+                'distance': round((distance or 0) / 1000, 2),  # em km
+                'points': int(points or 0)
+            }
         
-        today_distance = sum([walk.distance or 0 for walk in today_walks]) / 1000  # em km
-        today_points = sum([walk.points_earned or 0 for walk in today_walks])
+        def load_recent_badges():
+            recent_badges = UserBadge.query.options(*UserBadge.serializer_options())\
+                                          .filter_by(user_id=user_id)\
+                                          .order_by(UserBadge.earned_at.desc())\
+                                          .limit(3).all()
+            return [badge.to_dict() for badge in recent_badges]
         
-        # Badges recentes
-        recent_badges = UserBadge.query.filter_by(user_id=current_user.id)\
-                                      .order_by(UserBadge.earned_at.desc())\
-                                      .limit(3).all()
+        (recent_walks, today_stats), recent_badges = run_parallel(load_walks_and_today_stats, load_recent_badges)
         
         return jsonify({
-            'recent_walks': [walk.to_dict() for walk in recent_walks],
-            'today_stats': {
-                'walks_count': len(today_walks),
-                'distance': round(today_distance, 2),
-                'points': today_points
-            },
-            'recent_badges': [badge.to_dict() for badge in recent_badges],
+            'recent_walks': recent_walks,
+            'today_stats': today_stats,
+            'recent_badges': recent_badges,
             'total_points': current_user.total_points
         }), 200
         
+    except ArchiveUnavailableError:
+        # Passeios recentes arquivados (usuário sem passeios novos) e arquivo indisponível
+        return archive_unavailable_response()
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
\ No newline at end of file
+        return jsonify({'error': str(e)}), 500
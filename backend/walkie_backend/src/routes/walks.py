@@ -1,7 +1,20 @@
 from flask import Blueprint, request, jsonify
-from src.models.models import db, User, Pet, Walk, Badge, UserBadge
+from src.models.models import db, User, Pet, Walk, UserBadge
 from src.routes.users import token_required
-from datetime import datetime
+from src.utils.serializers import serializer_for, fast_jsonify
+from src.utils.caching import bump_user_version, conditional_get
+from src.utils.compression import get_request_json, RequestBodyError
+from src.services.live_tracking import live_tracker, InvalidPointsError
+from src.services.heatmap import index_walk
+from src.services.points import record_points, WALK_FINISHED
+from src.services.badge_catalog import find_badges
+from src.services.route_archive import ArchiveUnavailableError, archive_unavailable_response, rehydrate
+from src.services.walk_analytics import met_for_speed, compute_walk_analytics, dumps_analytics
+from src.utils.jobs import job_queue
+from src.services.active_walks import get_active_walk_id, active_walk_id_for_start, set_active_walk, clear_active_walk, invalidate_active_walks
+from src.utils.geohash import route_start_cell
+from src.utils.time_windows import user_zone, local_today, local_date_range, to_local_date, in_range
+from datetime import datetime, timedelta
 import json
 import math
 
@@ -33,14 +46,7 @@ def calculate_calories(distance_m, duration_s, weight_kg=70):
     speed_kmh = (distance_m / 1000) / (duration_s / 3600)
     
     # Ajustar MET baseado na velocidade
-    if speed_kmh < 3:
-        met = 2.5
-    elif speed_kmh < 5:
-        met = 3.5
-    elif speed_kmh < 6:
-        met = 4.3
-    else:
-        met = 5.0
+    met = met_for_speed(speed_kmh)
     
     hours = duration_s / 3600
     calories = met * weight_kg * hours
@@ -55,52 +61,121 @@ def calculate_points(distance_m, duration_s):
     
     return distance_points + duration_points
 
+def calculate_route_distance(route_points):
+    """Calcula a distância total (em metros) de uma lista de pontos {'lat', 'lng'}"""
+    total_distance = 0
+    
+    for i in range(1, len(route_points)):
+        prev_point = route_points[i-1]
+        curr_point = route_points[i]
+        
+        total_distance += calculate_distance(
+            prev_point['lat'], prev_point['lng'],
+            curr_point['lat'], curr_point['lng']
+        )
+    
+    return total_distance
+
+def compute_walk_metrics(start_time, end_time, route_points=None):
+    """
+    Calcula as métricas de um passeio finalizado (duração, distância, ritmo, calorias, pontos,
+    célula geohash de início e o resumo de análise do percurso).
+    Usado pelo finish_walk e pela finalização automática de passeios travados.
+    """
+    metrics = {
+        'duration': int((end_time - start_time).total_seconds()),
+        'distance': None,
+        'average_pace': None,
+        'calories': None,
+        'points_earned': 0,
+        'start_cell': None,
+        'analytics': None
+    }
+    
+    # Calcular distância e célula de início se houver dados de rota
+    if route_points:
+        metrics['distance'] = calculate_route_distance(route_points)
+        metrics['start_cell'] = route_start_cell(route_points)
+    
+    distance = metrics['distance']
+    duration = metrics['duration']
+    if distance and duration:
+        # Ritmo médio (min/km)
+        metrics['average_pace'] = (duration / 60) / (distance / 1000)
+        
+        # Calorias (assumindo peso médio de 70kg): somadas por trecho quando a rota permite
+        analytics = compute_walk_analytics(route_points, start_time, end_time)
+        if analytics:
+            metrics['analytics'] = dumps_analytics(analytics)
+            metrics['calories'] = analytics['calories']
+        else:
+            metrics['calories'] = calculate_calories(distance, duration)
+        
+        # Pontos
+        metrics['points_earned'] = calculate_points(distance, duration)
+    
+    return metrics
+
 def check_and_award_badges(user_id):
     """Verifica e concede badges baseado nas atividades do usuário"""
     user = User.query.get(user_id)
     if not user:
         return
     
-    # Verificar badge de primeiro passeio
-    first_walk_badge = Badge.query.filter_by(condition_type='first_walk').first()
+    # Badges que o usuário já possui (uma query, em vez de uma por badge verificado)
+    earned_badge_ids = {
+        badge_id for (badge_id,) in db.session.query(UserBadge.badge_id).filter_by(user_id=user_id)
+    }
+    awarded = []
+    
+    def award(badge):
+        if badge['id'] not in earned_badge_ids:
+            if not awarded:
+                bump_user_version(user_id)
+            db.session.add(UserBadge(user_id=user_id, badge_id=badge['id']))
+            earned_badge_ids.add(badge['id'])
+            awarded.append(badge['id'])
+    
+    # Verificar badge de primeiro passeio (badges vêm do catálogo em memória)
+    first_walk_badge = next(iter(find_badges('first_walk')), None)
     if first_walk_badge:
-        existing_badge = UserBadge.query.filter_by(user_id=user_id, badge_id=first_walk_badge.id).first()
-        if not existing_badge:
-            user_badge = UserBadge(user_id=user_id, badge_id=first_walk_badge.id)
-            db.session.add(user_badge)
+        award(first_walk_badge)
     
-    # Verificar badge de streak diário (7 dias consecutivos)
-    from datetime import date, timedelta
-    today = date.today()
+    # Verificar badge de streak diário (7 dias consecutivos, no fuso do usuário)
+    zone = user_zone(user)
+    today = local_today(zone)
+    window = local_date_range(zone, today - timedelta(days=6), today)
+    walk_days = {
+        to_local_date(created_at, zone)
+        for (created_at,) in db.session.query(Walk.created_at)
+                                       .filter(Walk.user_id == user_id, in_range(Walk.created_at, window))
+    }
     streak_days = 0
     
     for i in range(7):
         check_date = today - timedelta(days=i)
-        day_walks = Walk.query.filter_by(user_id=user_id)\
-                             .filter(db.func.date(Walk.created_at) == check_date).first()
-        if day_walks:
+        if check_date in walk_days:
             streak_days += 1
         else:
             break
     
     if streak_days >= 7:
-        streak_badge = Badge.query.filter_by(condition_type='daily_streak', condition_value=7).first()
+        streak_badge = next(iter(find_badges('daily_streak', 7)), None)
         if streak_badge:
-            existing_badge = UserBadge.query.filter_by(user_id=user_id, badge_id=streak_badge.id).first()
-            if not existing_badge:
-                user_badge = UserBadge(user_id=user_id, badge_id=streak_badge.id)
-                db.session.add(user_badge)
+            award(streak_badge)
     
     # Verificar badges de distância
     total_distance = db.session.query(db.func.sum(Walk.distance)).filter_by(user_id=user_id).scalar() or 0
     
-    distance_badges = Badge.query.filter_by(condition_type='total_distance').all()
+    distance_badges = find_badges('total_distance')
     for badge in distance_badges:
-        if total_distance >= (badge.condition_value * 1000):  # condition_value em km
-            existing_badge = UserBadge.query.filter_by(user_id=user_id, badge_id=badge.id).first()
-            if not existing_badge:
-                user_badge = UserBadge(user_id=user_id, badge_id=badge.id)
-                db.session.add(user_badge)
+        if total_distance >= (badge['condition_value'] * 1000):  # condition_value em km
+            award(badge)
+
+def _get_user_walk(walk_id, user_id):
+    """Passeio 'walk_id' do usuário, buscado pela chave primária (ou None)."""
+    walk = db.session.get(Walk, walk_id)
+    return walk if walk is not None and walk.user_id == user_id else None
 
 @walks_bp.route('/start', methods=['POST'])
 @token_required
@@ -117,9 +192,8 @@ def start_walk(current_user):
         if not pet:
             return jsonify({'error': 'Pet não encontrado'}), 404
         
-        # Verificar se não há passeio em andamento
-        active_walk = Walk.query.filter_by(user_id=current_user.id, end_time=None).first()
-        if active_walk:
+        # Verificar se não há passeio em andamento (registro compartilhado; sem Redis, banco)
+        if active_walk_id_for_start(current_user.id):
             return jsonify({'error': 'Já existe um passeio em andamento'}), 409
         
         # Criar novo passeio
@@ -130,11 +204,16 @@ def start_walk(current_user):
         )
         
         db.session.add(walk)
+        db.session.flush()
+        # Serializado antes do commit: evita recarregar o passeio e o usuário expirados
+        user_id, walk_data = current_user.id, walk.to_dict()
+        bump_user_version(user_id)
         db.session.commit()
+        set_active_walk(user_id, walk_data['id'])
         
         return jsonify({
             'message': 'Passeio iniciado com sucesso',
-            'walk': walk.to_dict()
+            'walk': walk_data
         }), 201
         
     except Exception as e:
@@ -146,7 +225,7 @@ def start_walk(current_user):
 def update_walk(current_user, walk_id):
     """Atualizar dados do passeio em andamento"""
     try:
-        walk = Walk.query.filter_by(id=walk_id, user_id=current_user.id).first()
+        walk = _get_user_walk(walk_id, current_user.id)
         
         if not walk:
             return jsonify({'error': 'Passeio não encontrado'}), 404
@@ -154,11 +233,13 @@ def update_walk(current_user, walk_id):
         if walk.end_time:
             return jsonify({'error': 'Passeio já foi finalizado'}), 409
         
-        data = request.get_json()
+        data = get_request_json()  # aceita corpo com Content-Encoding: gzip
         
         # Atualizar coordenadas da rota
         if data.get('route_data'):
             walk.route_data = json.dumps(data['route_data'])
+            # A rota enviada inteira substitui o rastreamento ao vivo
+            live_tracker.discard(walk.id)
         
         db.session.commit()
         
@@ -167,6 +248,9 @@ def update_walk(current_user, walk_id):
             'walk': walk.to_dict()
         }), 200
         
+    except RequestBodyError as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), e.status_code
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
@@ -176,7 +260,7 @@ def update_walk(current_user, walk_id):
 def finish_walk(current_user, walk_id):
     """Finalizar um passeio"""
     try:
-        walk = Walk.query.filter_by(id=walk_id, user_id=current_user.id).first()
+        walk = _get_user_walk(walk_id, current_user.id)
         
         if not walk:
             return jsonify({'error': 'Passeio não encontrado'}), 404
@@ -184,51 +268,43 @@ def finish_walk(current_user, walk_id):
         if walk.end_time:
             return jsonify({'error': 'Passeio já foi finalizado'}), 409
         
-        data = request.get_json()
+        data = get_request_json()  # aceita corpo com Content-Encoding: gzip
         
         # Finalizar passeio
         walk.end_time = datetime.utcnow()
-        walk.duration = int((walk.end_time - walk.start_time).total_seconds())
         
-        # Calcular distância se houver dados de rota
-        if data.get('route_data'):
-            walk.route_data = json.dumps(data['route_data'])
-            
-            # Calcular distância total
-            route_points = data['route_data']
-            total_distance = 0
-            
-            for i in range(1, len(route_points)):
-                prev_point = route_points[i-1]
-                curr_point = route_points[i]
-                
-                distance = calculate_distance(
-                    prev_point['lat'], prev_point['lng'],
-                    curr_point['lat'], curr_point['lng']
-                )
-                total_distance += distance
-            
-            walk.distance = total_distance
+        # Rota enviada na finalização; senão a do rastreamento ao vivo (memória ou último lote gravado)
+        live_route = live_tracker.take_route(walk.id)
+        route_points = data.get('route_data') or live_route
+        if route_points:
+            walk.route_data = json.dumps(route_points)
+        elif walk.last_flushed_seq and walk.route_data:
+            route_points = json.loads(walk.route_data)
         
         # Calcular métricas
-        if walk.distance and walk.duration:
-            # Ritmo médio (min/km)
-            walk.average_pace = (walk.duration / 60) / (walk.distance / 1000)
+        metrics = compute_walk_metrics(walk.start_time, walk.end_time, route_points)
+        walk.duration = metrics['duration']
+        if metrics['distance'] is not None:
+            walk.distance = metrics['distance']
+            walk.start_cell = metrics['start_cell']
+        if metrics['average_pace'] is not None:
+            walk.average_pace = metrics['average_pace']
+            walk.calories = metrics['calories']
+            walk.analytics = metrics['analytics']
+            walk.points_earned = metrics['points_earned']
             
-            # Calorias (assumindo peso médio de 70kg)
-            walk.calories = calculate_calories(walk.distance, walk.duration)
-            
-            # Pontos
-            walk.points_earned = calculate_points(walk.distance, walk.duration)
-            
-            # Atualizar pontos totais do usuário
-            current_user.total_points += walk.points_earned
+            # Atualizar pontos totais do usuário (livro de pontos + UPDATE atômico do saldo)
+            record_points([(current_user.id, walk.points_earned, WALK_FINISHED, walk.id)])
         
         # Feedback opcional
         if data.get('feedback'):
             walk.feedback = data['feedback']
         
+        bump_user_version(current_user.id)
         db.session.commit()
+        clear_active_walk(current_user.id)
+        # Agregação da rota no mapa de calor em segundo plano
+        job_queue.enqueue(index_walk, walk_id, key=('heatmap', walk_id))
         
         # Verificar e conceder badges
         check_and_award_badges(current_user.id)
@@ -239,30 +315,98 @@ def finish_walk(current_user, walk_id):
             'walk': walk.to_dict()
         }), 200
         
+    except RequestBodyError as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), e.status_code
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+@walks_bp.route('/<int:walk_id>/points', methods=['POST'])
+@token_required
+def push_walk_points(current_user, walk_id):
+    """Enviar pontos de GPS numerados do passeio em andamento (alternativa HTTP ao WebSocket)"""
+    try:
+        # Caminho rápido: passeio já em memória e ainda registrado como o ativo do usuário
+        state = live_tracker.get(walk_id)
+        if state is None or state.user_id != current_user.id \
+                or get_active_walk_id(current_user.id) != walk_id:
+            walk = _get_user_walk(walk_id, current_user.id)
+            
+            if not walk:
+                return jsonify({'error': 'Passeio não encontrado'}), 404
+            
+            if walk.end_time:
+                live_tracker.discard(walk.id)
+                return jsonify({'error': 'Passeio já foi finalizado'}), 409
+            
+            state = live_tracker.open(walk)
+        
+        data = get_request_json() or {}
+        
+        # Os pontos ficam em memória e são gravados em lotes
+        return jsonify(live_tracker.push(state, data.get('points'))), 200
+        
+    except (RequestBodyError, InvalidPointsError) as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), getattr(e, 'status_code', 400)
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
+@walks_bp.route('/<int:walk_id>/live', methods=['GET'])
+@token_required
+def get_live_status(current_user, walk_id):
+    """Estado do rastreamento ao vivo; o cliente reenvia os pontos com seq > flushed_seq"""
+    try:
+        state = live_tracker.get(walk_id)
+        if state is not None and state.user_id == current_user.id:
+            return jsonify(state.status()), 200
+        
+        walk = Walk.query.filter_by(id=walk_id, user_id=current_user.id).first()
+        if not walk:
+            return jsonify({'error': 'Passeio não encontrado'}), 404
+        
+        return jsonify({
+            'walk_id': walk.id,
+            'last_seq': walk.last_flushed_seq or 0,
+            'flushed_seq': walk.last_flushed_seq or 0,
+            'distance': walk.distance,
+            'finished': walk.end_time is not None
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @walks_bp.route('/history', methods=['GET'])
 @token_required
+@conditional_get('history')
 def get_walk_history(current_user):
     """Obter histórico de passeios do usuário"""
     try:
         page = request.args.get('page', 1, type=int)
         per_page = request.args.get('per_page', 10, type=int)
         
+        # Busca só as colunas e serializa direto das tuplas (plano compilado do Walk)
+        walk_serializer = serializer_for(Walk)
         walks = Walk.query.filter_by(user_id=current_user.id)\
                          .filter(Walk.end_time.isnot(None))\
                          .order_by(Walk.created_at.desc())\
+                         .with_entities(*walk_serializer.columns, Walk.route_archive_ref)\
                          .paginate(page=page, per_page=per_page, error_out=False)
         
-        return jsonify({
-            'walks': [walk.to_dict() for walk in walks.items],
+        # Rotas no arquivo frio são reidratadas (última coluna = ponteiro do arquivo)
+        walks_data = rehydrate(walk_serializer.rows(walks.items), [row[-1] for row in walks.items])
+        return fast_jsonify({
+            'walks': walks_data,
             'total': walks.total,
             'pages': walks.pages,
             'current_page': page
         }), 200
         
+    except ArchiveUnavailableError:
+        # Sem ETag (só vai nas respostas 200): o cliente não guarda uma página sem rotas
+        return archive_unavailable_response()
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -271,7 +415,14 @@ def get_walk_history(current_user):
 def get_active_walk(current_user):
     """Obter passeio ativo (em andamento)"""
     try:
-        active_walk = Walk.query.filter_by(user_id=current_user.id, end_time=None).first()
+        # "Sem passeio" registrado é conferido no banco: pode ser de antes de um start
+        walk_id = get_active_walk_id(current_user.id, trust_negative=False)
+        active_walk = db.session.get(Walk, walk_id) if walk_id else None
+        if walk_id and (active_walk is None or active_walk.end_time or active_walk.user_id != current_user.id):
+            # Registro desatualizado: recarrega do banco
+            invalidate_active_walks(current_user.id)
+            walk_id = get_active_walk_id(current_user.id)
+            active_walk = db.session.get(Walk, walk_id) if walk_id else None
         
         if not active_walk:
             return jsonify({'message': 'Nenhum passeio ativo'}), 404
@@ -286,13 +437,21 @@ def get_active_walk(current_user):
 def get_walk_details(current_user, walk_id):
     """Obter detalhes de um passeio específico"""
     try:
-        walk = Walk.query.filter_by(id=walk_id, user_id=current_user.id).first()
+        walk_serializer = serializer_for(Walk)
+        walk = Walk.query.filter_by(id=walk_id, user_id=current_user.id)\
+                        .with_entities(*walk_serializer.columns, Walk.analytics, Walk.route_archive_ref).first()
         
         if not walk:
             return jsonify({'error': 'Passeio não encontrado'}), 404
         
-        return jsonify(walk.to_dict()), 200
+        # Resumo pré-calculado (parciais, curva de ritmo...); None em passeios antigos ou sem rota
+        data = walk_serializer.row(walk)
+        data['analytics'] = json.loads(walk.analytics) if walk.analytics else None
+        rehydrate([data], [walk.route_archive_ref])
+        return fast_jsonify(data), 200
         
+    except ArchiveUnavailableError:
+        return archive_unavailable_response()
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
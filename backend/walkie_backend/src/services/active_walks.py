@@ -0,0 +1,73 @@
+# Em: backend/walkie_backend/src/services/active_walks.py
+# (Arquivo Novo)
+#
+# Registro do passeio ativo de cada usuário no state_store, para que start,
+# active e o envio de pontos não consultem o banco a cada chamada.
+# O valor é o id do passeio aberto ou 0 (sem passeio). Escrito ao iniciar e
+# finalizar; caminhos que mexem em passeios em massa (admin, varredura,
+# exclusões) apenas invalidam, e a próxima leitura recarrega do banco.
+#
+# Leituras que recarregam do banco só gravam "sem passeio" se a chave estiver
+# vazia (add): um start que terminou no meio da leitura não é sobrescrito.
+# Sem STATE_STORE_URL o registro é por processo e pode estar velho em outro
+# worker: aí o start decide pelo banco; com Redis confia no registro.
+
+import os
+from src.models.models import db, Walk
+from src.utils.state_store import state_store
+
+NO_ACTIVE_WALK = 0
+
+
+def _ttl():
+    # Expiração de segurança: mesmo uma invalidação perdida se corrige sozinha
+    return int(os.getenv('ACTIVE_WALK_CACHE_TTL', 3600))
+
+
+def _key(user_id):
+    return f'active_walk:{user_id}'
+
+
+def set_active_walk(user_id, walk_id):
+    state_store.set(_key(user_id), walk_id or NO_ACTIVE_WALK, ttl=_ttl())
+
+
+def clear_active_walk(user_id):
+    set_active_walk(user_id, None)
+
+
+def invalidate_active_walks(*user_ids):
+    state_store.delete(*[_key(user_id) for user_id in user_ids if user_id is not None])
+
+
+def load_active_walk_id(user_id):
+    """Id do passeio aberto do usuário lido do banco (atualiza o registro)."""
+    row = db.session.query(Walk.id).filter_by(user_id=user_id, end_time=None).first()
+    walk_id = row[0] if row else None
+    if walk_id:
+        # Id velho se corrige sozinho (quem usa confere o passeio no banco)
+        set_active_walk(user_id, walk_id)
+    else:
+        state_store.add(_key(user_id), NO_ACTIVE_WALK, ttl=_ttl())
+    return walk_id
+
+
+def get_active_walk_id(user_id, trust_negative=True):
+    """
+    Id do passeio aberto do usuário (ou None); consulta o banco só quando o registro
+    não sabe. trust_negative=False confere no banco também um "sem passeio" registrado.
+    """
+    cached = state_store.get(_key(user_id))
+    if cached or (cached is not None and trust_negative):
+        return cached or None
+    if cached is not None:
+        # Apaga antes de ler: um start concluído depois disso não é sobrescrito pelo add
+        invalidate_active_walks(user_id)
+    return load_active_walk_id(user_id)
+
+
+def active_walk_id_for_start(user_id):
+    """Passeio aberto que impede um novo start: o registro só é confiável se compartilhado."""
+    if state_store.shared:
+        return get_active_walk_id(user_id)
+    return load_active_walk_id(user_id)
@@ -0,0 +1,43 @@
+# Em: backend/walkie_backend/src/services/badge_catalog.py
+# (Arquivo Novo)
+#
+# Catálogo de badges em memória (por processo). Os badges só mudam pelo seed,
+# no deploy, então a lista é lida do banco uma vez e reaproveitada na
+# verificação de conquistas e em /api/gamification/badges. O worker carrega o
+# catálogo no warm-up (src/utils/lifecycle.py); o seed chama reload_badge_catalog.
+
+import threading
+from src.models.models import Badge
+
+_lock = threading.Lock()
+_catalog = None
+
+
+def get_badge_catalog():
+    """Lista de badges (dicts de Badge.to_dict), carregada na primeira chamada."""
+    global _catalog
+    catalog = _catalog
+    if catalog is None:
+        with _lock:
+            if _catalog is None:
+                badges = [badge.to_dict() for badge in Badge.query.order_by(Badge.id)]
+                # Catálogo vazio (antes do seed) não fica em cache
+                if not badges:
+                    return []
+                _catalog = tuple(badges)
+            catalog = _catalog
+    return catalog
+
+
+def find_badges(condition_type, condition_value=None):
+    """Badges com a condição dada (e o valor, se informado), na ordem do id."""
+    return [badge for badge in get_badge_catalog()
+            if badge['condition_type'] == condition_type
+            and (condition_value is None or badge['condition_value'] == condition_value)]
+
+
+def reload_badge_catalog():
+    """Descarta o catálogo em memória; a próxima leitura busca de novo no banco."""
+    global _catalog
+    with _lock:
+        _catalog = None
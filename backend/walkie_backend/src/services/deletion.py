@@ -0,0 +1,125 @@
+# Em: backend/walkie_backend/src/services/deletion.py
+# (Arquivo Novo)
+
+import logging
+from sqlalchemy import delete, func, select, update
+from src.models.models import db, User, Pet, Walk, UserBadge, Ranking, PointsEntry
+from src.utils.caching import bump_user_version
+from src.services.active_walks import invalidate_active_walks
+from src.services.points import record_points, PET_DELETED
+from src.utils.jobs import job_queue
+
+logger = logging.getLogger(__name__)
+
+# Linhas removidas por DELETE; cada lote é commitado para não segurar locks longos
+DEFAULT_CHUNK_SIZE = 1000
+
+
+def _delete_in_chunks(model, condition, chunk_size, before_delete=None):
+    """
+    DELETE set-based em lotes de ids, sem carregar as linhas na sessão.
+    before_delete(ids) roda na mesma transação do DELETE de cada lote.
+    """
+    total = 0
+    while True:
+        ids = db.session.scalars(
+            select(model.id).where(condition).limit(chunk_size)
+        ).all()
+        if not ids:
+            return total
+        if before_delete is not None:
+            before_delete(ids)
+        db.session.execute(
+            delete(model).where(model.id.in_(ids)),
+            execution_options={'synchronize_session': False}
+        )
+        db.session.commit()
+        total += len(ids)
+
+
+def _close_ranking_gaps(user_id):
+    """Remove o usuário dos rankings e sobe uma posição quem estava abaixo dele."""
+    entries = db.session.execute(
+        select(Ranking.rank_type, Ranking.period, Ranking.position).where(Ranking.user_id == user_id)
+    ).all()
+    for rank_type, period, position in entries:
+        db.session.execute(
+            update(Ranking)
+            .where(Ranking.rank_type == rank_type, Ranking.period == period, Ranking.position > position)
+            .values(position=Ranking.position - 1),
+            execution_options={'synchronize_session': False}
+        )
+    db.session.execute(
+        delete(Ranking).where(Ranking.user_id == user_id),
+        execution_options={'synchronize_session': False}
+    )
+
+
+def delete_user_data(user_id, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Exclui um usuário e tudo que depende dele (badges, rankings, passeios e pets)
+    com DELETEs set-based em lotes, em vez do cascade do ORM linha a linha.
+    """
+    _close_ranking_gaps(user_id)
+    db.session.execute(
+        delete(UserBadge).where(UserBadge.user_id == user_id),
+        execution_options={'synchronize_session': False}
+    )
+    db.session.commit()
+
+    walks = _delete_in_chunks(Walk, Walk.user_id == user_id, chunk_size)
+    # Passeios de outros usuários com pets deste usuário (não deveria existir, mas a FK exige)
+    walks += _delete_in_chunks(
+        Walk, Walk.pet_id.in_(select(Pet.id).where(Pet.owner_id == user_id)), chunk_size
+    )
+    pets = _delete_in_chunks(Pet, Pet.owner_id == user_id, chunk_size)
+    # Exclusão da conta: o histórico de pontos do usuário sai junto
+    _delete_in_chunks(PointsEntry, PointsEntry.user_id == user_id, chunk_size)
+
+    db.session.execute(
+        delete(User).where(User.id == user_id),
+        execution_options={'synchronize_session': False}
+    )
+    db.session.commit()
+    invalidate_active_walks(user_id)
+    logger.info("Usuário %s excluído (%d passeios, %d pets)", user_id, walks, pets)
+    return {'user_id': user_id, 'walks': walks, 'pets': pets}
+
+
+def delete_pet_data(pet_id, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Exclui um pet e seus passeios em lotes, descontando dos donos
+    os pontos ganhos nesses passeios.
+    """
+    affected_users = set()
+
+    def deduct_points(walk_ids):
+        # Desconto do lote na transação do seu DELETE: uma falha no meio não deixa
+        # pontos descontados de passeios que continuam existindo (nem desconta duas vezes)
+        points_by_user = db.session.execute(
+            select(Walk.user_id, func.sum(Walk.points_earned))
+            .where(Walk.id.in_(walk_ids))
+            .group_by(Walk.user_id)
+        ).all()
+        record_points([(user_id, -int(points or 0), PET_DELETED, None) for user_id, points in points_by_user])
+        affected_users.update(user_id for user_id, _ in points_by_user)
+
+    walks = _delete_in_chunks(Walk, Walk.pet_id == pet_id, chunk_size, before_delete=deduct_points)
+    owner_id = db.session.scalar(select(Pet.owner_id).where(Pet.id == pet_id))
+    bump_user_version(owner_id, *affected_users)
+    db.session.execute(
+        delete(Pet).where(Pet.id == pet_id),
+        execution_options={'synchronize_session': False}
+    )
+    db.session.commit()
+    # O passeio ativo pode ter sido um dos excluídos
+    invalidate_active_walks(owner_id, *affected_users)
+    return {'pet_id': pet_id, 'walks': walks}
+
+
+def run_deletion(func, target_id, background=False):
+    """Executa a exclusão na hora ou agenda na fila de tarefas (background=True)."""
+    if background:
+        job_queue.enqueue(func, target_id, key=(func.__name__, target_id))
+        return None
+    return func(target_id)
@@ -0,0 +1,199 @@
+# Em: backend/walkie_backend/src/services/heatmap.py
+# (Arquivo Novo)
+#
+# Mapa de calor dos percursos: quando um passeio termina, os pontos da rota
+# (limpos) são agrupados em tiles Web Mercator de HEATMAP_MIN_ZOOM a
+# HEATMAP_MAX_ZOOM, e a tabela route_tiles soma quantos passeios passaram por
+# cada tile (um passeio conta uma vez por tile). O endpoint de tiles só lê
+# essas contagens, sem abrir nenhum route_data.
+
+import json
+import logging
+import math
+from collections import Counter
+from sqlalchemy import insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from src.models.models import db, Walk, RouteTile
+
+logger = logging.getLogger(__name__)
+
+HEATMAP_MIN_ZOOM = 10
+HEATMAP_MAX_ZOOM = 17
+# Um tile servido é dividido em 2^TILE_DETAIL x 2^TILE_DETAIL células
+TILE_DETAIL = 4
+# Ponto mais longe que isso do anterior e do seguinte é pico de GPS
+MAX_JUMP_METERS = 250
+MAX_MERCATOR_LAT = 85.05112878
+
+
+def tile_for(lat, lng, zoom):
+    """Tile (x, y) que contém o ponto no zoom dado."""
+    lat = max(min(lat, MAX_MERCATOR_LAT), -MAX_MERCATOR_LAT)
+    n = 1 << zoom
+    x = int((lng + 180.0) / 360.0 * n)
+    y = int((1.0 - math.asinh(math.tan(math.radians(lat))) / math.pi) / 2.0 * n)
+    return min(max(x, 0), n - 1), min(max(y, 0), n - 1)
+
+
+def clean_route(route_points):
+    """
+    Descarta pontos inválidos, repetidos e picos de GPS: um ponto a mais de
+    MAX_JUMP_METERS do anterior e do seguinte, quando esses dois estão próximos.
+    """
+    from src.routes.walks import calculate_distance
+    valid = []
+    for point in route_points or ():
+        try:
+            lat, lng = float(point['lat']), float(point['lng'])
+        except (KeyError, TypeError, ValueError):
+            continue
+        if -90 <= lat <= 90 and -180 <= lng <= 180 and (not valid or valid[-1] != (lat, lng)):
+            valid.append((lat, lng))
+
+    cleaned = []
+    for i, point in enumerate(valid):
+        if cleaned and i + 1 < len(valid):
+            previous, following = cleaned[-1], valid[i + 1]
+            if calculate_distance(*previous, *point) > MAX_JUMP_METERS \
+                    and calculate_distance(*point, *following) > MAX_JUMP_METERS \
+                    and calculate_distance(*previous, *following) <= MAX_JUMP_METERS:
+                continue
+        cleaned.append(point)
+    return cleaned
+
+
+def route_tiles(route_points):
+    """Conjunto de tiles (zoom, x, y) por onde a rota passa, em todos os níveis do mapa de calor."""
+    tiles = set()
+    for lat, lng in clean_route(route_points):
+        x, y = tile_for(lat, lng, HEATMAP_MAX_ZOOM)
+        for zoom in range(HEATMAP_MIN_ZOOM, HEATMAP_MAX_ZOOM + 1):
+            shift = HEATMAP_MAX_ZOOM - zoom
+            tiles.add((zoom, x >> shift, y >> shift))
+    return tiles
+
+
+def tiles_from_route_data(route_data):
+    """route_tiles() a partir do JSON salvo em Walk.route_data (inválido = nenhum tile)."""
+    try:
+        return route_tiles(json.loads(route_data)) if route_data else set()
+    except (ValueError, TypeError):
+        return set()
+
+
+def _upsert_tile_counts_generic(table, rows):
+    """
+    Bancos sem upsert nativo: UPDATE de cada tile e INSERT dos que ainda não
+    existiam, na transação de quem chama.
+    """
+    missing = []
+    for row in rows:
+        updated = db.session.execute(
+            update(table)
+            .where(table.c.zoom == row['zoom'], table.c.x == row['x'], table.c.y == row['y'])
+            .values(count=table.c.count + row['count'])
+        ).rowcount
+        if not updated:
+            missing.append(row)
+    if not missing:
+        return
+    try:
+        with db.session.begin_nested():
+            db.session.execute(insert(table), missing)
+    except IntegrityError:
+        # Outra transação criou algum desses tiles entre o UPDATE e o INSERT
+        _upsert_tile_counts_generic(table, missing)
+
+
+def upsert_tile_counts(counts):
+    """Soma as contagens {(zoom, x, y): n} em route_tiles com o upsert nativo do banco (sem commit)."""
+    if not counts:
+        return
+    rows = [{'zoom': z, 'x': x, 'y': y, 'count': n} for (z, x, y), n in counts.items()]
+    dialect = db.session.get_bind().dialect.name
+    table = RouteTile.__table__
+
+    if dialect == 'mysql':
+        stmt = mysql.insert(table)
+        stmt = stmt.on_duplicate_key_update(count=table.c.count + stmt.inserted['count'])
+    elif dialect in ('sqlite', 'postgresql'):
+        dialect_insert = sqlite.insert if dialect == 'sqlite' else postgresql.insert
+        stmt = dialect_insert(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['zoom', 'x', 'y'],
+            set_={'count': table.c.count + stmt.excluded['count']}
+        )
+    else:
+        _upsert_tile_counts_generic(table, rows)
+        return
+
+    db.session.execute(stmt, rows)
+
+
+def index_walk(walk_id):
+    """
+    Tarefa de segundo plano: agrega a rota de um passeio finalizado no mapa de calor.
+    Idempotente: o passeio é marcado (heatmap_indexed) na mesma transação das contagens.
+    """
+    claimed = db.session.execute(
+        update(Walk)
+        .where(Walk.id == walk_id, Walk.end_time.isnot(None), Walk.heatmap_indexed.is_(False))
+        .values(heatmap_indexed=True),
+        execution_options={'synchronize_session': False}
+    ).rowcount
+    if not claimed:
+        db.session.rollback()
+        return 0
+
+    route_data = db.session.query(Walk.route_data).filter(Walk.id == walk_id).scalar()
+    tiles = tiles_from_route_data(route_data)
+    upsert_tile_counts(Counter(tiles))
+    db.session.commit()
+    return len(tiles)
+
+
+def index_walks_batch(walk_tiles):
+    """
+    Grava de uma vez as contagens de vários passeios já processados ({walk_id: tiles})
+    e os marca como indexados (usado pelo backfill). Passeios indexados nesse meio
+    tempo pela tarefa da finalização são ignorados. Retorna quantos foram gravados.
+    """
+    if not walk_tiles:
+        return 0
+    # Trava as linhas ainda não indexadas (FOR UPDATE no MySQL/PostgreSQL)
+    claimed = db.session.scalars(
+        select(Walk.id)
+        .where(Walk.id.in_(list(walk_tiles)), Walk.heatmap_indexed.is_(False))
+        .with_for_update()
+    ).all()
+
+    counts = Counter()
+    for walk_id in claimed:
+        counts.update(walk_tiles[walk_id])
+    upsert_tile_counts(counts)
+    if claimed:
+        db.session.execute(
+            update(Walk).where(Walk.id.in_(claimed)).values(heatmap_indexed=True),
+            execution_options={'synchronize_session': False}
+        )
+    db.session.commit()
+    return len(claimed)
+
+
+def tile_cells(zoom, x, y):
+    """
+    Células do tile z/x/y com suas contagens: os tiles armazenados TILE_DETAIL
+    níveis abaixo (ou no zoom máximo) que caem dentro dele.
+    """
+    cell_zoom = min(zoom + TILE_DETAIL, HEATMAP_MAX_ZOOM)
+    shift = cell_zoom - zoom
+    x_min, y_min = x << shift, y << shift
+    x_max, y_max = x_min + (1 << shift) - 1, y_min + (1 << shift) - 1
+
+    # Faixa na chave primária (zoom, x, y)
+    rows = db.session.query(RouteTile.x, RouteTile.y, RouteTile.count)\
+                     .filter(RouteTile.zoom == cell_zoom,
+                             RouteTile.x.between(x_min, x_max),
+                             RouteTile.y.between(y_min, y_max)).all()
+    return cell_zoom, [{'x': cx, 'y': cy, 'count': count} for cx, cy, count in rows]
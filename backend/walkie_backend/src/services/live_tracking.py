@@ -0,0 +1,176 @@
+# Em: backend/walkie_backend/src/services/live_tracking.py
+# (Arquivo Novo)
+#
+# Rastreamento ao vivo dos passeios: o cliente envia pontos de GPS numerados
+# (seq) pelo WebSocket ou pelo POST /api/walks/<id>/points, o estado do passeio
+# (rota e distância acumulada) fica em memória e é gravado no banco em lotes,
+# por tempo (LIVE_FLUSH_INTERVAL) ou por quantidade de pontos (LIVE_FLUSH_POINTS).
+#
+# Recuperação: cada gravação salva Walk.last_flushed_seq. Se o processo cair,
+# os pontos ainda não gravados se perdem, mas o cliente recebe 'flushed_seq'
+# em cada confirmação e reenvia tudo que vier depois dele; pontos com seq já
+# recebido são ignorados. O estado é por processo: com vários workers, o canal
+# de um passeio precisa cair sempre no mesmo worker (sticky session).
+
+import json
+import logging
+import os
+import threading
+import time
+from sqlalchemy import update
+from src.models.models import db, Walk
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FLUSH_INTERVAL = 15  # segundos
+DEFAULT_FLUSH_POINTS = 50
+
+
+class InvalidPointsError(ValueError):
+    pass
+
+
+class LiveWalk:
+    """Estado em memória de um passeio em andamento."""
+
+    def __init__(self, walk_id, user_id, route, flushed_seq):
+        from src.routes.walks import calculate_route_distance
+        self.walk_id = walk_id
+        self.user_id = user_id
+        self.route = route
+        self.distance = calculate_route_distance(route)
+        self.last_seq = flushed_seq
+        self.flushed_seq = flushed_seq
+        self.pending = 0
+        self.last_flush = time.monotonic()
+        self.lock = threading.Lock()
+
+    def add_points(self, points):
+        from src.routes.walks import calculate_distance
+        accepted = 0
+        for point in sorted(points, key=lambda p: p['seq']):
+            if point['seq'] <= self.last_seq:
+                continue  # reenvio de ponto já recebido
+            entry = {'lat': point['lat'], 'lng': point['lng']}
+            if 'timestamp' in point:
+                entry['timestamp'] = point['timestamp']
+            if self.route:
+                previous = self.route[-1]
+                self.distance += calculate_distance(previous['lat'], previous['lng'], entry['lat'], entry['lng'])
+            self.route.append(entry)
+            self.last_seq = point['seq']
+            accepted += 1
+        self.pending += accepted
+        return accepted
+
+    def status(self):
+        return {
+            'walk_id': self.walk_id,
+            'last_seq': self.last_seq,
+            'flushed_seq': self.flushed_seq,
+            'distance': self.distance,
+            'points': len(self.route),
+        }
+
+
+def validate_points(points):
+    """Valida a lista [{'seq', 'lat', 'lng', 'timestamp'?}]; levanta InvalidPointsError."""
+    if not isinstance(points, list) or not points:
+        raise InvalidPointsError('Lista de pontos é obrigatória')
+    for point in points:
+        if not isinstance(point, dict):
+            raise InvalidPointsError('Ponto inválido')
+        seq, lat, lng = point.get('seq'), point.get('lat'), point.get('lng')
+        if not isinstance(seq, int) or isinstance(seq, bool) or seq < 1:
+            raise InvalidPointsError('Cada ponto precisa de um seq inteiro positivo')
+        if not isinstance(lat, (int, float)) or not isinstance(lng, (int, float)) \
+                or not -90 <= lat <= 90 or not -180 <= lng <= 180:
+            raise InvalidPointsError('Coordenadas inválidas')
+    return points
+
+
+class LiveTracker:
+    def __init__(self):
+        self._walks = {}
+        self._lock = threading.Lock()
+        self.flush_interval = float(os.getenv('LIVE_FLUSH_INTERVAL', DEFAULT_FLUSH_INTERVAL))
+        self.flush_points = int(os.getenv('LIVE_FLUSH_POINTS', DEFAULT_FLUSH_POINTS))
+
+    def open(self, walk):
+        """Estado em memória do passeio aberto 'walk', carregado do banco na primeira vez."""
+        with self._lock:
+            state = self._walks.get(walk.id)
+            if state is None:
+                route = json.loads(walk.route_data) if walk.route_data else []
+                state = LiveWalk(walk.id, walk.user_id, route, walk.last_flushed_seq or 0)
+                self._walks[walk.id] = state
+            return state
+
+    def get(self, walk_id):
+        return self._walks.get(walk_id)
+
+    def push(self, state, points):
+        """Adiciona pontos ao passeio (estado de open()) e grava se atingir o limite. Retorna o status."""
+        validate_points(points)
+        with state.lock:
+            state.add_points(points)
+            if state.pending >= self.flush_points:
+                self._flush(state)
+            return state.status()
+
+    def _flush(self, state):
+        """Grava a rota acumulada e o último seq (chamar com state.lock)."""
+        if not state.pending:
+            return
+        result = db.session.execute(
+            update(Walk)
+            .where(Walk.id == state.walk_id, Walk.end_time.is_(None))
+            .values(route_data=json.dumps(state.route), last_flushed_seq=state.last_seq),
+            execution_options={'synchronize_session': False}
+        )
+        db.session.commit()
+        state.flushed_seq = state.last_seq
+        state.pending = 0
+        state.last_flush = time.monotonic()
+        if result.rowcount == 0:
+            # Passeio finalizado ou excluído por outro caminho
+            self.discard(state.walk_id)
+
+    def flush(self, walk_id):
+        state = self._walks.get(walk_id)
+        if state is not None:
+            with state.lock:
+                self._flush(state)
+
+    def flush_due(self):
+        """Tarefa periódica: grava os passeios com pontos pendentes há mais de flush_interval."""
+        now = time.monotonic()
+        for state in list(self._walks.values()):
+            if state.pending and now - state.last_flush >= self.flush_interval:
+                try:
+                    with state.lock:
+                        self._flush(state)
+                except Exception:
+                    db.session.rollback()
+                    logger.exception("Erro ao gravar pontos do passeio %s", state.walk_id)
+
+    def flush_all(self):
+        for walk_id in list(self._walks):
+            self.flush(walk_id)
+
+    def take_route(self, walk_id):
+        """Remove o estado do passeio (na finalização) e retorna a rota acumulada, ou None."""
+        with self._lock:
+            state = self._walks.pop(walk_id, None)
+        if state is None:
+            return None
+        with state.lock:
+            return state.route
+
+    def discard(self, *walk_ids):
+        with self._lock:
+            for walk_id in walk_ids:
+                self._walks.pop(walk_id, None)
+
+
+live_tracker = LiveTracker()
@@ -0,0 +1,189 @@
+# Em: backend/walkie_backend/src/services/points.py
+# (Arquivo Novo)
+#
+# Livro de pontos (points_ledger). Toda mudança de pontos passa por
+# record_points(), que insere as entradas e aplica o saldo com
+# UPDATE ... SET total_points = total_points + :delta na transação de quem chama,
+# em vez de ler o usuário, somar em Python e gravar (duas finalizações
+# simultâneas perdiam pontos).
+#
+# Uma tarefa periódica compacta as entradas antigas (uma linha 'compacted' por
+# usuário) e confere o saldo de cada usuário contra a soma do livro.
+
+import logging
+import os
+from collections import defaultdict
+from datetime import datetime, timedelta
+from sqlalchemy import delete, func, insert, literal, null, select, update
+from src.models.models import db, User, PointsEntry
+
+logger = logging.getLogger(__name__)
+
+# Motivos das entradas
+WALK_FINISHED = 'walk_finished'
+WALK_COMPLETED = 'walk_completed'     # finalizado pelo admin ou pela varredura
+WALK_DELETED = 'walk_deleted'
+PET_DELETED = 'pet_deleted'
+RESCORE = 'rescore'
+OPENING_BALANCE = 'opening_balance'
+COMPACTED = 'compacted'
+
+DEFAULT_COMPACT_AFTER_DAYS = 90
+
+
+def record_points(entries):
+    """
+    Registra [(user_id, delta, reason, walk_id)] e aplica o saldo de cada usuário
+    com um UPDATE atômico (sem commit). Entradas com delta zero são ignoradas.
+    Retorna {user_id: delta total}.
+    """
+    now = datetime.utcnow()
+    rows = [{'user_id': user_id, 'delta': delta, 'reason': reason, 'walk_id': walk_id, 'created_at': now}
+            for user_id, delta, reason, walk_id in entries if delta]
+    if not rows:
+        return {}
+
+    db.session.execute(insert(PointsEntry), rows)
+
+    totals = defaultdict(int)
+    for row in rows:
+        totals[row['user_id']] += row['delta']
+    for user_id, delta in totals.items():
+        if delta:
+            db.session.execute(
+                update(User)
+                .where(User.id == user_id)
+                .values(total_points=User.total_points + delta),
+                execution_options={'synchronize_session': False}
+            )
+    return dict(totals)
+
+
+def read_ledger(after_id=0, limit=1000):
+    """
+    Leitura incremental do fluxo: entradas com id > after_id, em ordem.
+    Retorna (entradas, novo_cursor). Entradas 'compacted' só resumem entradas
+    antigas já lidas, então não aparecem aqui; um leitor novo parte do saldo
+    atual (User.total_points) e do cursor de ledger_head().
+    """
+    entries = PointsEntry.query.filter(PointsEntry.id > after_id, PointsEntry.reason != COMPACTED)\
+                               .order_by(PointsEntry.id).limit(limit).all()
+    cursor = entries[-1].id if entries else after_id
+    return entries, cursor
+
+
+def ledger_head():
+    """Id da última entrada (cursor inicial para leitores incrementais)."""
+    return db.session.scalar(select(func.max(PointsEntry.id))) or 0
+
+
+def create_opening_balances():
+    """
+    Migração de dados: usuários com pontos e nenhuma entrada no livro recebem uma
+    entrada 'opening_balance' com o saldo atual (o saldo em si não muda).
+    Idempotente e segura com dois processos ao mesmo tempo.
+    """
+    pending = (User.total_points != 0,
+               ~select(PointsEntry.id).where(PointsEntry.user_id == User.id).exists())
+    # Trava os usuários pendentes (FOR UPDATE no MySQL/PostgreSQL): outro processo
+    # fazendo o mesmo espera o commit e então não encontra mais ninguém pendente
+    if not db.session.scalars(select(User.id).where(*pending).with_for_update()).first():
+        db.session.rollback()
+        return 0
+
+    # INSERT ... SELECT ... WHERE NOT EXISTS: a condição é reavaliada no próprio INSERT
+    created = db.session.execute(
+        insert(PointsEntry).from_select(
+            ['user_id', 'delta', 'reason', 'walk_id', 'created_at'],
+            select(User.id, User.total_points, literal(OPENING_BALANCE), null(),
+                   literal(datetime.utcnow(), db.DateTime)).where(*pending)
+        )
+    ).rowcount
+    db.session.commit()
+    if created:
+        logger.info("Saldo de abertura criado no livro de pontos para %d usuários", created)
+    return created
+
+
+def compact_ledger(older_than_days=None):
+    """
+    Junta as entradas mais antigas que 'older_than_days' em uma entrada 'compacted'
+    por usuário, na mesma transação (a soma por usuário não muda).
+    Retorna quantas entradas foram removidas.
+    """
+    if older_than_days is None:
+        older_than_days = float(os.getenv('LEDGER_COMPACT_AFTER_DAYS', DEFAULT_COMPACT_AFTER_DAYS))
+    limit = datetime.utcnow() - timedelta(days=older_than_days)
+    # Por data, não por id: as linhas 'compacted' recebem ids novos com created_at = limite,
+    # e um corte por id puxaria junto entradas recentes gravadas antes delas.
+    # Compactadas antigas sozinhas não justificam uma rodada.
+    pending = db.session.scalar(
+        select(PointsEntry.id).where(PointsEntry.created_at < limit, PointsEntry.reason != COMPACTED).limit(1)
+    )
+    if not pending:
+        return 0
+
+    totals = db.session.execute(
+        select(PointsEntry.user_id, func.sum(PointsEntry.delta), func.count())
+        .where(PointsEntry.created_at < limit)
+        .group_by(PointsEntry.user_id)
+    ).all()
+    # Usuários que já têm só a linha compactada não mudam
+    totals = [(user_id, total, count) for user_id, total, count in totals if count > 1]
+    if not totals:
+        return 0
+
+    user_ids = [user_id for user_id, _, _ in totals]
+    removed = db.session.execute(
+        delete(PointsEntry).where(PointsEntry.created_at < limit, PointsEntry.user_id.in_(user_ids)),
+        execution_options={'synchronize_session': False}
+    ).rowcount
+    db.session.execute(insert(PointsEntry), [
+        {'user_id': user_id, 'delta': int(total or 0), 'reason': COMPACTED, 'walk_id': None, 'created_at': limit}
+        for user_id, total, _ in totals
+    ])
+    db.session.commit()
+    return removed
+
+
+def _ledger_sum(user_id_column):
+    """Soma do livro do usuário como subquery correlacionada (0 sem entradas)."""
+    return select(func.coalesce(func.sum(PointsEntry.delta), 0))\
+        .where(PointsEntry.user_id == user_id_column).scalar_subquery()
+
+
+def verify_balances(repair=False):
+    """
+    Compara User.total_points com a soma do livro (uma única query, leitura consistente).
+    Retorna [(user_id, saldo, soma_do_livro)] divergentes; com repair=True corrige o saldo.
+    """
+    ledger_sum = func.coalesce(func.sum(PointsEntry.delta), 0)
+    mismatches = db.session.execute(
+        select(User.id, User.total_points, ledger_sum)
+        .outerjoin(PointsEntry, PointsEntry.user_id == User.id)
+        .group_by(User.id, User.total_points)
+        .having(func.coalesce(User.total_points, 0) != ledger_sum)
+    ).all()
+
+    for user_id, balance, total in mismatches:
+        logger.warning("Saldo divergente do livro de pontos: usuário %s tem %s, livro soma %s",
+                       user_id, balance, total)
+    if repair and mismatches:
+        # Soma recalculada no próprio UPDATE (subquery correlacionada), e não o valor
+        # lido acima: um record_points commitado entre as duas não se perde
+        db.session.execute(
+            update(User)
+            .where(User.id.in_([user_id for user_id, _, _ in mismatches]))
+            .values(total_points=_ledger_sum(User.id)),
+            execution_options={'synchronize_session': False}
+        )
+        db.session.commit()
+    return [tuple(row) for row in mismatches]
+
+
+def maintain_ledger():
+    """Tarefa periódica: compacta e confere os saldos."""
+    removed = compact_ledger()
+    mismatches = verify_balances()
+    if removed or mismatches:
+        logger.info("Livro de pontos: %d entradas compactadas, %d saldos divergentes", removed, len(mismatches))
@@ -0,0 +1,231 @@
+# Em: backend/walkie_backend/src/services/rescoring.py
+# (Arquivo Novo)
+#
+# Recalcula as métricas (distância, ritmo, calorias, pontos, análise...) de todos
+# os passeios finalizados com as fórmulas atuais, depois de mudar uma fórmula ou
+# corrigir um bug de GPS. Os passeios são lidos em lotes por chave primária, o
+# cálculo roda em um pool de processos e só as linhas que mudaram são gravadas,
+# com UPDATE em lote. A diferença de pontos de cada lote é aplicada em
+# User.total_points na mesma transação, então um checkpoint (último id gravado)
+# sempre corresponde a um estado consistente e a execução pode ser retomada.
+
+import json
+import logging
+import math
+import os
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from sqlalchemy import bindparam, delete, func, select, update
+from src.models.models import db, Walk, Ranking
+from src.utils.caching import bump_user_version
+from src.services.points import record_points, RESCORE
+from src.services.route_archive import with_archived_routes
+from src.utils.time_windows import get_zone, in_range
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 500
+
+# Colunas recalculadas por compute_walk_metrics
+RESCORED_FIELDS = ('duration', 'distance', 'average_pace', 'calories', 'points_earned', 'start_cell', 'analytics')
+
+_walks = Walk.__table__
+
+_READ_COLUMNS = (Walk.id, Walk.user_id, Walk.start_time, Walk.end_time, Walk.route_data) + \
+    tuple(getattr(Walk, field) for field in RESCORED_FIELDS)
+
+
+def _same(old, new):
+    if isinstance(old, float) and isinstance(new, float):
+        return math.isclose(old, new, rel_tol=1e-9, abs_tol=1e-9)
+    return old == new
+
+
+def rescore_rows(rows):
+    """
+    Executado nos processos do pool. Recebe tuplas com as colunas de _READ_COLUMNS
+    e retorna [(walk_id, user_id, {campo: novo_valor}, diferença_de_pontos)]
+    apenas para os passeios cujas métricas mudaram.
+    """
+    from src.routes.walks import compute_walk_metrics
+
+    changes = []
+    for row in rows:
+        walk_id, user_id, start_time, end_time, route_data = row[:5]
+        current = dict(zip(RESCORED_FIELDS, row[5:]))
+        try:
+            route_points = json.loads(route_data) if route_data else None
+        except ValueError:
+            route_points = None
+
+        metrics = compute_walk_metrics(start_time, end_time, route_points)
+        changed = {field: metrics[field] for field in RESCORED_FIELDS
+                   if not _same(current[field], metrics[field])}
+        if changed:
+            delta = (metrics['points_earned'] or 0) - (current['points_earned'] or 0)
+            changes.append((walk_id, user_id, changed, delta))
+    return changes
+
+
+def _chunks(chunk_size, after_id):
+    last_id = after_id
+    while True:
+        rows = db.session.query(*_READ_COLUMNS, Walk.route_archive_ref)\
+                         .filter(Walk.id > last_id, Walk.end_time.isnot(None))\
+                         .order_by(Walk.id).limit(chunk_size).all()
+        if not rows:
+            return
+        last_id = rows[-1][0]
+        # Rotas no arquivo frio voltam para a posição do route_data (o ponteiro não vai para o pool)
+        rows = with_archived_routes(rows, route_index=4, ref_index=len(_READ_COLUMNS))
+        yield last_id, [tuple(row)[:len(_READ_COLUMNS)] for row in rows]
+
+
+def _update_walks(changes):
+    """
+    Grava as mudanças com UPDATE em lote (Core, executemany, agrupado pelas colunas
+    de cada linha), guardado pelos pontos lidos: passeio excluído ou alterado desde
+    a leitura fica de fora em vez de abortar a execução. Retorna as mudanças gravadas.
+    """
+    groups = defaultdict(list)
+    for change in changes:
+        groups[tuple(sorted(change[2]))].append(change)
+
+    expected = matched = 0
+    for fields, group in groups.items():
+        stmt = update(_walks).where(_walks.c.id == bindparam('b_id'))
+        if 'points_earned' in fields:
+            stmt = stmt.where(func.coalesce(_walks.c.points_earned, 0) == bindparam('b_old_points'))
+        stmt = stmt.values({field: bindparam(f'b_{field}') for field in fields})
+        params = [{'b_id': walk_id, 'b_old_points': (changed.get('points_earned') or 0) - delta,
+                   **{f'b_{field}': changed[field] for field in fields}}
+                  for walk_id, _, changed, delta in group]
+        result = db.session.execute(stmt, params)
+        expected += len(params)
+        matched += result.rowcount
+
+    if matched == expected and db.session.get_bind().dialect.supports_sane_multi_rowcount:
+        return changes
+    # Alguma linha ficou de fora: grava no livro só as que têm agora os pontos novos
+    current = dict(db.session.execute(
+        select(_walks.c.id, func.coalesce(_walks.c.points_earned, 0))
+        .where(_walks.c.id.in_([walk_id for walk_id, _, _, _ in changes]))
+    ).all())
+    applied = [change for change in changes if change[0] in current
+               and ('points_earned' not in change[2] or current[change[0]] == (change[2]['points_earned'] or 0))]
+    logger.warning("Reprocessamento: %d passeios excluídos ou alterados durante o lote foram ignorados",
+                   len(changes) - len(applied))
+    return applied
+
+
+def _apply_changes(changes):
+    """Grava um lote de mudanças e a diferença de pontos por usuário (sem commit). Retorna as gravadas."""
+    changes = _update_walks(changes) if changes else []
+
+    # Diferença de pontos de cada passeio no livro de pontos (e no saldo, atomicamente)
+    record_points([(user_id, delta, RESCORE, walk_id) for walk_id, user_id, _, delta in changes])
+    bump_user_version(*{user_id for _, user_id, _, _ in changes})
+    return changes
+
+
+def rebuild_rankings():
+    """
+    Recalcula as posições salvas na tabela rankings (ranking global por período)
+    a partir dos pontos dos passeios. Só reconstrói os períodos que já têm linhas.
+    As linhas são as mesmas para todos os usuários, então semana e mês são os do
+    fuso padrão (DEFAULT_TIMEZONE).
+    """
+    from src.routes.gamification import period_window
+
+    periods = [period for (period,) in db.session.query(Ranking.period)
+               .filter(Ranking.rank_type == 'global').distinct()]
+    for period in periods:
+        query = db.session.query(Walk.user_id, func.sum(Walk.points_earned).label('points'))
+        window = period_window(period, get_zone())
+        if window is not None:
+            query = query.filter(in_range(Walk.created_at, window))
+        totals = query.group_by(Walk.user_id).order_by(func.sum(Walk.points_earned).desc(), Walk.user_id).all()
+
+        db.session.execute(
+            delete(Ranking).where(Ranking.rank_type == 'global', Ranking.period == period),
+            execution_options={'synchronize_session': False}
+        )
+        db.session.add_all([
+            Ranking(user_id=user_id, rank_type='global', period=period, position=position, points=int(points or 0))
+            for position, (user_id, points) in enumerate(totals, 1)
+        ])
+    db.session.commit()
+    return periods
+
+
+def _load_checkpoint(path):
+    if path and os.path.exists(path):
+        with open(path) as checkpoint_file:
+            return json.load(checkpoint_file)
+    return None
+
+
+def _save_checkpoint(path, state):
+    if not path:
+        return
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w') as checkpoint_file:
+        json.dump(state, checkpoint_file)
+    os.replace(tmp_path, path)  # troca atômica: um checkpoint nunca fica pela metade
+
+
+def rescore_walks(chunk_size=DEFAULT_CHUNK_SIZE, workers=None, dry_run=False,
+                  checkpoint_path=None, resume=False, on_chunk=None, sample_size=10):
+    """
+    Recalcula todos os passeios finalizados. Com dry_run nada é gravado e o
+    resumo inclui exemplos das diferenças. Com checkpoint_path o progresso é
+    salvo a cada lote; resume=True continua do último lote gravado.
+    Retorna o resumo da execução (dict).
+    """
+    state = {'last_id': 0, 'scanned': 0, 'changed': 0, 'points_delta': 0, 'users': 0}
+    if resume:
+        state.update(_load_checkpoint(checkpoint_path) or {})
+    affected_users = set()
+    samples = []
+
+    def handle(last_id, scanned, changes):
+        if dry_run:
+            samples.extend(changes[:max(sample_size - len(samples), 0)])
+        else:
+            changes = _apply_changes(changes)
+            db.session.commit()
+        state['scanned'] += scanned
+        state['changed'] += len(changes)
+        state['points_delta'] += sum(delta for _, _, _, delta in changes)
+        affected_users.update(user_id for _, user_id, _, _ in changes)
+        state['last_id'] = last_id
+        state['users'] = len(affected_users)
+        if not dry_run:
+            _save_checkpoint(checkpoint_path, state)
+        if on_chunk:
+            on_chunk(state)
+
+    max_workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        pending = []
+        for last_id, rows in _chunks(chunk_size, state['last_id']):
+            pending.append((last_id, len(rows), pool.submit(rescore_rows, rows)))
+            # Poucos lotes em voo; resultados gravados na ordem dos ids (checkpoint correto)
+            if len(pending) >= max_workers * 2:
+                last, scanned, future = pending.pop(0)
+                handle(last, scanned, future.result())
+        for last, scanned, future in pending:
+            handle(last, scanned, future.result())
+
+    if not dry_run and state['changed']:
+        state['rankings'] = rebuild_rankings()
+
+    summary = dict(state, dry_run=dry_run)
+    if dry_run:
+        summary['samples'] = [
+            {'walk_id': walk_id, 'user_id': user_id, 'points_delta': delta,
+             'changes': {k: v for k, v in changed.items() if k != 'analytics'}}
+            for walk_id, user_id, changed, delta in samples
+        ]
+    logger.info("Reprocessamento de passeios: %s", {k: v for k, v in summary.items() if k != 'samples'})
+    return summary
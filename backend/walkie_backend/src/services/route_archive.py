@@ -0,0 +1,501 @@
+# Em: backend/walkie_backend/src/services/route_archive.py
+# (Arquivo Novo)
+#
+# Arquivo frio das rotas antigas. Passeios finalizados há mais de
+# ROUTE_ARCHIVE_AFTER_DAYS têm o route_data movido para segmentos comprimidos,
+# particionados por mês do passeio (AAAA/MM/...), em disco local ou em um
+# armazenamento compatível com S3 (ROUTE_ARCHIVE_URL=s3://bucket/prefixo).
+# A linha do passeio fica com o resumo (distância, ritmo, análise, célula de
+# início, mapa de calor já agregado) e um ponteiro em route_archive_ref:
+# 'AAAA/MM/<segmento>.seg:<offset>:<tamanho>'.
+#
+# Cada rota é comprimida separadamente dentro do segmento, então ler um passeio
+# é ler só o trecho dele (seek no arquivo ou GET com Range no S3). As rotas
+# reidratadas ficam em uma LRU por processo (ROUTE_ARCHIVE_CACHE_MB).
+#
+# Segmentos são imutáveis. Passeios excluídos deixam registros mortos, e a
+# limpeza (vacuum_segments) regrava os segmentos sem eles ou os apaga.
+
+import json
+import logging
+import os
+import re
+import threading
+import uuid
+import zlib
+from collections import Counter, OrderedDict, defaultdict
+from datetime import datetime, timedelta
+from flask import current_app, jsonify
+from sqlalchemy import bindparam, tuple_, update
+from src.models.models import db, Walk
+
+try:
+    import boto3
+except ImportError:  # boto3 é opcional; sem ele só o armazenamento local
+    boto3 = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_AFTER_DAYS = 730
+DEFAULT_SEGMENT_WALKS = 1000
+DEFAULT_CACHE_MB = 32
+COMPRESSION_LEVEL = 9  # gravado uma vez, lido raramente
+# Segmentos mais novos que isso não passam pela limpeza (podem ser de um
+# arquivamento de outro worker que ainda não fez commit)
+VACUUM_GRACE_SECONDS = 3600
+# Trechos do mesmo segmento mais próximos que isso são lidos com um único GET no S3
+RANGE_MERGE_GAP = 256 * 1024
+
+# AAAA/MM/<criação>-<id>-n<registros>.seg
+_SEGMENT_NAME = re.compile(r'(\d{8}T\d{6})-[0-9a-f]+-n(\d+)\.seg$')
+
+_walks = Walk.__table__
+
+
+class ArchiveUnavailableError(RuntimeError):
+    """O arquivo frio não pôde ser lido; a resposta não pode sair sem as rotas."""
+
+
+def archive_unavailable_response():
+    """503 das rotas que reidratam passeios: falha temporária do armazenamento, sem ETag."""
+    response = jsonify({'error': 'Rotas arquivadas indisponíveis no momento; tente novamente'})
+    response.headers['Retry-After'] = '30'
+    return response, 503
+
+
+def _env_int(name, default):
+    value = os.getenv(name)
+    return int(value) if value not in (None, '') else default
+
+
+# --- Armazenamento dos segmentos ---
+
+class LocalSegmentStore:
+    """Segmentos em arquivos sob 'root' (gravação atômica: arquivo temporário + rename)."""
+
+    def __init__(self, root):
+        self.root = root
+
+    def _path(self, key):
+        return os.path.join(self.root, *key.split('/'))
+
+    def put(self, key, data):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temporary = f'{path}.tmp-{os.getpid()}'
+        with open(temporary, 'wb') as segment_file:
+            segment_file.write(data)
+            segment_file.flush()
+            os.fsync(segment_file.fileno())
+        os.replace(temporary, path)
+
+    def read_ranges(self, key, ranges):
+        with open(self._path(key), 'rb') as segment_file:
+            chunks = []
+            for offset, length in ranges:
+                segment_file.seek(offset)
+                chunks.append(segment_file.read(length))
+            return chunks
+
+    def delete(self, key):
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def keys(self):
+        for directory, _, files in os.walk(self.root):
+            for name in files:
+                if name.endswith('.seg'):
+                    yield os.path.relpath(os.path.join(directory, name), self.root).replace(os.sep, '/')
+
+
+class S3SegmentStore:
+    """Segmentos em um bucket S3 (ou compatível, via ROUTE_ARCHIVE_S3_ENDPOINT)."""
+
+    def __init__(self, bucket, prefix='', endpoint_url=None):
+        self.bucket = bucket
+        self.prefix = prefix.strip('/')
+        self._client = boto3.client('s3', endpoint_url=endpoint_url)
+
+    def _key(self, key):
+        return f'{self.prefix}/{key}' if self.prefix else key
+
+    def put(self, key, data):
+        self._client.put_object(Bucket=self.bucket, Key=self._key(key), Body=data)
+
+    def read_ranges(self, key, ranges):
+        # Trechos próximos viram um GET só; o resto, um GET com Range cada
+        order = sorted(range(len(ranges)), key=lambda index: ranges[index][0])
+        chunks = [None] * len(ranges)
+        group = []
+        for index in order + [None]:
+            offset = ranges[index][0] if index is not None else None
+            if group and (index is None or offset - (ranges[group[-1]][0] + ranges[group[-1]][1]) > RANGE_MERGE_GAP):
+                start = ranges[group[0]][0]
+                end = max(ranges[i][0] + ranges[i][1] for i in group)
+                body = self._client.get_object(Bucket=self.bucket, Key=self._key(key),
+                                               Range=f'bytes={start}-{end - 1}')['Body'].read()
+                for i in group:
+                    chunks[i] = body[ranges[i][0] - start:ranges[i][0] - start + ranges[i][1]]
+                group = []
+            if index is not None:
+                group.append(index)
+        return chunks
+
+    def delete(self, key):
+        self._client.delete_object(Bucket=self.bucket, Key=self._key(key))
+
+    def keys(self):
+        paginator = self._client.get_paginator('list_objects_v2')
+        prefix = f'{self.prefix}/' if self.prefix else ''
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=prefix):
+            for item in page.get('Contents', []):
+                if item['Key'].endswith('.seg'):
+                    yield item['Key'][len(prefix):]
+
+
+def create_segment_store(url=None):
+    """
+    Cria o armazenamento a partir de 'url' ou ROUTE_ARCHIVE_URL: 's3://bucket/prefixo',
+    'file:///caminho' ou um caminho. Vazio = pasta route_archive no instance_path da app.
+    """
+    url = url if url is not None else os.getenv('ROUTE_ARCHIVE_URL', '')
+    if url.startswith('s3://'):
+        if boto3 is None:
+            raise RuntimeError('ROUTE_ARCHIVE_URL aponta para o S3, mas o pacote boto3 não está instalado')
+        bucket, _, prefix = url[len('s3://'):].partition('/')
+        return S3SegmentStore(bucket, prefix, os.getenv('ROUTE_ARCHIVE_S3_ENDPOINT') or None)
+    if url.startswith('file://'):
+        url = url[len('file://'):]
+    return LocalSegmentStore(url or os.path.join(current_app.instance_path, 'route_archive'))
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_segment_store():
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = create_segment_store()
+    return _store
+
+
+def segment_key(year, month, records):
+    created = datetime.utcnow().strftime('%Y%m%dT%H%M%S')
+    return f'{year:04d}/{month:02d}/{created}-{uuid.uuid4().hex[:8]}-n{records}.seg'
+
+
+def parse_ref(ref):
+    """'chave:offset:tamanho' -> (chave, offset, tamanho)."""
+    key, offset, length = ref.rsplit(':', 2)
+    return key, int(offset), int(length)
+
+
+# --- Reidratação ---
+
+class RouteCache:
+    """LRU das rotas reidratadas (texto JSON, como em route_data), limitada em bytes."""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._items = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, ref):
+        with self._lock:
+            route = self._items.get(ref)
+            if route is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(ref)
+            self.hits += 1
+            return route
+
+    def put(self, ref, route):
+        size = len(route)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._items.pop(ref, None)
+            if previous is not None:
+                self._size -= len(previous)
+            self._items[ref] = route
+            self._size += size
+            while self._size > self.max_bytes:
+                _, evicted = self._items.popitem(last=False)
+                self._size -= len(evicted)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self._size = 0
+
+
+route_cache = RouteCache(_env_int('ROUTE_ARCHIVE_CACHE_MB', DEFAULT_CACHE_MB) * 1024 * 1024)
+
+
+def load_routes(refs):
+    """{ref: route_data} das rotas arquivadas; uma leitura por segmento para o que não está na LRU."""
+    routes = {}
+    missing = defaultdict(list)
+    for ref in set(refs):
+        route = route_cache.get(ref)
+        if route is not None:
+            routes[ref] = route
+        else:
+            key, offset, length = parse_ref(ref)
+            missing[key].append((ref, offset, length))
+
+    if missing:
+        store = get_segment_store()
+        for key, items in missing.items():
+            chunks = store.read_ranges(key, [(offset, length) for _, offset, length in items])
+            for (ref, _, _), chunk in zip(items, chunks):
+                route = zlib.decompress(chunk).decode('utf-8')
+                route_cache.put(ref, route)
+                routes[ref] = route
+    return routes
+
+
+def load_route(ref):
+    return load_routes([ref])[ref]
+
+
+def rehydrate(items, refs):
+    """
+    Preenche 'route_data' dos dicts serializados de passeios arquivados ('refs'
+    alinhada com 'items'; None = rota na tabela). Se o arquivo não puder ser
+    lido, levanta ArchiveUnavailableError (o erro original vai para o log).
+    """
+    archived = [(item, ref) for item, ref in zip(items, refs) if ref]
+    if not archived:
+        return items
+    try:
+        routes = load_routes([ref for _, ref in archived])
+    except Exception as e:
+        logger.exception("Falha ao ler rotas arquivadas")
+        raise ArchiveUnavailableError('Arquivo de rotas indisponível') from e
+    for item, ref in archived:
+        item['route_data'] = routes[ref]
+    return items
+
+
+def with_archived_routes(rows, route_index, ref_index):
+    """
+    Tuplas de linhas com o route_data (posição route_index) preenchido a partir de
+    route_archive_ref (posição ref_index), para quem processa rotas em lote
+    (rescoring, backfill do mapa de calor).
+    """
+    refs = [row[ref_index] for row in rows if row[ref_index] and not row[route_index]]
+    if not refs:
+        return rows
+    routes = load_routes(refs)
+    filled = []
+    for row in rows:
+        ref = row[ref_index]
+        if ref and not row[route_index]:
+            row = tuple(row)
+            row = row[:route_index] + (routes[ref],) + row[route_index + 1:]
+        filled.append(row)
+    return filled
+
+
+# --- Arquivamento ---
+
+def _write_segment(store, year, month, rows):
+    """Grava um segmento com as rotas de 'rows' e aponta os passeios para ele. Retorna quantos mudaram."""
+    from src.routes.walks import compute_walk_metrics
+
+    chunks, pointers, summaries = [], [], []
+    offset = 0
+    for walk_id, _, start_time, end_time, route_data, analytics, start_cell, _ in rows:
+        chunk = zlib.compress(route_data.encode('utf-8'), COMPRESSION_LEVEL)
+        chunks.append(chunk)
+        pointers.append((walk_id, offset, len(chunk)))
+        offset += len(chunk)
+
+        # O resumo fica na linha: passeios antigos sem análise ou célula de início ganham agora
+        if analytics is None or start_cell is None:
+            try:
+                route_points = json.loads(route_data)
+            except ValueError:
+                route_points = None
+            metrics = compute_walk_metrics(start_time, end_time, route_points)
+            summary = {field: metrics[field] for field, current in
+                       (('analytics', analytics), ('start_cell', start_cell))
+                       if current is None and metrics[field] is not None}
+            if summary:
+                summaries.append({'id': walk_id, **summary})
+
+    key = segment_key(year, month, len(rows))
+    # Primeiro o segmento, depois os ponteiros: uma queda no meio deixa só um
+    # segmento sem referências (removido pela limpeza), nunca uma rota perdida
+    store.put(key, b''.join(chunks))
+
+    # Core executemany por conjunto de colunas, só onde ainda estão vazias: passeio
+    # excluído nesse meio tempo não derruba o lote (o UPDATE do ORM por chave exigiria a linha)
+    groups = defaultdict(list)
+    for summary in summaries:
+        groups[tuple(sorted(field for field in summary if field != 'id'))].append(summary)
+    for fields, group in groups.items():
+        db.session.execute(
+            update(_walks)
+            .where(_walks.c.id == bindparam('b_id'), *[_walks.c[field].is_(None) for field in fields])
+            .values({field: bindparam(f'b_{field}') for field in fields}),
+            [{'b_id': summary['id'], **{f'b_{field}': summary[field] for field in fields}} for summary in group]
+        )
+    moved = db.session.execute(
+        update(_walks)
+        .where(_walks.c.id == bindparam('b_id'), _walks.c.route_archive_ref.is_(None),
+               _walks.c.route_data.isnot(None))
+        .values(route_archive_ref=bindparam('b_ref'), route_data=None),
+        [{'b_id': walk_id, 'b_ref': f'{key}:{offset}:{length}'} for walk_id, offset, length in pointers]
+    ).rowcount
+    db.session.commit()
+    return moved
+
+
+def archive_old_routes(older_than_days=None, segment_walks=None, limit=None):
+    """
+    Move para o arquivo as rotas dos passeios finalizados há mais de
+    'older_than_days' dias, em segmentos de até 'segment_walks' passeios do
+    mesmo mês. Retorna quantos passeios foram arquivados.
+    """
+    from src.services.heatmap import tiles_from_route_data, index_walks_batch
+
+    if older_than_days is None:
+        older_than_days = _env_int('ROUTE_ARCHIVE_AFTER_DAYS', DEFAULT_AFTER_DAYS)
+    segment_walks = segment_walks or _env_int('ROUTE_ARCHIVE_SEGMENT_WALKS', DEFAULT_SEGMENT_WALKS)
+    cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+    store = get_segment_store()
+
+    archived = 0
+    last = None
+    while limit is None or archived < limit:
+        batch = segment_walks if limit is None else min(segment_walks, limit - archived)
+        # Em ordem de data (chave: created_at, id) para os segmentos saírem cheios e do mesmo mês
+        query = db.session.query(Walk.id, Walk.created_at, Walk.start_time, Walk.end_time, Walk.route_data,
+                                 Walk.analytics, Walk.start_cell, Walk.heatmap_indexed)\
+                          .filter(Walk.created_at < cutoff, Walk.end_time.isnot(None),
+                                  Walk.route_data.isnot(None), Walk.route_archive_ref.is_(None))
+        if last is not None:
+            query = query.filter(tuple_(Walk.created_at, Walk.id) > last)
+        rows = query.order_by(Walk.created_at, Walk.id).limit(batch).all()
+        if not rows:
+            break
+        last = (rows[-1].created_at, rows[-1].id)
+
+        # O mapa de calor precisa da rota: agrega antes de ela sair da tabela
+        unindexed = {row.id: tiles_from_route_data(row.route_data) for row in rows if not row.heatmap_indexed}
+        if unindexed:
+            index_walks_batch(unindexed)
+
+        by_month = defaultdict(list)
+        for row in rows:
+            by_month[(row.created_at.year, row.created_at.month)].append(row)
+        for (year, month), month_rows in sorted(by_month.items()):
+            archived += _write_segment(store, year, month, month_rows)
+    return archived
+
+
+def restore_archived_routes(batch_size=500):
+    """Devolve as rotas arquivadas para route_data (desfaz o arquivamento). Retorna quantas."""
+    restored = 0
+    last_id = 0
+    while True:
+        rows = db.session.query(Walk.id, Walk.route_archive_ref)\
+                         .filter(Walk.id > last_id, Walk.route_archive_ref.isnot(None))\
+                         .order_by(Walk.id).limit(batch_size).all()
+        if not rows:
+            return restored
+        last_id = rows[-1][0]
+        routes = load_routes([ref for _, ref in rows])
+        restored += db.session.execute(
+            update(_walks)
+            .where(_walks.c.id == bindparam('b_id'), _walks.c.route_archive_ref == bindparam('b_ref'))
+            .values(route_data=bindparam('b_route'), route_archive_ref=None),
+            [{'b_id': walk_id, 'b_ref': ref, 'b_route': routes[ref]} for walk_id, ref in rows]
+        ).rowcount
+        db.session.commit()
+
+
+# --- Limpeza ---
+
+def _segment_info(key):
+    """(criação, registros) a partir do nome do segmento, ou None se não for um segmento nosso."""
+    match = _SEGMENT_NAME.search(key)
+    if not match:
+        return None
+    return datetime.strptime(match.group(1), '%Y%m%dT%H%M%S'), int(match.group(2))
+
+
+def _rewrite_segment(store, key):
+    """Regrava o segmento só com os registros ainda referenciados e aponta os passeios para a cópia."""
+    rows = db.session.query(Walk.id, Walk.route_archive_ref)\
+                     .filter(Walk.route_archive_ref.like(f'{key}:%')).order_by(Walk.id).all()
+    if not rows:
+        store.delete(key)
+        return
+    chunks = store.read_ranges(key, [parse_ref(ref)[1:] for _, ref in rows])
+    year, month = key.split('/')[:2]
+    new_key = segment_key(int(year), int(month), len(rows))
+
+    params, offset = [], 0
+    for (walk_id, ref), chunk in zip(rows, chunks):
+        params.append({'b_id': walk_id, 'b_old': ref, 'b_ref': f'{new_key}:{offset}:{len(chunk)}'})
+        offset += len(chunk)
+    store.put(new_key, b''.join(chunks))
+    db.session.execute(
+        update(_walks)
+        .where(_walks.c.id == bindparam('b_id'), _walks.c.route_archive_ref == bindparam('b_old'))
+        .values(route_archive_ref=bindparam('b_ref')),
+        params
+    )
+    db.session.commit()
+    store.delete(key)
+
+
+def vacuum_segments(grace_seconds=VACUUM_GRACE_SECONDS):
+    """
+    Apaga os segmentos sem passeios que apontem para eles e regrava os que têm
+    registros mortos (passeios excluídos, arquivamentos repetidos). Retorna
+    (apagados, regravados).
+    """
+    store = get_segment_store()
+    live = Counter(
+        parse_ref(ref)[0] for (ref,) in db.session.query(Walk.route_archive_ref)
+                                              .filter(Walk.route_archive_ref.isnot(None))
+                                              .yield_per(5000)
+    )
+    deleted = rewritten = 0
+    now = datetime.utcnow()
+    for key in list(store.keys()):
+        info = _segment_info(key)
+        if info is None or (now - info[0]).total_seconds() < grace_seconds:
+            continue
+        alive = live.get(key, 0)
+        if alive >= info[1]:
+            continue
+        if alive:
+            _rewrite_segment(store, key)
+            rewritten += 1
+        else:
+            store.delete(key)
+            deleted += 1
+    return deleted, rewritten
+
+
+def maintain_route_archive():
+    """Tarefa periódica: arquiva as rotas antigas e limpa os segmentos."""
+    archived = archive_old_routes()
+    deleted, rewritten = vacuum_segments()
+    if archived or deleted or rewritten:
+        logger.info("Arquivo de rotas: %d passeios arquivados, %d segmentos apagados, %d regravados",
+                    archived, deleted, rewritten)
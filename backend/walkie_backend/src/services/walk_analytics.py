@@ -0,0 +1,211 @@
+# Em: backend/walkie_backend/src/services/walk_analytics.py
+# (Arquivo Novo)
+#
+# Análise do percurso calculada uma única vez na finalização do passeio:
+# parciais por quilômetro, tempo em movimento x parado, curva de ritmo e
+# calorias somadas por trecho (MET pela velocidade de cada trecho).
+# O resultado fica em Walk.analytics (JSON compacto) e a tela de detalhes
+# lê só ele, sem abrir o route_data.
+#
+# Os tempos vêm do 'timestamp' de cada ponto (ISO 8601 ou epoch em ms/s) quando
+# todos os pontos têm um válido e crescente; senão os pontos são distribuídos
+# uniformemente entre o início e o fim do passeio. Usa numpy quando instalado.
+
+import json
+import math
+from bisect import bisect_right
+from datetime import datetime
+
+try:
+    import numpy as np
+except ImportError:  # numpy é opcional; sem ele os mesmos cálculos rodam em Python puro
+    np = None
+
+ANALYTICS_VERSION = 1
+EARTH_RADIUS_M = 6371000
+DEFAULT_WEIGHT_KG = 70
+SPLIT_METERS = 1000
+# Abaixo dessa velocidade (m/s) o trecho conta como parado
+STOPPED_SPEED_MS = 0.5
+PACE_CURVE_POINTS = 50
+PACE_CURVE_MIN_STEP = 100  # metros
+
+# MET por faixa de velocidade (km/h): < 3, < 5, < 6, acima
+MET_SPEED_LIMITS = (3, 5, 6)
+MET_VALUES = (2.5, 3.5, 4.3, 5.0)
+
+
+def met_for_speed(speed_kmh):
+    return MET_VALUES[bisect_right(MET_SPEED_LIMITS, speed_kmh)]
+
+
+def _parse_timestamp(value):
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return value / 1000 if value > 1e11 else float(value)  # epoch em ms ou s
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value.replace('Z', '+00:00')).timestamp()
+        except ValueError:
+            return None
+    return None
+
+
+def _valid_points(route_points):
+    points = []
+    for point in route_points or ():
+        try:
+            lat, lng = float(point['lat']), float(point['lng'])
+        except (KeyError, TypeError, ValueError):
+            continue
+        if -90 <= lat <= 90 and -180 <= lng <= 180:
+            points.append((lat, lng, point.get('timestamp')))
+    return points
+
+
+def _relative_times(points, start_time, end_time):
+    """Segundos desde o primeiro ponto; retorna (tempos, veio_do_cliente)."""
+    stamps = [_parse_timestamp(ts) for _, _, ts in points]
+    if all(stamp is not None for stamp in stamps) \
+            and all(b >= a for a, b in zip(stamps, stamps[1:])) and stamps[-1] > stamps[0]:
+        return [stamp - stamps[0] for stamp in stamps], True
+
+    duration = max((end_time - start_time).total_seconds(), 0)
+    step = duration / (len(points) - 1)
+    return [i * step for i in range(len(points))], False
+
+
+# --- Implementação vetorizada (numpy) ---
+
+def _segments_numpy(lats, lngs, times):
+    lat = np.radians(np.asarray(lats, dtype=float))
+    lng = np.radians(np.asarray(lngs, dtype=float))
+    a = np.sin(np.diff(lat) / 2) ** 2 + np.cos(lat[:-1]) * np.cos(lat[1:]) * np.sin(np.diff(lng) / 2) ** 2
+    seg_distance = EARTH_RADIUS_M * 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+    seg_time = np.diff(np.asarray(times, dtype=float))
+    cumulative = np.concatenate(([0.0], np.cumsum(seg_distance)))
+
+    moving_mask = (seg_time > 0) & (seg_distance >= STOPPED_SPEED_MS * seg_time)
+    moving_time = float(seg_time[moving_mask].sum())
+
+    timed = seg_time > 0
+    speed_kmh = np.zeros_like(seg_distance)
+    speed_kmh[timed] = seg_distance[timed] / seg_time[timed] * 3.6
+    mets = np.asarray(MET_VALUES)[np.searchsorted(MET_SPEED_LIMITS, speed_kmh, side='right')]
+    calories = float((mets * seg_time)[timed].sum() * DEFAULT_WEIGHT_KG / 3600)
+
+    # Só o primeiro ponto de cada trecho parado: com distâncias repetidas o np.interp
+    # devolveria o último instante; assim é o primeiro, como em _segments_python
+    reach = np.concatenate(([True], np.diff(cumulative) > 0))
+    reach_distance = cumulative[reach]
+    reach_time = np.asarray(times, dtype=float)[reach]
+
+    def interp(distances):
+        return np.interp(np.asarray(distances, dtype=float), reach_distance, reach_time).tolist()
+
+    return float(cumulative[-1]), moving_time, calories, interp
+
+
+# --- Mesma coisa em Python puro ---
+
+def _segments_python(lats, lngs, times):
+    from src.routes.walks import calculate_distance
+    cumulative = [0.0]
+    moving_time = 0.0
+    calories = 0.0
+    for i in range(1, len(lats)):
+        distance = calculate_distance(lats[i - 1], lngs[i - 1], lats[i], lngs[i])
+        elapsed = times[i] - times[i - 1]
+        cumulative.append(cumulative[-1] + distance)
+        if elapsed > 0:
+            if distance >= STOPPED_SPEED_MS * elapsed:
+                moving_time += elapsed
+            calories += met_for_speed(distance / elapsed * 3.6) * elapsed
+    calories = calories * DEFAULT_WEIGHT_KG / 3600
+
+    # Só o primeiro ponto de cada trecho parado (mesmos pontos de _segments_numpy)
+    reach = [i for i in range(len(cumulative)) if i == 0 or cumulative[i] > cumulative[i - 1]]
+    reach_distance = [cumulative[i] for i in reach]
+    reach_time = [times[i] for i in reach]
+
+    def interp(distances):
+        # Primeiro instante em que a distância acumulada alcança cada valor (ordenados)
+        result = []
+        j = 0
+        for target in distances:
+            if target <= reach_distance[0]:
+                result.append(reach_time[0])
+                continue
+            if target >= reach_distance[-1]:
+                result.append(reach_time[-1])
+                continue
+            while reach_distance[j + 1] < target:
+                j += 1
+            span = reach_distance[j + 1] - reach_distance[j]
+            result.append(reach_time[j] + (target - reach_distance[j]) / span * (reach_time[j + 1] - reach_time[j]))
+        return result
+
+    return cumulative[-1], moving_time, calories, interp
+
+
+def _pace(seconds, meters):
+    return round((seconds / 60) / (meters / 1000), 2) if meters > 0 else None
+
+
+def compute_walk_analytics(route_points, start_time, end_time):
+    """Resumo do percurso (dict) ou None se a rota tiver menos de dois pontos válidos."""
+    points = _valid_points(route_points)
+    if len(points) < 2:
+        return None
+
+    times, client_times = _relative_times(points, start_time, end_time)
+    lats = [lat for lat, _, _ in points]
+    lngs = [lng for _, lng, _ in points]
+    segments = _segments_numpy if np is not None else _segments_python
+    total_distance, moving_time, calories, interp = segments(lats, lngs, times)
+    if total_distance <= 0:
+        return None
+    total_time = times[-1]
+
+    # Parciais por quilômetro (a última pode ser parcial)
+    full_splits = int(total_distance // SPLIT_METERS)
+    boundaries = [SPLIT_METERS * k for k in range(1, full_splits + 1)]
+    crossings = [0.0] + interp(boundaries)
+    splits = []
+    for k in range(1, full_splits + 1):
+        seconds = crossings[k] - crossings[k - 1]
+        splits.append({'km': k, 'seconds': round(seconds), 'pace': _pace(seconds, SPLIT_METERS)})
+    remainder = total_distance - full_splits * SPLIT_METERS
+    if remainder >= 1:
+        seconds = total_time - crossings[-1]
+        splits.append({'km': full_splits + 1, 'distance': round(remainder, 1),
+                       'seconds': round(seconds), 'pace': _pace(seconds, remainder)})
+
+    fastest = min((split for split in splits if 'distance' not in split and split['pace']),
+                  key=lambda split: split['pace'], default=None)
+
+    # Curva de ritmo: no máximo PACE_CURVE_POINTS janelas de 'step' metros
+    step = max(PACE_CURVE_MIN_STEP,
+               PACE_CURVE_MIN_STEP * math.ceil(total_distance / (PACE_CURVE_POINTS * PACE_CURVE_MIN_STEP)))
+    grid = [step * k for k in range(int(total_distance // step) + 1)]
+    grid_times = interp(grid)
+    pace_curve = [[grid[k], _pace(grid_times[k] - grid_times[k - 1], step)] for k in range(1, len(grid))]
+
+    return {
+        'v': ANALYTICS_VERSION,
+        'distance': round(total_distance, 1),
+        'moving_time': round(moving_time),
+        'stopped_time': round(max(total_time - moving_time, 0)),
+        'moving_pace': _pace(moving_time, total_distance) if moving_time else None,
+        'splits': splits,
+        'fastest_split': {'km': fastest['km'], 'pace': fastest['pace']} if fastest else None,
+        'pace_curve': pace_curve,
+        'calories': int(calories),
+        'timed': client_times
+    }
+
+
+def dumps_analytics(analytics):
+    """JSON compacto para a coluna Walk.analytics."""
+    return json.dumps(analytics, separators=(',', ':')) if analytics else None
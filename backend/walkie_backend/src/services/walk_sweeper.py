@@ -0,0 +1,127 @@
+# Em: backend/walkie_backend/src/services/walk_sweeper.py
+# (Arquivo Novo)
+
+import json
+import logging
+import os
+from datetime import datetime, timedelta
+from sqlalchemy import update
+from src.models.models import db, Walk
+from src.routes.walks import compute_walk_metrics, check_and_award_badges
+from src.utils.caching import bump_user_version
+from src.utils.jobs import job_queue
+from src.services.live_tracking import live_tracker
+from src.services.heatmap import index_walk
+from src.services.points import record_points, WALK_COMPLETED
+from src.services.active_walks import invalidate_active_walks
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_AGE_HOURS = 4
+DEFAULT_BATCH_SIZE = 200
+
+
+def get_max_age_hours():
+    return float(os.getenv('STUCK_WALK_MAX_AGE_HOURS', DEFAULT_MAX_AGE_HOURS))
+
+
+def stuck_walks_query(max_age_hours=None):
+    """Passeios abertos (end_time nulo) iniciados há mais de 'max_age_hours' horas."""
+    if max_age_hours is None:
+        max_age_hours = get_max_age_hours()
+    limit = datetime.utcnow() - timedelta(hours=max_age_hours)
+    # Usa o índice (end_time, start_time)
+    return Walk.query.filter(Walk.end_time.is_(None), Walk.start_time < limit)
+
+
+def evaluate_badges(user_id):
+    """Tarefa de segundo plano: avalia os badges de um usuário."""
+    check_and_award_badges(user_id)
+    db.session.commit()
+
+
+def _claim_batch(walk_ids):
+    """
+    Marca o lote como finalizado e retorna os passeios efetivamente reivindicados,
+    para que dois workers nunca finalizem o mesmo passeio.
+    """
+    # Segundos inteiros: DATETIME do MySQL não guarda frações, e o end_time gravado
+    # precisa ser o mesmo usado no cálculo da duração
+    claim_time = datetime.utcnow().replace(microsecond=0)
+    claimed_ids = []
+    for walk_id in walk_ids:
+        # Um UPDATE por passeio: o rowcount diz quem ganhou a disputa, sem depender
+        # de reler pelo end_time (outro worker pode ter usado o mesmo segundo)
+        result = db.session.execute(
+            update(Walk)
+            .where(Walk.id == walk_id, Walk.end_time.is_(None))
+            .values(end_time=claim_time)
+        )
+        if result.rowcount == 1:
+            claimed_ids.append(walk_id)
+    if not claimed_ids:
+        return claim_time, []
+    claimed = db.session.query(Walk.id, Walk.user_id, Walk.start_time, Walk.route_data)\
+                        .filter(Walk.id.in_(claimed_ids)).all()
+    return claim_time, claimed
+
+
+def _finalize_batch(walk_ids):
+    claim_time, claimed = _claim_batch(walk_ids)
+
+    walk_updates = []
+    point_entries = []
+    affected_users = set()
+    for walk_id, user_id, start_time, route_data in claimed:
+        try:
+            route_points = json.loads(route_data) if route_data else None
+        except ValueError:
+            route_points = None
+        metrics = compute_walk_metrics(start_time, claim_time, route_points)
+        walk_updates.append({'id': walk_id, **metrics})
+        point_entries.append((user_id, metrics['points_earned'], WALK_COMPLETED, walk_id))
+        affected_users.add(user_id)
+
+    if walk_updates:
+        # UPDATE em lote por chave primária
+        db.session.execute(update(Walk), walk_updates)
+
+    record_points(point_entries)
+    bump_user_version(*affected_users)
+
+    db.session.commit()
+    return [walk_id for walk_id, _, _, _ in claimed], affected_users
+
+
+def sweep_stuck_walks(max_age_hours=None, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Finaliza em lotes os passeios travados, com as mesmas métricas do finish_walk,
+    e agenda a avaliação de badges uma única vez por usuário afetado.
+    Retorna um resumo com os passeios finalizados.
+    """
+    walk_ids = [walk_id for (walk_id,) in
+                stuck_walks_query(max_age_hours).with_entities(Walk.id).order_by(Walk.id).all()]
+
+    finalized = []
+    affected_users = set()
+    for i in range(0, len(walk_ids), batch_size):
+        batch_finalized, batch_users = _finalize_batch(walk_ids[i:i + batch_size])
+        finalized.extend(batch_finalized)
+        affected_users |= batch_users
+
+    # Estado ao vivo que tenha sobrado desses passeios não é mais gravado
+    live_tracker.discard(*finalized)
+    invalidate_active_walks(*affected_users)
+
+    for user_id in affected_users:
+        job_queue.enqueue(evaluate_badges, user_id, key=('badges', user_id))
+    for walk_id in finalized:
+        job_queue.enqueue(index_walk, walk_id, key=('heatmap', walk_id))
+
+    if finalized:
+        logger.info("Passeios travados finalizados: %d (%d usuários)", len(finalized), len(affected_users))
+
+    return {
+        'finalized_walks': finalized,
+        'affected_users': sorted(affected_users)
+    }
@@ -0,0 +1,59 @@
+# Em: backend/walkie_backend/src/utils/caching.py
+# (Arquivo Novo)
+#
+# GET condicional (ETag / If-None-Match) para leituras por usuário.
+# Cada usuário tem um 'data_version' que avança a cada escrita que muda suas
+# leituras (passeio, badge, perfil, pets). O ETag deriva dessa versão, então
+# a resposta 304 sai sem nenhuma query além da autenticação.
+
+import os
+import zlib
+from functools import wraps
+from flask import request, make_response
+from sqlalchemy import update
+from src.models.models import db, User
+
+# Mude (ex: no deploy) quando o catálogo de badges ou o formato das respostas mudar
+RESPONSE_VERSION = os.getenv('RESPONSE_CACHE_VERSION', '1')
+
+
+def bump_user_version(*user_ids):
+    """Avança o data_version dos usuários na transação atual (UPDATE atômico, sem commit)."""
+    user_ids = [user_id for user_id in user_ids if user_id is not None]
+    if not user_ids:
+        return
+    db.session.execute(
+        update(User)
+        .where(User.id.in_(user_ids))
+        .values(data_version=User.data_version + 1),
+        execution_options={'synchronize_session': False}
+    )
+
+
+def user_etag(user, scope):
+    query = request.query_string
+    query_hash = f'{zlib.crc32(query):08x}' if query else '0'
+    return f'{RESPONSE_VERSION}-{scope}-{user.id}-{user.data_version or 0}-{query_hash}'
+
+
+def conditional_get(scope):
+    """
+    Decorador para rotas GET com token_required (colocar abaixo dele).
+    Responde 304 quando o If-None-Match bate com a versão atual do usuário,
+    antes de executar a rota; senão executa e anexa o ETag.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated(current_user, *args, **kwargs):
+            etag = user_etag(current_user, scope)
+            if request.if_none_match.contains_weak(etag):
+                response = make_response('', 304)
+            else:
+                response = make_response(f(current_user, *args, **kwargs))
+                if response.status_code != 200:
+                    return response
+            response.set_etag(etag, weak=True)
+            response.headers['Cache-Control'] = 'private, no-cache'
+            return response
+        return decorated
+    return decorator
@@ -0,0 +1,151 @@
+# Em: backend/walkie_backend/src/utils/compression.py
+# (Arquivo Novo)
+#
+# Compressão das respostas (gzip/brotli negociados pelo Accept-Encoding) e leitura
+# de corpos de requisição enviados com Content-Encoding: gzip (rotas de GPS).
+
+import json
+import os
+import zlib
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # brotli é opcional; sem ele só gzip é oferecido
+    brotli = None
+
+COMPRESSIBLE_MIMETYPES = {
+    'application/json', 'application/x-ndjson', 'text/csv', 'text/html',
+    'text/plain', 'text/css', 'application/javascript', 'image/svg+xml',
+}
+
+
+class _GzipEncoder:
+    name = 'gzip'
+
+    def __init__(self, level):
+        # wbits=31 -> formato gzip (cabeçalho + crc)
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data):
+        return self._compressor.compress(data)
+
+    def flush(self):
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self._compressor.flush(zlib.Z_FINISH)
+
+
+class _BrotliEncoder:
+    name = 'br'
+
+    def __init__(self, quality):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data):
+        return self._compressor.process(data)
+
+    def flush(self):
+        return self._compressor.flush()
+
+    def finish(self):
+        return self._compressor.finish()
+
+
+class Compression:
+    """
+    Comprime as respostas no after_request. Configuração (variáveis de ambiente):
+    COMPRESSION_MIN_SIZE (bytes, padrão 1024), COMPRESSION_GZIP_LEVEL (padrão 6),
+    COMPRESSION_BROTLI_QUALITY (padrão 4) e COMPRESSION_ENABLED (padrão true).
+    """
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.enabled = os.getenv('COMPRESSION_ENABLED', 'true').lower() == 'true'
+        self.min_size = int(os.getenv('COMPRESSION_MIN_SIZE', 1024))
+        self.gzip_level = int(os.getenv('COMPRESSION_GZIP_LEVEL', 6))
+        self.brotli_quality = int(os.getenv('COMPRESSION_BROTLI_QUALITY', 4))
+        app.after_request(self.compress_response)
+        app.extensions['compression'] = self
+
+    def _choose_encoder(self):
+        accepted = request.accept_encodings
+        if brotli is not None and accepted['br']:
+            return _BrotliEncoder(self.brotli_quality)
+        if accepted['gzip']:
+            return _GzipEncoder(self.gzip_level)
+        return None
+
+    def compress_response(self, response):
+        if (not self.enabled
+                or response.status_code < 200 or response.status_code in (204, 304)
+                or response.direct_passthrough
+                or 'Content-Encoding' in response.headers
+                or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+            return response
+
+        response.vary.add('Accept-Encoding')
+        encoder = self._choose_encoder()
+        if encoder is None:
+            return response
+
+        if response.is_streamed:
+            response.response = self._stream(response.response, encoder)
+            response.headers.pop('Content-Length', None)
+        else:
+            data = response.get_data()
+            if len(data) < self.min_size:
+                return response
+            response.set_data(encoder.compress(data) + encoder.finish())
+
+        response.headers['Content-Encoding'] = encoder.name
+        return response
+
+    @staticmethod
+    def _stream(chunks, encoder):
+        # Cada bloco é comprimido e enviado em seguida (flush), mantendo o streaming
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode('utf-8')
+            data = encoder.compress(chunk) + encoder.flush()
+            if data:
+                yield data
+        yield encoder.finish()
+
+
+class RequestBodyError(ValueError):
+    """Corpo da requisição inválido; 'status_code' é o HTTP a devolver."""
+
+    def __init__(self, message, status_code=400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def get_request_json():
+    """
+    Igual ao request.get_json(), mas aceita corpo comprimido (Content-Encoding: gzip).
+    O tamanho descomprimido é limitado por MAX_DECOMPRESSED_BODY (padrão 20 MB).
+    Levanta RequestBodyError em corpo inválido ou grande demais.
+    """
+    encoding = request.headers.get('Content-Encoding', '').lower()
+    if encoding in ('', 'identity'):
+        return request.get_json()
+    if encoding != 'gzip':
+        raise RequestBodyError('Content-Encoding não suportado', 415)
+
+    max_size = int(os.getenv('MAX_DECOMPRESSED_BODY', 20 * 1024 * 1024))
+    decompressor = zlib.decompressobj(47)  # 47 = aceita gzip ou zlib
+    try:
+        body = decompressor.decompress(request.get_data(), max_size)
+    except zlib.error:
+        raise RequestBodyError('Corpo gzip inválido')
+    if decompressor.unconsumed_tail:
+        raise RequestBodyError('Corpo descomprimido grande demais', 413)
+    try:
+        return json.loads(body)
+    except ValueError:
+        raise RequestBodyError('JSON inválido')
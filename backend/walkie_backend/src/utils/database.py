@@ -0,0 +1,109 @@
+# Em: backend/walkie_backend/src/utils/database.py
+# (Arquivo Novo)
+
+import os
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import StaticPool
+
+
+def _env_int(name, default):
+    value = os.getenv(name)
+    return int(value) if value not in (None, '') else default
+
+
+def _env_bool(name, default):
+    value = os.getenv(name)
+    if value in (None, ''):
+        return default
+    return value.strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+def get_database_uri():
+    """
+    Retorna a URL do banco de dados.
+    DATABASE_URL tem prioridade (ex: 'sqlite:///walkie.db' ou 'sqlite://' para memória);
+    sem ela, monta a URL do MySQL a partir de DB_USER/DB_PASSWORD/DB_HOST/DB_NAME.
+    """
+    database_url = os.getenv('DATABASE_URL')
+    if database_url:
+        return database_url
+
+    db_user = os.getenv('DB_USER')
+    db_password = os.getenv('DB_PASSWORD')
+    db_host = os.getenv('DB_HOST')
+    db_name = os.getenv('DB_NAME')
+    return f'mysql+mysqlconnector://{db_user}:{db_password}@{db_host}/{db_name}'
+
+
+def is_sqlite(uri):
+    return make_url(uri).get_backend_name() == 'sqlite'
+
+
+def is_sqlite_memory(uri):
+    url = make_url(uri)
+    return url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:')
+
+
+def get_engine_options(uri):
+    """
+    Monta as opções do engine (SQLALCHEMY_ENGINE_OPTIONS) a partir das variáveis de ambiente:
+    DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT, DB_POOL_RECYCLE e DB_POOL_PRE_PING.
+    """
+    if is_sqlite_memory(uri):
+        # Um único banco em memória compartilhado por todas as threads
+        return {
+            'poolclass': StaticPool,
+            'connect_args': {'check_same_thread': False},
+        }
+
+    if is_sqlite(uri):
+        return {
+            'pool_size': _env_int('DB_POOL_SIZE', 5),
+            'max_overflow': _env_int('DB_MAX_OVERFLOW', 10),
+            'pool_timeout': _env_int('DB_POOL_TIMEOUT', 30),
+            'pool_pre_ping': _env_bool('DB_POOL_PRE_PING', False),
+            'connect_args': {'check_same_thread': False, 'timeout': _env_int('DB_POOL_TIMEOUT', 30)},
+        }
+
+    return {
+        'pool_size': _env_int('DB_POOL_SIZE', 10),
+        'max_overflow': _env_int('DB_MAX_OVERFLOW', 20),
+        'pool_timeout': _env_int('DB_POOL_TIMEOUT', 30),
+        # Abaixo do wait_timeout padrão do MySQL (8h) para não reutilizar conexões mortas
+        'pool_recycle': _env_int('DB_POOL_RECYCLE', 1800),
+        'pool_pre_ping': _env_bool('DB_POOL_PRE_PING', True),
+    }
+
+
+def configure_engine(engine):
+    """Ajustes por conexão que dependem do dialeto (ex: foreign keys no SQLite)."""
+    if engine.dialect.name != 'sqlite':
+        return
+
+    @event.listens_for(engine, 'connect')
+    def _sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute('PRAGMA foreign_keys=ON')
+        if not is_sqlite_memory(str(engine.url)):
+            cursor.execute('PRAGMA journal_mode=WAL')
+        cursor.close()
+
+
+def pool_status(engine):
+    """Retorna estatísticas do pool de conexões do engine."""
+    pool = engine.pool
+    status = {
+        'pool_class': type(pool).__name__,
+        'dialect': engine.dialect.name,
+    }
+    for key, attr in (('size', 'size'), ('checked_in', 'checkedin'),
+                      ('checked_out', 'checkedout'), ('overflow', 'overflow')):
+        method = getattr(pool, attr, None)
+        if callable(method):
+            status[key] = method()
+    max_overflow = getattr(pool, '_max_overflow', None)
+    if max_overflow is not None and 'size' in status:
+        # max_overflow negativo (DB_MAX_OVERFLOW=-1): o pool abre quantas conexões precisar
+        status['max_connections'] = status['size'] + max_overflow if max_overflow >= 0 else None
+    return status
@@ -0,0 +1,64 @@
+# Em: backend/walkie_backend/src/utils/export.py
+# (Arquivo Novo)
+
+import csv
+import io
+import json
+from flask import Response, stream_with_context
+
+EXPORT_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+# Quantidade de linhas buscadas por vez no cursor do servidor
+DEFAULT_CHUNK_SIZE = 500
+
+
+def iter_rows(query, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Itera sobre a query em lotes usando um cursor no servidor (memória constante)."""
+    return query.execution_options(stream_results=True).yield_per(chunk_size)
+
+
+def _ndjson_chunks(rows, chunk_size):
+    buffer = []
+    for row in rows:
+        buffer.append(json.dumps(row.to_dict(), ensure_ascii=False))
+        if len(buffer) >= chunk_size:
+            yield '\n'.join(buffer) + '\n'
+            buffer = []
+    if buffer:
+        yield '\n'.join(buffer) + '\n'
+
+
+def _csv_chunks(rows, fields, chunk_size):
+    output = io.StringIO()
+    writer = csv.DictWriter(output, fieldnames=fields, extrasaction='ignore')
+    writer.writeheader()
+    count = 0
+    for row in rows:
+        writer.writerow(row.to_dict())
+        count += 1
+        if count >= chunk_size:
+            yield output.getvalue()
+            output.seek(0)
+            output.truncate(0)
+            count = 0
+    if output.tell():
+        yield output.getvalue()
+
+
+def stream_export(query, fields, export_format, filename, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Gera uma resposta em streaming (NDJSON ou CSV) a partir de uma query,
+    sem carregar a tabela inteira na memória.
+    """
+    rows = iter_rows(query, chunk_size)
+    if export_format == 'csv':
+        chunks = _csv_chunks(rows, fields, chunk_size)
+    else:
+        chunks = _ndjson_chunks(rows, chunk_size)
+
+    response = Response(stream_with_context(chunks), mimetype=EXPORT_FORMATS[export_format])
+    response.headers['Content-Disposition'] = f'attachment; filename={filename}.{export_format}'
+    return response
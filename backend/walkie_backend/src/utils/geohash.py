@@ -0,0 +1,83 @@
+# Em: backend/walkie_backend/src/utils/geohash.py
+# (Arquivo Novo)
+#
+# Geohash: divide o mapa em células retangulares identificadas por uma string
+# base32; prefixos maiores = células menores. Precisão 5 ~ 4,9 km x 4,9 km.
+
+_BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+_DECODE = {char: index for index, char in enumerate(_BASE32)}
+
+# Precisão da célula de início dos passeios (ranking local)
+START_CELL_PRECISION = 5
+
+
+def encode(lat, lng, precision=START_CELL_PRECISION):
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    cell = []
+    bits = bit_count = 0
+    use_lng = True
+    while len(cell) < precision:
+        bounds, value = (lng_range, lng) if use_lng else (lat_range, lat)
+        mid = (bounds[0] + bounds[1]) / 2
+        if value >= mid:
+            bits = bits * 2 + 1
+            bounds[0] = mid
+        else:
+            bits = bits * 2
+            bounds[1] = mid
+        use_lng = not use_lng
+        bit_count += 1
+        if bit_count == 5:
+            cell.append(_BASE32[bits])
+            bits = bit_count = 0
+    return ''.join(cell)
+
+
+def decode_bounds(cell):
+    """Retorna ((lat_min, lat_max), (lng_min, lng_max)) da célula."""
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    use_lng = True
+    for char in cell:
+        value = _DECODE[char]
+        for shift in range(4, -1, -1):
+            bounds = lng_range if use_lng else lat_range
+            mid = (bounds[0] + bounds[1]) / 2
+            if (value >> shift) & 1:
+                bounds[0] = mid
+            else:
+                bounds[1] = mid
+            use_lng = not use_lng
+    return tuple(lat_range), tuple(lng_range)
+
+
+def neighbors(cell):
+    """A célula e suas vizinhas (até 9), na mesma precisão."""
+    (lat_min, lat_max), (lng_min, lng_max) = decode_bounds(cell)
+    lat_step, lng_step = lat_max - lat_min, lng_max - lng_min
+    lat_center, lng_center = (lat_min + lat_max) / 2, (lng_min + lng_max) / 2
+
+    cells = []
+    for dy in (-1, 0, 1):
+        lat = lat_center + dy * lat_step
+        if not -90 < lat < 90:
+            continue
+        for dx in (-1, 0, 1):
+            lng = (lng_center + dx * lng_step + 180) % 360 - 180
+            neighbor = encode(lat, lng, len(cell))
+            if neighbor not in cells:
+                cells.append(neighbor)
+    return cells
+
+
+def route_start_cell(route_points, precision=START_CELL_PRECISION):
+    """Célula do primeiro ponto válido da rota [{'lat', 'lng'}, ...], ou None."""
+    for point in route_points or ():
+        try:
+            lat, lng = float(point['lat']), float(point['lng'])
+        except (KeyError, TypeError, ValueError):
+            continue
+        if -90 <= lat <= 90 and -180 <= lng <= 180:
+            return encode(lat, lng, precision)
+    return None
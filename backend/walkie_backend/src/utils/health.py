@@ -0,0 +1,154 @@
+# Em: backend/walkie_backend/src/utils/health.py
+# (Arquivo Novo)
+#
+# Verificações de saúde para o balanceador de carga. Liveness só diz que o
+# processo responde; readiness confere as dependências do worker (latência do
+# banco, uso do pool de conexões, fila de tarefas e pasta de uploads) e devolve
+# 503 quando alguma falha, para o worker sair da rotação antes de a latência
+# subir. O resultado fica em cache por alguns segundos para as sondas (vários
+# balanceadores batendo a cada segundo) não custarem uma ida ao banco cada uma.
+
+import logging
+import os
+import shutil
+import threading
+import time
+from sqlalchemy import text
+
+logger = logging.getLogger(__name__)
+
+
+def _env_float(name, default):
+    value = os.getenv(name)
+    return float(value) if value not in (None, '') else default
+
+
+class HealthChecks:
+    """
+    Configuração (variáveis de ambiente): HEALTH_CACHE_SECONDS (padrão 2),
+    HEALTH_DB_LATENCY_MS (ida e volta máxima ao banco, padrão 250),
+    HEALTH_POOL_MAX_USAGE (fração do pool em uso, padrão 0.9),
+    HEALTH_JOB_BACKLOG_MAX (tarefas pendentes, padrão 100) e
+    HEALTH_MIN_FREE_MB (espaço livre na pasta de uploads, padrão 100).
+    """
+
+    def __init__(self, app=None):
+        self.app = None
+        self._lock = threading.Lock()
+        self._cached = None
+        self._cached_at = 0.0
+        self._started_at = time.time()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.cache_seconds = _env_float('HEALTH_CACHE_SECONDS', 2)
+        self.db_latency_limit = _env_float('HEALTH_DB_LATENCY_MS', 250) / 1000
+        self.pool_max_usage = _env_float('HEALTH_POOL_MAX_USAGE', 0.9)
+        self.backlog_max = int(_env_float('HEALTH_JOB_BACKLOG_MAX', 100))
+        self.min_free_bytes = int(_env_float('HEALTH_MIN_FREE_MB', 100) * 1024 * 1024)
+        # Mesma pasta usada pelas rotas de upload (walkie_backend/static/uploads)
+        self.upload_dir = os.path.join(os.path.dirname(app.root_path), 'static', 'uploads')
+        app.extensions['health'] = self
+
+    def liveness(self):
+        """Processo de pé e atendendo requisições; não toca em nenhuma dependência."""
+        return {
+            'status': 'alive',
+            'pid': os.getpid(),
+            'uptime_seconds': round(time.time() - self._started_at, 1),
+        }
+
+    def readiness(self):
+        """Retorna (resultado, pronto). Reaproveita o último resultado dentro de HEALTH_CACHE_SECONDS."""
+        with self._lock:
+            now = time.monotonic()
+            if self._cached is None or now - self._cached_at >= self.cache_seconds:
+                self._cached = self._run_checks()
+                self._cached_at = time.monotonic()
+            result = dict(self._cached)
+            result['age_seconds'] = round(time.monotonic() - self._cached_at, 3)
+        return result, result['status'] == 'ready'
+
+    def _run_checks(self):
+        checks = {}
+        # O pool vem antes do banco: com o pool esgotado, o ping ficaria preso
+        # esperando conexão por DB_POOL_TIMEOUT segundos
+        checks['pool'] = self._timed(self._check_pool)
+        if checks['pool']['ok']:
+            checks['database'] = self._timed(self._check_database)
+        else:
+            checks['database'] = {'ok': False, 'skipped': True, 'error': 'pool de conexões esgotado'}
+        checks['jobs'] = self._timed(self._check_jobs)
+        checks['storage'] = self._timed(self._check_storage)
+
+        ready = all(check['ok'] for check in checks.values())
+        if not ready:
+            failed = [name for name, check in checks.items() if not check['ok']]
+            logger.warning("Readiness falhou: %s", ', '.join(failed))
+        return {
+            'status': 'ready' if ready else 'not_ready',
+            'checked_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+            'checks': checks,
+        }
+
+    @staticmethod
+    def _timed(check):
+        started = time.perf_counter()
+        try:
+            result = check()
+        except Exception as e:
+            result = {'ok': False, 'error': str(e)}
+        result['duration_ms'] = round((time.perf_counter() - started) * 1000, 3)
+        return result
+
+    # --- Verificações ---
+
+    def _check_database(self):
+        from src.models.models import db
+        started = time.perf_counter()
+        # Conexão própria (não a sessão da requisição) e devolvida ao pool logo em seguida
+        with db.engine.connect() as connection:
+            connection.execute(text('SELECT 1'))
+        latency = time.perf_counter() - started
+        result = {'ok': latency <= self.db_latency_limit, 'latency_ms': round(latency * 1000, 3),
+                  'limit_ms': round(self.db_latency_limit * 1000, 3)}
+        if not result['ok']:
+            result['error'] = 'latência acima do limite'
+        return result
+
+    def _check_pool(self):
+        from src.models.models import db
+        from src.utils.database import pool_status
+        status = pool_status(db.engine)
+        max_connections = status.get('max_connections')
+        if not max_connections:
+            # StaticPool/NullPool (SQLite em memória etc.) ou overflow ilimitado: não há limite a conferir
+            return {'ok': True, **status}
+        usage = status.get('checked_out', 0) / max_connections
+        result = {'ok': usage < self.pool_max_usage, 'usage': round(usage, 3),
+                  'max_usage': self.pool_max_usage, **status}
+        if not result['ok']:
+            result['error'] = 'pool de conexões saturado'
+        return result
+
+    def _check_jobs(self):
+        from src.utils.jobs import job_queue
+        backlog = job_queue.backlog
+        result = {'ok': backlog <= self.backlog_max, 'backlog': backlog, 'max_backlog': self.backlog_max}
+        if not result['ok']:
+            result['error'] = 'fila de tarefas acumulada'
+        return result
+
+    def _check_storage(self):
+        os.makedirs(self.upload_dir, exist_ok=True)
+        writable = os.access(self.upload_dir, os.W_OK)
+        free = shutil.disk_usage(self.upload_dir).free
+        result = {'ok': writable and free >= self.min_free_bytes, 'path': self.upload_dir,
+                  'writable': writable, 'free_mb': round(free / (1024 * 1024), 1)}
+        if not writable:
+            result['error'] = 'pasta de uploads sem permissão de escrita'
+        elif free < self.min_free_bytes:
+            result['error'] = 'pouco espaço livre para uploads'
+        return result
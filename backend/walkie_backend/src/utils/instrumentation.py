@@ -0,0 +1,286 @@
+# Em: backend/walkie_backend/src/utils/instrumentation.py
+# (Arquivo Novo)
+#
+# Instrumentação por requisição: endpoint, status, tempo total, quantidade e
+# tempo dos comandos SQL (eventos do SQLAlchemy em todos os engines). Requisições
+# acima de SLOW_REQUEST_MS vão para o log 'walkie.slow_requests' com os comandos
+# executados; uma amostra (PROFILE_SAMPLE_RATE) é perfilada com cProfile ou
+# pyinstrument e gravada em PROFILE_DIR. Os agregados ficam em /api/metrics no
+# formato texto do Prometheus (por processo: com vários workers do gunicorn,
+# cada um expõe os seus).
+
+import contextvars
+import cProfile
+import json
+import logging
+import os
+import random
+import re
+import threading
+import time
+from datetime import datetime
+from flask import Response, g, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+try:
+    import pyinstrument
+except ImportError:  # pyinstrument é opcional; sem ele as amostras usam cProfile
+    pyinstrument = None
+
+logger = logging.getLogger(__name__)
+slow_logger = logging.getLogger('walkie.slow_requests')
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+SQL_COUNT_BUCKETS = (1, 2, 3, 5, 10, 20, 50, 100)
+# Comandos guardados por requisição para o log de lentas
+MAX_RECORDED_STATEMENTS = 100
+# Parâmetros de query que não vão para o log de requisições lentas
+REDACTED_QUERY_ARGS = frozenset({'token', 'access_token', 'password'})
+
+# Métricas da requisição em andamento; run_parallel copia o contexto para as threads auxiliares
+_current = contextvars.ContextVar('walkie_request_metrics', default=None)
+
+
+class RequestMetrics:
+    __slots__ = ('sql_count', 'sql_time', 'statements', '_lock')
+
+    def __init__(self):
+        self.sql_count = 0
+        self.sql_time = 0.0
+        self.statements = []
+        self._lock = threading.Lock()
+
+    def add(self, statement, duration):
+        with self._lock:
+            self.sql_count += 1
+            self.sql_time += duration
+            if len(self.statements) < MAX_RECORDED_STATEMENTS:
+                self.statements.append((statement, duration))
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        conn.info.setdefault('_instrumentation_start', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    metrics = _current.get()
+    if metrics is not None:
+        starts = conn.info.get('_instrumentation_start')
+        if starts:
+            metrics.add(statement, time.perf_counter() - starts.pop())
+
+
+class _Histogram:
+    __slots__ = ('buckets', 'counts', 'total', 'count')
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+        self.total += value
+        self.count += 1
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(**labels):
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + '}'
+
+
+class MetricsRegistry:
+    """Contadores e histogramas por endpoint, com exposição no formato texto do Prometheus."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = {}        # (endpoint, method, status) -> n
+        self.durations = {}       # endpoint -> _Histogram (segundos)
+        self.sql_counts = {}      # endpoint -> _Histogram (comandos por requisição)
+        self.sql_time = {}        # endpoint -> segundos
+        self.slow = {}            # endpoint -> n
+        self.profiles = 0
+
+    def record(self, endpoint, method, status, duration, sql_count, sql_time, slow):
+        with self._lock:
+            key = (endpoint, method, status)
+            self.requests[key] = self.requests.get(key, 0) + 1
+            self.durations.setdefault(endpoint, _Histogram(DURATION_BUCKETS)).observe(duration)
+            self.sql_counts.setdefault(endpoint, _Histogram(SQL_COUNT_BUCKETS)).observe(sql_count)
+            self.sql_time[endpoint] = self.sql_time.get(endpoint, 0.0) + sql_time
+            if slow:
+                self.slow[endpoint] = self.slow.get(endpoint, 0) + 1
+
+    def _histogram_lines(self, name, histograms):
+        lines = []
+        for endpoint, histogram in sorted(histograms.items()):
+            for bound, count in zip(histogram.buckets, histogram.counts):
+                lines.append(f'{name}_bucket{_labels(endpoint=endpoint, le=bound)} {count}')
+            lines.append(f'{name}_bucket{_labels(endpoint=endpoint, le="+Inf")} {histogram.count}')
+            lines.append(f'{name}_sum{_labels(endpoint=endpoint)} {histogram.total:.6f}')
+            lines.append(f'{name}_count{_labels(endpoint=endpoint)} {histogram.count}')
+        return lines
+
+    def render(self, gauges=()):
+        """Texto no formato de exposição do Prometheus (versão 0.0.4)."""
+        with self._lock:
+            lines = ['# HELP walkie_http_requests_total Requisições HTTP atendidas.',
+                     '# TYPE walkie_http_requests_total counter']
+            for (endpoint, method, status), count in sorted(self.requests.items()):
+                lines.append(f'walkie_http_requests_total{_labels(endpoint=endpoint, method=method, status=status)} {count}')
+
+            lines += ['# HELP walkie_http_request_duration_seconds Tempo total da requisição.',
+                      '# TYPE walkie_http_request_duration_seconds histogram']
+            lines += self._histogram_lines('walkie_http_request_duration_seconds', self.durations)
+
+            lines += ['# HELP walkie_sql_statements_per_request Comandos SQL por requisição.',
+                      '# TYPE walkie_sql_statements_per_request histogram']
+            lines += self._histogram_lines('walkie_sql_statements_per_request', self.sql_counts)
+
+            lines += ['# HELP walkie_sql_duration_seconds_total Tempo gasto em SQL pelas requisições.',
+                      '# TYPE walkie_sql_duration_seconds_total counter']
+            for endpoint, seconds in sorted(self.sql_time.items()):
+                lines.append(f'walkie_sql_duration_seconds_total{_labels(endpoint=endpoint)} {seconds:.6f}')
+
+            lines += ['# HELP walkie_slow_requests_total Requisições acima de SLOW_REQUEST_MS.',
+                      '# TYPE walkie_slow_requests_total counter']
+            for endpoint, count in sorted(self.slow.items()):
+                lines.append(f'walkie_slow_requests_total{_labels(endpoint=endpoint)} {count}')
+
+            lines += ['# HELP walkie_profiles_total Requisições perfiladas por amostragem.',
+                      '# TYPE walkie_profiles_total counter',
+                      f'walkie_profiles_total {self.profiles}']
+
+        for name, help_text, value in gauges:
+            lines += [f'# HELP {name} {help_text}', f'# TYPE {name} gauge', f'{name} {value}']
+        return '\n'.join(lines) + '\n'
+
+
+class Instrumentation:
+    """
+    Mede cada requisição (before_request/after_request). Configuração (variáveis de ambiente):
+    INSTRUMENTATION_ENABLED (padrão true), SLOW_REQUEST_MS (padrão 500; 0 desativa),
+    SLOW_REQUEST_LOG (arquivo JSON lines opcional), PROFILE_SAMPLE_RATE (0 a 1, padrão 0),
+    PROFILE_DIR (padrão instance/profiles), PROFILER ('cprofile' ou 'pyinstrument')
+    e METRICS_TOKEN (se definido, /api/metrics exige Authorization: Bearer <token>).
+    """
+
+    def __init__(self, app=None):
+        self.registry = MetricsRegistry()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.enabled = os.getenv('INSTRUMENTATION_ENABLED', 'true').lower() == 'true'
+        self.slow_threshold = float(os.getenv('SLOW_REQUEST_MS', 500)) / 1000
+        self.profile_rate = float(os.getenv('PROFILE_SAMPLE_RATE', 0))
+        self.profile_dir = os.getenv('PROFILE_DIR', os.path.join(app.instance_path, 'profiles'))
+        self.profiler = os.getenv('PROFILER', 'pyinstrument' if pyinstrument else 'cprofile').lower()
+        self.metrics_token = os.getenv('METRICS_TOKEN')
+
+        slow_log = os.getenv('SLOW_REQUEST_LOG')
+        if slow_log and not any(getattr(h, 'baseFilename', None) == os.path.abspath(slow_log)
+                                for h in slow_logger.handlers):
+            handler = logging.FileHandler(slow_log)
+            handler.setFormatter(logging.Formatter('%(message)s'))
+            slow_logger.addHandler(handler)
+
+        if self.enabled:
+            # Em Engine (classe): vale para o engine principal e para os das réplicas
+            if not event.contains(Engine, 'before_cursor_execute', _before_cursor_execute):
+                event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+                event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+            app.before_request(self._start)
+            app.after_request(self._finish)
+        app.extensions['instrumentation'] = self
+
+    # --- Por requisição ---
+
+    def _start(self):
+        _current.set(RequestMetrics())
+        g._instrumentation = (time.perf_counter(), self._start_profiler())
+
+    def _start_profiler(self):
+        if self.profile_rate <= 0 or random.random() >= self.profile_rate:
+            return None
+        try:
+            if self.profiler == 'pyinstrument' and pyinstrument is not None:
+                profiler = pyinstrument.Profiler()
+                profiler.start()
+            else:
+                profiler = cProfile.Profile()
+                profiler.enable()
+        except (RuntimeError, ValueError):  # outro profiler já ativo nesta thread
+            return None
+        return profiler
+
+    def _finish(self, response):
+        state = g.pop('_instrumentation', None)
+        if state is None:
+            return response
+        started, profiler = state
+        duration = time.perf_counter() - started
+        metrics = _current.get() or RequestMetrics()
+        _current.set(None)
+
+        endpoint = request.endpoint or 'unmatched'
+        status = response.status_code
+        slow = bool(self.slow_threshold) and duration >= self.slow_threshold
+        self.registry.record(endpoint, request.method, str(status), duration,
+                             metrics.sql_count, metrics.sql_time, slow)
+        if profiler is not None:
+            self._save_profile(profiler, endpoint, duration)
+        if slow:
+            self._log_slow(endpoint, status, duration, metrics)
+        return response
+
+    def _log_slow(self, endpoint, status, duration, metrics):
+        slow_logger.warning(json.dumps({
+            'at': datetime.utcnow().isoformat(timespec='milliseconds') + 'Z',
+            'endpoint': endpoint,
+            'method': request.method,
+            'path': request.path,
+            'query': {key: '***' if key in REDACTED_QUERY_ARGS else value
+                      for key, value in request.args.items()},
+            'status': status,
+            'duration_ms': round(duration * 1000, 2),
+            'sql_count': metrics.sql_count,
+            'sql_ms': round(metrics.sql_time * 1000, 2),
+            'statements': [{'ms': round(seconds * 1000, 3), 'sql': ' '.join(statement.split())}
+                           for statement, seconds in metrics.statements],
+        }, ensure_ascii=False))
+
+    def _save_profile(self, profiler, endpoint, duration):
+        try:
+            os.makedirs(self.profile_dir, exist_ok=True)
+            name = f"{datetime.utcnow():%Y%m%dT%H%M%S%f}-{re.sub(r'[^A-Za-z0-9_.-]', '_', endpoint)}-{duration * 1000:.0f}ms"
+            if isinstance(profiler, cProfile.Profile):
+                profiler.disable()
+                profiler.dump_stats(os.path.join(self.profile_dir, f'{name}.prof'))
+            else:
+                profiler.stop()
+                with open(os.path.join(self.profile_dir, f'{name}.html'), 'w') as profile_file:
+                    profile_file.write(profiler.output_html())
+            with self.registry._lock:
+                self.registry.profiles += 1
+        except Exception:
+            logger.exception("Falha ao gravar o perfil da requisição %s", endpoint)
+
+    # --- Exposição ---
+
+    def metrics_response(self):
+        """Resposta de /api/metrics (texto do Prometheus)."""
+        if self.metrics_token and request.headers.get('Authorization') != f'Bearer {self.metrics_token}':
+            return Response('unauthorized\n', status=401, mimetype='text/plain')
+        from src.utils.jobs import job_queue
+        gauges = [('walkie_job_queue_backlog', 'Tarefas em segundo plano enfileiradas ou rodando.',
+                   job_queue.backlog)]
+        return Response(self.registry.render(gauges), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,134 @@
+# Em: backend/walkie_backend/src/utils/jobs.py
+# (Arquivo Novo)
+
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+
+class JobQueue:
+    """
+    Fila de tarefas em segundo plano (threads do próprio worker).
+    Cada tarefa roda dentro de um app_context; tarefas com a mesma 'key'
+    pendentes ao mesmo tempo são enfileiradas uma única vez.
+    """
+
+    def __init__(self):
+        self.app = None
+        self._executor = None
+        self._lock = threading.Lock()
+        self._pending_keys = set()
+        self._backlog = 0
+
+    def init_app(self, app):
+        self.app = app
+        max_workers = int(os.getenv('JOB_WORKERS', app.config.get('JOB_WORKERS', 2)))
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='walkie-job')
+        app.extensions['job_queue'] = self
+
+    @property
+    def backlog(self):
+        """Quantidade de tarefas enfileiradas ou em execução."""
+        return self._backlog
+
+    def enqueue(self, func, *args, key=None, **kwargs):
+        """Agenda 'func(*args, **kwargs)'. Retorna False se já houver tarefa pendente com a mesma key."""
+        with self._lock:
+            if key is not None:
+                if key in self._pending_keys:
+                    return False
+                self._pending_keys.add(key)
+            self._backlog += 1
+
+        self._executor.submit(self._run, func, args, kwargs, key)
+        return True
+
+    def _run(self, func, args, kwargs, key):
+        with self._lock:
+            # A partir daqui uma nova tarefa com a mesma key pode ser enfileirada
+            self._pending_keys.discard(key)
+        try:
+            with self.app.app_context():
+                func(*args, **kwargs)
+        except Exception:
+            logger.exception("Erro ao executar tarefa %s", getattr(func, '__name__', func))
+        finally:
+            with self._lock:
+                self._backlog -= 1
+
+    def shutdown(self, wait=True):
+        if self._executor:
+            self._executor.shutdown(wait=wait)
+
+
+class Scheduler:
+    """
+    Executa tarefas periódicas em threads daemon, cada uma dentro de um app_context.
+    Tarefas 'exclusive' (manutenção do banco) não podem rodar em dois processos ao
+    mesmo tempo; quem decide onde elas rodam é o argumento 'exclusive' de start().
+    """
+
+    def __init__(self):
+        self.app = None
+        self._jobs = []
+        self._threads = []
+        self._stop_event = threading.Event()
+
+    def init_app(self, app):
+        self.app = app
+        app.extensions['scheduler'] = self
+
+    def add_job(self, name, interval_seconds, func, exclusive=False):
+        self._jobs.append((name, interval_seconds, func, exclusive))
+
+    def start(self, exclusive=True, per_process=True):
+        """
+        exclusive=True roda as tarefas exclusivas sempre, False não as roda e uma
+        função as roda apenas nas rodadas em que ela retorna True (trava entre
+        processos). per_process=False não inicia as tarefas do processo (ex:
+        gravação do rastreamento ao vivo), para quem já as iniciou.
+        """
+        for name, interval_seconds, func, is_exclusive in self._jobs:
+            if (is_exclusive and exclusive is False) or (not is_exclusive and not per_process):
+                continue
+            allowed = exclusive if is_exclusive and callable(exclusive) else None
+            thread = threading.Thread(
+                target=self._loop, args=(name, interval_seconds, func, allowed),
+                name=f'walkie-scheduler-{name}', daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def _loop(self, name, interval_seconds, func, allowed=None):
+        while not self._stop_event.wait(interval_seconds):
+            self._run(name, func, allowed)
+
+    def _run(self, name, func, allowed=None):
+        try:
+            if allowed is not None and not allowed():
+                return
+            with self.app.app_context():
+                func()
+        except Exception:
+            logger.exception("Erro na tarefa periódica '%s'", name)
+
+    def run_once(self, exclusive_only=True):
+        """Executa uma rodada de cada tarefa agora, em sequência (scripts/run_scheduler.py --once)."""
+        for name, _, func, is_exclusive in self._jobs:
+            if is_exclusive or not exclusive_only:
+                self._run(name, func)
+
+    def wait(self):
+        """Bloqueia até shutdown() (processo dedicado às tarefas)."""
+        while not self._stop_event.wait(1):
+            pass
+
+    def shutdown(self):
+        self._stop_event.set()
+
+
+job_queue = JobQueue()
+scheduler = Scheduler()
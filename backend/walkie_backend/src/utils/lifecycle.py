@@ -0,0 +1,141 @@
+# Em: backend/walkie_backend/src/utils/lifecycle.py
+# (Arquivo Novo)
+#
+# Ciclo de vida do worker no servidor de produção (gunicorn.conf.py): warm-up
+# depois do fork, antes de aceitar requisições, e desligamento gracioso.
+
+import logging
+import os
+import tempfile
+import time
+from sqlalchemy import text
+
+try:
+    import fcntl
+except ImportError:  # Windows (o gunicorn não roda lá)
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+def build_static_manifest(static_folder):
+    """Caminhos relativos (com '/') de todos os arquivos do frontend servidos por serve()."""
+    manifest = set()
+    if not static_folder or not os.path.isdir(static_folder):
+        return frozenset()
+    for root, _, files in os.walk(static_folder):
+        for name in files:
+            relative = os.path.relpath(os.path.join(root, name), static_folder)
+            manifest.add(relative.replace(os.sep, '/'))
+    return frozenset(manifest)
+
+
+def after_fork(app):
+    """
+    Com preload_app o engine foi criado no processo mestre: o worker descarta as
+    conexões herdadas (sem fechá-las, elas continuam sendo do mestre) e abre as suas.
+    """
+    from src.models.models import db
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
+
+
+class ProcessLock:
+    """
+    Trava exclusiva entre os processos da máquina (flock em um arquivo), mantida
+    pelo processo que a obtiver até ele terminar. Usada pelo gunicorn para eleger o
+    worker das tarefas exclusivas: os outros tentam de novo a cada rodada e assumem
+    quando esse worker sai. Não coordena máquinas diferentes.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or os.path.join(tempfile.gettempdir(), 'walkie-scheduler.lock')
+        self._file = None
+
+    def __call__(self):
+        if self._file is not None:
+            return True
+        if fcntl is None:
+            return False
+        handle = open(self.path, 'a')
+        try:
+            fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            handle.close()
+            return False
+        self._file = handle
+        logger.info("Processo %s assumiu as tarefas periódicas exclusivas (%s)", os.getpid(), self.path)
+        return True
+
+
+def warm_up(app, connections=1):
+    """
+    Prepara o worker: abre 'connections' conexões do pool (limitado ao pool_size),
+    carrega o catálogo de badges, monta o manifesto dos arquivos estáticos e faz
+    uma requisição interna para inicializar o roteamento. Retorna os tempos (ms) e contagens.
+    """
+    from src.models.models import db
+    from src.services.badge_catalog import get_badge_catalog
+    timings = {}
+
+    started = time.perf_counter()
+    with app.app_context():
+        pool_size = getattr(db.engine.pool, 'size', None)
+        if callable(pool_size):
+            connections = max(1, min(connections, pool_size()))
+        # Abertas ao mesmo tempo para o pool criar conexões distintas; ao fechar voltam para ele
+        opened = []
+        try:
+            for _ in range(connections):
+                connection = db.engine.connect()
+                opened.append(connection)
+                connection.execute(text('SELECT 1'))
+        finally:
+            for connection in opened:
+                connection.close()
+        timings['pool_ms'] = (time.perf_counter() - started) * 1000
+
+        started = time.perf_counter()
+        badges = get_badge_catalog()
+        timings['badges_ms'] = (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    manifest = build_static_manifest(app.static_folder)
+    app.extensions['static_manifest'] = manifest
+    timings['static_ms'] = (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    app.test_client().get('/api/health/live')
+    timings['request_ms'] = (time.perf_counter() - started) * 1000
+
+    timings.update(connections=len(opened), badges=len(badges), static_files=len(manifest))
+    return timings
+
+
+def shutdown(app):
+    """
+    Desligamento gracioso do worker: para as tarefas periódicas, grava os pontos
+    pendentes do rastreamento ao vivo, espera a fila de tarefas terminar e fecha
+    as conexões do pool.
+    """
+    from src.models.models import db
+    from src.services.live_tracking import live_tracker
+    from src.utils.jobs import job_queue, scheduler
+
+    scheduler.shutdown()
+    with app.app_context():
+        try:
+            live_tracker.flush_all()
+        except Exception:
+            db.session.rollback()
+            logger.exception("Erro ao gravar os pontos pendentes no desligamento")
+        finally:
+            db.session.remove()
+
+    started = time.monotonic()
+    job_queue.shutdown(wait=True)
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose()
+    logger.info("Worker %s encerrado (fila de tarefas drenada em %.1fs)", os.getpid(), time.monotonic() - started)
@@ -0,0 +1,88 @@
+# Em: backend/walkie_backend/src/utils/migrations.py
+# (Arquivo Novo)
+
+import logging
+from sqlalchemy import inspect, text
+from src.models.models import db
+
+logger = logging.getLogger(__name__)
+
+
+def _column_ddl(column, dialect):
+    """Monta o trecho 'nome TIPO [DEFAULT x] [NOT NULL]' para um ALTER TABLE ADD COLUMN."""
+    preparer = dialect.identifier_preparer
+    ddl = f'{preparer.quote(column.name)} {column.type.compile(dialect=dialect)}'
+    if column.server_default is not None:
+        default = column.server_default.arg
+        default = default.text if hasattr(default, 'text') else f"'{default}'"
+        ddl += f' DEFAULT {default}'
+        if not column.nullable:
+            ddl += ' NOT NULL'
+    return ddl
+
+
+def pending_migrations(engine):
+    """
+    Compara os modelos com o banco e lista o que falta: colunas novas em tabelas
+    existentes e índices declarados nos modelos. (O db.create_all() só cria tabelas novas.)
+    """
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    columns, indexes = [], []
+
+    for table in db.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        existing_columns = {c['name'] for c in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in existing_columns:
+                columns.append((table, column))
+        existing_indexes = {i['name'] for i in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing_indexes:
+                indexes.append(index)
+
+    return columns, indexes
+
+
+def run_migrations(engine=None):
+    """Aplica as migrações pendentes (idempotente). Retorna a lista de alterações feitas."""
+    engine = engine or db.engine
+    columns, indexes = pending_migrations(engine)
+    applied = []
+
+    with engine.begin() as conn:
+        for table, column in columns:
+            ddl = f'ALTER TABLE {table.name} ADD COLUMN {_column_ddl(column, engine.dialect)}'
+            conn.execute(text(ddl))
+            applied.append(ddl)
+        for index in indexes:
+            index.create(conn)
+            applied.append(f'CREATE INDEX {index.name}')
+
+    for change in applied:
+        logger.info("Migração aplicada: %s", change)
+    return applied
+
+
+def bootstrap_database(migrate=True):
+    """
+    Prepara o banco: cria as tabelas novas, aplica as migrações (migrate=True), cria
+    os saldos de abertura do livro de pontos e popula os dados iniciais. Deve rodar
+    uma vez por implantação (no gunicorn, scripts/migrate.py antes dos workers).
+    Retorna a lista de migrações aplicadas.
+    """
+    from src.models.models import Badge
+    from src.services.points import create_opening_balances
+
+    db.create_all()
+    applied = []
+    if migrate:
+        applied = run_migrations()
+        # Livro de pontos: saldo de abertura para quem já tinha pontos
+        create_opening_balances()
+
+    if Badge.query.count() == 0:
+        from src.utils.seed_data import seed_all
+        seed_all()
+    return applied
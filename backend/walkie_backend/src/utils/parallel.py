@@ -0,0 +1,57 @@
+# Em: backend/walkie_backend/src/utils/parallel.py
+# (Arquivo Novo)
+
+import contextvars
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from flask import current_app
+from src.utils.database import is_sqlite_memory
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            workers = int(os.getenv('PARALLEL_QUERY_WORKERS', 4))
+            if workers > 0:
+                _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='walkie-query')
+        return _executor
+
+
+def _parallel_enabled(app):
+    # O SQLite em memória usa uma única conexão compartilhada: nada de consultas simultâneas
+    return not is_sqlite_memory(app.config['SQLALCHEMY_DATABASE_URI']) and _get_executor() is not None
+
+
+def run_parallel(*funcs):
+    """
+    Executa funções independentes de leitura ao mesmo tempo, cada uma com sua própria
+    sessão/conexão (app_context próprio), e retorna os resultados na mesma ordem.
+    A primeira roda na thread atual. As funções devem devolver dados já serializados,
+    pois os objetos do ORM ficam desanexados quando o app_context da thread termina.
+    """
+    app = current_app._get_current_object()
+    if len(funcs) < 2 or not _parallel_enabled(app):
+        return [func() for func in funcs]
+
+    def run_in_context(func):
+        with app.app_context():
+            return func()
+
+    # Cada thread recebe uma cópia do contexto atual (ex: as métricas SQL da requisição)
+    futures = [_get_executor().submit(contextvars.copy_context().run, run_in_context, func)
+               for func in funcs[1:]]
+    first = funcs[0]()
+    return [first] + [future.result() for future in futures]
+
+
+def shutdown():
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True)
+            _executor = None
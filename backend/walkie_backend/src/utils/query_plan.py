@@ -0,0 +1,56 @@
+# Em: backend/walkie_backend/src/utils/query_plan.py
+# (Arquivo Novo)
+
+import re
+
+# Tabelas pequenas/catálogo em que um full scan é esperado
+SMALL_TABLES = {'badges'}
+
+
+def explain(connection, statement, parameters):
+    """Executa EXPLAIN (MySQL) ou EXPLAIN QUERY PLAN (SQLite) e retorna as linhas do plano como dicts."""
+    dialect = connection.dialect.name
+    prefix = 'EXPLAIN QUERY PLAN ' if dialect == 'sqlite' else 'EXPLAIN '
+    result = connection.exec_driver_sql(prefix + statement, parameters)
+    keys = list(result.keys())
+    return [dict(zip(keys, row)) for row in result.fetchall()]
+
+
+def plan_problems(dialect, plan_rows):
+    """
+    Procura no plano full scans de tabelas grandes e ordenações sem índice (filesort).
+    Retorna uma lista de descrições dos problemas encontrados.
+    """
+    problems = []
+    for row in plan_rows:
+        if dialect == 'sqlite':
+            detail = row.get('detail', '')
+            match = re.match(r'SCAN (\w+)', detail)
+            if match and 'USING' not in detail and match.group(1) not in SMALL_TABLES:
+                problems.append(f'full scan: {detail}')
+            if 'USE TEMP B-TREE FOR ORDER BY' in detail or 'USE TEMP B-TREE FOR RIGHT PART OF ORDER BY' in detail:
+                problems.append(f'filesort: {detail}')
+        else:
+            table = row.get('table')
+            if row.get('type') == 'ALL' and table not in SMALL_TABLES:
+                problems.append(f'full scan: {table}')
+            if 'Using filesort' in (row.get('Extra') or ''):
+                problems.append(f'filesort: {table}')
+    return problems
+
+
+def check_queries(engine, queries):
+    """
+    Roda EXPLAIN em cada SELECT capturado (ver QueryCapture) e retorna
+    [(statement, problemas, plano)] para os que caem em full scan ou filesort.
+    """
+    failures = []
+    with engine.connect() as conn:
+        for query in queries:
+            if not query.statement.lstrip().upper().startswith('SELECT'):
+                continue
+            rows = explain(conn, query.statement, query.parameters)
+            problems = plan_problems(engine.dialect.name, rows)
+            if problems:
+                failures.append((query.statement, problems, rows))
+    return failures
@@ -0,0 +1,150 @@
+# Em: backend/walkie_backend/src/utils/read_replicas.py
+# (Arquivo Novo)
+#
+# Separação de leitura e escrita. Com DATABASE_REPLICA_URLS (uma ou mais URLs
+# separadas por vírgula), cada réplica vira um bind (replica_0, replica_1...) e
+# os SELECTs das requisições GET dos blueprints de leitura (REPLICA_BLUEPRINTS)
+# vão para uma réplica sorteada por requisição. Todo o resto fica no primário:
+# escritas, SELECT ... FOR UPDATE, SQL textual, tarefas em segundo plano e
+# qualquer leitura feita depois de uma escrita na mesma requisição.
+#
+# Leitura após escrita: quando uma requisição de um usuário grava algo (ex:
+# finish_walk), o usuário fica preso ao primário por REPLICA_STICKY_SECONDS
+# (marca no state_store, vale para todos os workers com Redis), tempo para a
+# réplica alcançar. Trechos que precisam do dado mais recente usam use_primary().
+#
+# Para testar localmente, dois arquivos SQLite fazem o papel de primário e réplica:
+#   DATABASE_URL=sqlite:///primary.db DATABASE_REPLICA_URLS=sqlite:///replica.db
+# (scripts/check_replica_routing.py faz isso e confere o roteamento).
+
+import contextvars
+import os
+import random
+from contextlib import contextmanager
+from flask import request
+from flask_sqlalchemy.session import Session
+from sqlalchemy.sql.expression import CompoundSelect, Select
+
+REPLICA_BIND_PREFIX = 'replica_'
+DEFAULT_BLUEPRINTS = 'users,walks,gamification,heatmap'
+
+# Estado do roteamento da requisição em andamento; run_parallel copia o contexto
+# para as threads auxiliares, a fila de tarefas não (tarefas usam o primário)
+_current = contextvars.ContextVar('walkie_read_routing', default=None)
+
+
+class _Routing:
+    __slots__ = ('replica', 'user_id', 'wrote')
+
+    def __init__(self, replica, user_id):
+        self.replica = replica  # bind da réplica desta requisição (ou None: primário)
+        self.user_id = user_id
+        self.wrote = False
+
+
+def replica_urls():
+    return [url.strip() for url in os.getenv('DATABASE_REPLICA_URLS', '').split(',') if url.strip()]
+
+
+def get_replica_binds():
+    """SQLALCHEMY_BINDS das réplicas, com as mesmas opções de pool do primário (DB_POOL_*)."""
+    from src.utils.database import get_engine_options
+    return {f'{REPLICA_BIND_PREFIX}{index}': {'url': url, **get_engine_options(url)}
+            for index, url in enumerate(replica_urls())}
+
+
+def _is_read(clause):
+    return isinstance(clause, (Select, CompoundSelect)) and clause._for_update_arg is None
+
+
+class RoutingSession(Session):
+    """Sessão do db: SELECTs da requisição roteada vão para a réplica escolhida."""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        routing = _current.get()
+        if routing is not None and bind is None:
+            if self._flushing or (clause is not None and not _is_read(clause)):
+                # A partir da primeira escrita, a requisição lê só do primário
+                routing.wrote = True
+                routing.replica = None
+            elif routing.replica is not None and _is_read(clause):
+                return self._db.engines[routing.replica]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+@contextmanager
+def use_primary():
+    """Força as leituras do bloco (na requisição atual) a irem para o primário."""
+    routing = _current.get()
+    if routing is None or routing.replica is None:
+        yield
+        return
+    replica, routing.replica = routing.replica, None
+    try:
+        yield
+    finally:
+        if not routing.wrote:
+            routing.replica = replica
+
+
+def reading_from_replica():
+    routing = _current.get()
+    return routing is not None and routing.replica is not None
+
+
+def _sticky_key(user_id):
+    return f'read_primary:{user_id}'
+
+
+class ReadReplicas:
+    """
+    Liga o roteamento às requisições. Configuração (variáveis de ambiente):
+    DATABASE_REPLICA_URLS, REPLICA_BLUEPRINTS (padrão users,walks,gamification,heatmap)
+    e REPLICA_STICKY_SECONDS (leitura após escrita, padrão 10).
+    """
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.binds = sorted(key for key in app.config.get('SQLALCHEMY_BINDS', {})
+                            if key.startswith(REPLICA_BIND_PREFIX))
+        self.blueprints = {name.strip() for name in
+                           os.getenv('REPLICA_BLUEPRINTS', DEFAULT_BLUEPRINTS).split(',') if name.strip()}
+        self.sticky_seconds = int(os.getenv('REPLICA_STICKY_SECONDS', 10))
+        if self.binds:
+            app.before_request(self._start)
+            app.after_request(self._finish)
+            app.teardown_request(self._teardown)
+        app.extensions['read_replicas'] = self
+
+    def _user_id(self):
+        token = request.headers.get('Authorization', '')
+        if not token:
+            return None
+        from src.routes.auth import verify_token
+        try:
+            return verify_token(token[7:] if token.startswith('Bearer ') else token)
+        except Exception:
+            return None
+
+    def _start(self):
+        from src.utils.state_store import state_store
+        user_id = self._user_id()
+        replica = None
+        if request.method in ('GET', 'HEAD') and request.blueprint in self.blueprints:
+            if user_id is None or not state_store.get(_sticky_key(user_id)):
+                replica = random.choice(self.binds)
+        _current.set(_Routing(replica, user_id))
+
+    def _finish(self, response):
+        routing = _current.get()
+        if routing is not None and routing.wrote and routing.user_id is not None:
+            from src.utils.state_store import state_store
+            state_store.set(_sticky_key(routing.user_id), 1, ttl=self.sticky_seconds)
+        return response
+
+    def _teardown(self, exc):
+        _current.set(None)
+
@@ -1,4 +1,5 @@
 from src.models.models import db, Badge
+from src.services.badge_catalog import reload_badge_catalog
 
 def seed_badges():
     """Popula o banco de dados com badges iniciais"""
@@ -78,6 +79,7 @@ def seed_badges():
     
     try:
         db.session.commit()
+        reload_badge_catalog()
         print("Badges criados com sucesso!")
     except Exception as e:
         db.session.rollback()
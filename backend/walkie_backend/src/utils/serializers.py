@@ -0,0 +1,135 @@
+# Em: backend/walkie_backend/src/utils/serializers.py
+# (Arquivo Novo)
+#
+# Serialização rápida das respostas: cada modelo registrado ganha um "plano"
+# compilado uma única vez (coluna -> campo + conversão), que transforma tuplas
+# de linhas do banco direto em dicts iguais aos do to_dict(). A codificação usa
+# orjson quando instalado, produzindo exatamente os mesmos bytes do jsonify.
+
+import json
+import math
+import re
+import threading
+from operator import attrgetter
+from flask import current_app
+from sqlalchemy import DateTime, Float
+from src.models.models import User, Pet, Walk, Badge
+
+try:
+    import orjson
+except ImportError:  # orjson é opcional; sem ele usamos o json da stdlib
+    orjson = None
+
+_state = threading.local()
+
+# Caracteres que o json da stdlib escapa com ensure_ascii=True e o orjson não
+_NON_ASCII = re.compile('[\x7f-\U0010ffff]')
+
+
+def _escape_char(match):
+    code = ord(match.group(0))
+    if code > 0xFFFF:
+        code -= 0x10000
+        return '\\u{0:04x}\\u{1:04x}'.format(0xD800 | (code >> 10), 0xDC00 | (code & 0x3FF))
+    return '\\u{0:04x}'.format(code)
+
+
+def _check_float(value):
+    # Fora dessa faixa (ou NaN/infinito) o orjson formata diferente do repr() do Python
+    if value is not None and value != 0 and not (math.isfinite(value) and 1e-4 <= abs(value) < 1e16):
+        _state.needs_stdlib = True
+    return value
+
+
+class ModelSerializer:
+    """Plano compilado de serialização de um modelo: mesmas chaves e formatos do to_dict()."""
+
+    def __init__(self, model, fields):
+        self.model = model
+        self.fields = list(fields)
+        self.columns = [getattr(model, field) for field in self.fields]
+        self._getter = attrgetter(*self.fields)
+        self._serialize_row = self._compile()
+
+    def _compile(self):
+        table = self.model.__table__
+        entries = []
+        for index, field in enumerate(self.fields):
+            column_type = table.columns[field].type
+            value = f'row[{index}]'
+            if isinstance(column_type, DateTime):
+                value = f'({value}.isoformat() if {value} else None)'
+            elif isinstance(column_type, Float):
+                value = f'_check_float({value})'
+            entries.append(f'{field!r}: {value}')
+
+        source = 'def serialize_row(row):\n    return {' + ', '.join(entries) + '}\n'
+        namespace = {'_check_float': _check_float}
+        exec(compile(source, f'<serializer {self.model.__name__}>', 'exec'), namespace)
+        return namespace['serialize_row']
+
+    def row(self, row):
+        """Serializa uma tupla com as colunas na ordem de 'self.columns'."""
+        return self._serialize_row(row)
+
+    def rows(self, rows):
+        serialize_row = self._serialize_row
+        return [serialize_row(row) for row in rows]
+
+    def obj(self, instance):
+        """Serializa uma instância do ORM já carregada."""
+        return self._serialize_row(self._getter(instance))
+
+    def query(self, query):
+        """Executa a query buscando só as colunas do plano (sem montar objetos do ORM)."""
+        return self.rows(query.with_entities(*self.columns))
+
+
+_registry = {}
+
+
+def register(model, fields):
+    _registry[model] = ModelSerializer(model, fields)
+    return _registry[model]
+
+
+def serializer_for(model):
+    return _registry[model]
+
+
+register(User, ['id', 'email', 'name', 'profile_picture', 'total_points', 'created_at', 'role', 'timezone'])
+register(Pet, ['id', 'name', 'breed', 'age', 'weight', 'profile_picture', 'preferences', 'owner_id', 'created_at'])
+register(Walk, ['id', 'start_time', 'end_time', 'duration', 'distance', 'calories', 'average_pace',
+                'route_data', 'feedback', 'points_earned', 'user_id', 'pet_id', 'created_at'])
+register(Badge, ['id', 'name', 'description', 'icon', 'points_required', 'condition_type',
+                 'condition_value', 'created_at'])
+
+
+def dumps(obj):
+    """
+    Codifica como o jsonify do Flask em modo compacto (sort_keys, ensure_ascii,
+    separadores sem espaço). Usa orjson quando disponível e cai para a stdlib
+    nos raros floats que o orjson formataria diferente.
+    """
+    needs_stdlib = getattr(_state, 'needs_stdlib', False)
+    _state.needs_stdlib = False
+    if orjson is None or needs_stdlib:
+        return json.dumps(obj, ensure_ascii=True, sort_keys=True, separators=(',', ':'))
+
+    encoded = orjson.dumps(obj, option=orjson.OPT_SORT_KEYS).decode('utf-8')
+    if not encoded.isascii() or '\x7f' in encoded:
+        encoded = _NON_ASCII.sub(_escape_char, encoded)
+    return encoded
+
+
+def fast_jsonify(obj):
+    """
+    Substituto do jsonify para dados montados pelos serializadores registrados
+    (floats que não vêm de um plano não passam pela checagem de formato).
+    """
+    app = current_app
+    if app.json.compact is False or (app.json.compact is None and app.debug):
+        # Modo de depuração: saída indentada, igual ao jsonify
+        _state.needs_stdlib = False
+        return app.json.response(obj)
+    return app.response_class(f'{dumps(obj)}\n', mimetype=app.json.mimetype)
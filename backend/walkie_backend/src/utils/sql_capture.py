@@ -0,0 +1,90 @@
+# Em: backend/walkie_backend/src/utils/sql_capture.py
+# (Arquivo Novo)
+
+import threading
+import time
+from contextlib import contextmanager
+from sqlalchemy import event
+
+# Nomes das threads de segundo plano (ver src/utils/jobs.py)
+BACKGROUND_THREAD_PREFIXES = ('walkie-job', 'walkie-scheduler')
+
+
+class CapturedQuery:
+    __slots__ = ('statement', 'parameters', 'duration')
+
+    def __init__(self, statement, parameters, duration):
+        self.statement = statement
+        self.parameters = parameters
+        self.duration = duration
+
+    def __repr__(self):
+        return f'<CapturedQuery {self.duration * 1000:.2f}ms {self.statement[:80]!r}>'
+
+
+class QueryCapture:
+    """
+    Context manager que registra todos os comandos SQL executados no engine
+    (texto, parâmetros e duração) via eventos do SQLAlchemy.
+
+        with QueryCapture(db.engine) as capture:
+            client.get('/api/walks/history')
+        print(len(capture.queries))
+    """
+
+    def __init__(self, engine, include_background=False):
+        self.engine = engine
+        self.queries = []
+        # Por padrão ignora as threads da fila de tarefas e do agendador (job_queue/scheduler),
+        # que rodam em paralelo e deixariam a contagem da requisição instável
+        self.include_background = include_background
+
+    def _before(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('_capture_start', []).append(time.perf_counter())
+
+    def _after(self, conn, cursor, statement, parameters, context, executemany):
+        start = conn.info['_capture_start'].pop()
+        if not self.include_background and threading.current_thread().name.startswith(BACKGROUND_THREAD_PREFIXES):
+            return
+        self.queries.append(CapturedQuery(statement, parameters, time.perf_counter() - start))
+
+    def __enter__(self):
+        event.listen(self.engine, 'before_cursor_execute', self._before)
+        event.listen(self.engine, 'after_cursor_execute', self._after)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        event.remove(self.engine, 'before_cursor_execute', self._before)
+        event.remove(self.engine, 'after_cursor_execute', self._after)
+        return False
+
+    @property
+    def count(self):
+        return len(self.queries)
+
+    @property
+    def total_time(self):
+        return sum(query.duration for query in self.queries)
+
+    @property
+    def selects(self):
+        return [q for q in self.queries if q.statement.lstrip().upper().startswith('SELECT')]
+
+
+@contextmanager
+def assert_max_queries(engine, max_queries):
+    """
+    Falha (AssertionError) se o bloco executar mais de 'max_queries' comandos SQL.
+    Usado para pegar regressões N+1:
+
+        with assert_max_queries(db.engine, 3):
+            client.get('/api/gamification/my-badges', headers=headers)
+    """
+    with QueryCapture(engine) as capture:
+        yield capture
+    if capture.count > max_queries:
+        statements = '\n'.join(f'  {i}. {" ".join(q.statement.split())}'
+                               for i, q in enumerate(capture.queries, 1))
+        raise AssertionError(
+            f'{capture.count} queries executadas (máximo {max_queries}):\n{statements}'
+        )
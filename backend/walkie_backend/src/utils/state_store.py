@@ -0,0 +1,127 @@
+# Em: backend/walkie_backend/src/utils/state_store.py
+# (Arquivo Novo)
+#
+# Armazenamento chave-valor de estado compartilhado entre requisições (passeio
+# ativo por usuário, marcas de leitura após escrita etc.). Com STATE_STORE_URL
+# apontando para um Redis (redis://...), todos os workers veem o mesmo estado;
+# sem ele, usa um dicionário em memória do próprio processo, suficiente para
+# desenvolvimento, scripts e um único worker.
+#
+# Valores precisam ser serializáveis em JSON. Falhas do Redis não derrubam a
+# requisição: leituras viram "não encontrado" (quem chama consulta o banco).
+
+import json
+import logging
+import os
+import threading
+import time
+
+try:
+    import redis
+except ImportError:  # redis é opcional
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = 'walkie:'
+
+
+class LocalStore:
+    """Dicionário em memória com expiração (um por processo)."""
+
+    # Visto só por este processo (com vários workers, cada um tem o seu)
+    shared = False
+
+    def __init__(self):
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            value, expires_at = item
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._data[key]
+                return None
+            return value
+
+    def set(self, key, value, ttl=None):
+        expires_at = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+
+    def add(self, key, value, ttl=None):
+        """Grava só se a chave não existir (ou tiver expirado). Retorna True se gravou."""
+        now = time.monotonic()
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None and (item[1] is None or item[1] > now):
+                return False
+            self._data[key] = (value, now + ttl if ttl else None)
+            return True
+
+    def delete(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class RedisStore:
+    """Mesmo contrato do LocalStore, guardando JSON em um Redis compartilhado."""
+
+    shared = True
+
+    def __init__(self, url):
+        self._client = redis.Redis.from_url(url, socket_timeout=0.5, socket_connect_timeout=0.5)
+
+    def get(self, key):
+        try:
+            raw = self._client.get(KEY_PREFIX + key)
+        except redis.RedisError:
+            logger.warning("Redis indisponível ao ler '%s'", key)
+            return None
+        return json.loads(raw) if raw is not None else None
+
+    def set(self, key, value, ttl=None):
+        try:
+            self._client.set(KEY_PREFIX + key, json.dumps(value), ex=int(ttl) if ttl else None)
+        except redis.RedisError:
+            logger.warning("Redis indisponível ao gravar '%s'", key)
+
+    def add(self, key, value, ttl=None):
+        try:
+            return bool(self._client.set(KEY_PREFIX + key, json.dumps(value), ex=int(ttl) if ttl else None, nx=True))
+        except redis.RedisError:
+            logger.warning("Redis indisponível ao gravar '%s'", key)
+            return False
+
+    def delete(self, *keys):
+        if not keys:
+            return
+        try:
+            self._client.delete(*[KEY_PREFIX + key for key in keys])
+        except redis.RedisError:
+            logger.warning("Redis indisponível ao apagar %s", keys)
+
+    def clear(self):
+        for key in self._client.scan_iter(KEY_PREFIX + '*'):
+            self._client.delete(key)
+
+
+def create_state_store(url=None):
+    """Cria o backend a partir de 'url' ou STATE_STORE_URL (vazio = memória local)."""
+    url = url if url is not None else os.getenv('STATE_STORE_URL', '')
+    if not url:
+        return LocalStore()
+    if redis is None:
+        raise RuntimeError('STATE_STORE_URL configurado, mas o pacote redis não está instalado')
+    return RedisStore(url)
+
+
+state_store = create_state_store()
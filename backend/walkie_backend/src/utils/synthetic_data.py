@@ -0,0 +1,314 @@
+# Em: backend/walkie_backend/src/utils/synthetic_data.py
+# (Arquivo Novo)
+#
+# Gerador de dados sintéticos em escala de produção (usuários, pets, passeios,
+# livro de pontos e badges de primeiro passeio) para testes de carga e
+# benchmarks locais. Tudo é gravado com INSERT em lote (executemany) e ids
+# explícitos, em transações de 'chunk_size' linhas.
+#
+# Distribuições:
+# - cada usuário mora em um ponto dentro de 'radius_km' do centro e tem um
+#   "ritmo" de atividade (Pareto): poucos usuários fazem muitos passeios;
+# - dias mais recentes têm mais passeios (crescimento da base), com picos às
+#   7h e às 18h (horário de Brasília) e duração log-normal (mediana ~25 min);
+# - os percursos (para a fração 'route_ratio' dos passeios) andam a ~1,3 m/s
+#   com mudanças suaves de direção, paradas para o cachorro cheirar e ruído de
+#   GPS, um ponto a cada 'track_interval' segundos com timestamp (epoch ms).
+
+import json
+import math
+import random
+from bisect import bisect_right
+from datetime import datetime, timedelta, timezone
+from itertools import accumulate
+from sqlalchemy import bindparam, insert, update
+from src.models.models import db, User, Pet, Walk, Badge, UserBadge, PointsEntry
+
+try:
+    import numpy as np
+except ImportError:  # numpy é opcional; sem ele os percursos são gerados em Python puro
+    np = None
+
+try:
+    import orjson
+except ImportError:  # orjson é opcional; sem ele o route_data sai pelo json da stdlib
+    orjson = None
+
+DEFAULT_CENTER = (-23.5505, -46.6333)  # São Paulo
+DEFAULT_PASSWORD = 'walkie'
+EMAIL_DOMAIN = 'synthetic.walkie'
+METERS_PER_DEGREE = 111320
+# Horário local = UTC-3; picos de passeio às 7h e às 18h locais
+UTC_OFFSET_HOURS = 3
+PEAK_HOURS = ((7, 1.2, 0.45), (18, 1.5, 0.55))  # (hora, desvio em horas, peso)
+EARTH_RADIUS_M = 6371000
+WALKING_SPEED_MS = 1.3
+GPS_NOISE_M = 3
+HEADING_SD = 0.25          # variação de direção por passo (radianos)
+TURN_PROBABILITY = 0.02    # chance de virar uma esquina a cada passo
+PAUSE_PROBABILITY = 0.03   # chance de parar para cheirar a cada passo
+PAUSE_SECONDS = (10, 60)
+# Proporção de usuários com 1, 2, 3... pets
+PET_COUNT_WEIGHTS = (6, 3, 1)
+
+
+def email_for(user_id):
+    """E-mail dos usuários gerados (o script de carga faz login com ele e DEFAULT_PASSWORD)."""
+    return f'user{user_id}@{EMAIL_DOMAIN}'
+
+
+def _epoch_ms(moment):
+    return int(moment.replace(tzinfo=timezone.utc).timestamp() * 1000)
+
+
+def _track_python(rng, lat, lng, start_time, duration_s, interval_s):
+    from src.routes.walks import calculate_route_distance
+    heading = rng.uniform(0, 2 * math.pi)
+    speed = max(rng.gauss(WALKING_SPEED_MS, 0.2), 0.6)
+    start_ms = _epoch_ms(start_time)
+    points = []
+    pause = 0
+    for step in range(int(duration_s // interval_s) + 1):
+        if step:
+            if pause > 0:
+                pause -= interval_s
+            elif rng.random() < PAUSE_PROBABILITY:
+                pause = rng.randint(*PAUSE_SECONDS)  # parada para cheirar
+            else:
+                heading += rng.gauss(0, HEADING_SD)
+                if rng.random() < TURN_PROBABILITY:
+                    heading += rng.choice((-1, 1)) * math.pi / 2  # virou a esquina
+                meters = speed * interval_s
+                lat += meters * math.cos(heading) / METERS_PER_DEGREE
+                lng += meters * math.sin(heading) / (METERS_PER_DEGREE * math.cos(math.radians(lat)))
+        noise_lat = rng.gauss(0, GPS_NOISE_M) / METERS_PER_DEGREE
+        noise_lng = rng.gauss(0, GPS_NOISE_M) / (METERS_PER_DEGREE * math.cos(math.radians(lat)))
+        points.append({'lat': round(lat + noise_lat, 6), 'lng': round(lng + noise_lng, 6),
+                       'timestamp': start_ms + step * interval_s * 1000})
+    return points, calculate_route_distance(points)
+
+
+def _track_numpy(rng, lat, lng, start_time, duration_s, interval_s):
+    count = int(duration_s // interval_s) + 1
+    generator = np.random.default_rng(rng.getrandbits(64))
+    heading0 = rng.uniform(0, 2 * math.pi)
+    speed = max(rng.gauss(WALKING_SPEED_MS, 0.2), 0.6)
+
+    moving = np.ones(count, dtype=bool)
+    moving[0] = False
+    for step in np.flatnonzero(generator.random(count) < PAUSE_PROBABILITY):
+        if moving[step]:
+            moving[step:step + 1 + math.ceil(rng.randint(*PAUSE_SECONDS) / interval_s)] = False
+
+    turns = generator.normal(0, HEADING_SD, count)
+    turns += (generator.random(count) < TURN_PROBABILITY) * generator.choice((-1, 1), count) * (math.pi / 2)
+    heading = heading0 + np.cumsum(np.where(moving, turns, 0.0))
+    meters = np.where(moving, speed * interval_s, 0.0)
+    lats = lat + np.cumsum(meters * np.cos(heading)) / METERS_PER_DEGREE
+    lngs = lng + np.cumsum(meters * np.sin(heading) / (METERS_PER_DEGREE * np.cos(np.radians(lats))))
+    lats = np.round(lats + generator.normal(0, GPS_NOISE_M, count) / METERS_PER_DEGREE, 6)
+    lngs = np.round(lngs + generator.normal(0, GPS_NOISE_M, count)
+                    / (METERS_PER_DEGREE * np.cos(np.radians(lats))), 6)
+
+    # Haversine entre pontos consecutivos (mesma conta do calculate_distance)
+    lat_rad, lng_rad = np.radians(lats), np.radians(lngs)
+    a = np.sin(np.diff(lat_rad) / 2) ** 2 \
+        + np.cos(lat_rad[:-1]) * np.cos(lat_rad[1:]) * np.sin(np.diff(lng_rad) / 2) ** 2
+    distance = float((EARTH_RADIUS_M * 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))).sum())
+
+    start_ms = _epoch_ms(start_time)
+    points = [{'lat': point_lat, 'lng': point_lng, 'timestamp': start_ms + step * interval_s * 1000}
+              for step, (point_lat, point_lng) in enumerate(zip(lats.tolist(), lngs.tolist()))]
+    return points, distance
+
+
+def generate_track(rng, lat, lng, start_time, duration_s, interval_s=5):
+    """
+    Percurso de caminhada com cachorro a partir de (lat, lng), timestamps em epoch ms.
+    Retorna (pontos [{'lat', 'lng', 'timestamp'}], distância da rota em metros, como
+    a finalização calcula). Usa numpy quando instalado.
+    """
+    track = _track_numpy if np is not None else _track_python
+    return track(rng, lat, lng, start_time, duration_s, interval_s)
+
+
+class SyntheticData:
+    """
+    Gera e grava dados sintéticos. Uso:
+        generator = SyntheticData(seed=1)
+        owners = generator.add_users(10000)
+        generator.add_walks(1000000, owners)
+    Precisa de app_context. add_* fazem commit a cada lote.
+    """
+
+    def __init__(self, seed=42, days=180, route_ratio=0.1, center=DEFAULT_CENTER, radius_km=15,
+                 chunk_size=10000, track_interval=5, password=DEFAULT_PASSWORD, now=None):
+        self.rng = random.Random(seed)
+        self.days = days
+        self.route_ratio = route_ratio
+        self.center = center
+        self.radius_km = radius_km
+        self.chunk_size = chunk_size
+        self.track_interval = track_interval
+        self.now = now or datetime.utcnow()
+        self._password_hash = self._hash(password)
+        self._first_walk_badge_id = None
+
+    @staticmethod
+    def _hash(password):
+        # Um hash só para todos os usuários (o hash por usuário dominaria o tempo de carga)
+        probe = User(email='')
+        probe.set_password(password)
+        return probe.password_hash
+
+    @staticmethod
+    def _next_id(model):
+        return (db.session.query(db.func.max(model.id)).scalar() or 0) + 1
+
+    def _home(self):
+        # Uniforme no disco de raio radius_km
+        distance = self.radius_km * 1000 * math.sqrt(self.rng.random())
+        angle = self.rng.uniform(0, 2 * math.pi)
+        lat = self.center[0] + distance * math.cos(angle) / METERS_PER_DEGREE
+        lng = self.center[1] + distance * math.sin(angle) / (METERS_PER_DEGREE * math.cos(math.radians(lat)))
+        return lat, lng
+
+    def _start_time(self):
+        # Mais passeios nos dias recentes; hora local em torno dos picos da manhã e do fim da tarde
+        days_ago = int(self.days * (1 - math.sqrt(self.rng.random())))
+        hour, spread, _ = PEAK_HOURS[0] if self.rng.random() < PEAK_HOURS[0][2] else PEAK_HOURS[1]
+        local_hour = self.rng.gauss(hour, spread)
+        while not 5 <= local_hour < 23:  # ninguém passeia de madrugada
+            local_hour = self.rng.gauss(hour, spread)
+        day = (self.now - timedelta(days=days_ago)).replace(hour=0, minute=0, second=0, microsecond=0)
+        start = day + timedelta(hours=local_hour + UTC_OFFSET_HOURS)
+        return min(start, self.now - timedelta(hours=1))
+
+    def _duration(self):
+        return int(min(max(self.rng.lognormvariate(math.log(1500), 0.45), 300), 3 * 3600))
+
+    def add_users(self, count, max_pets=3):
+        """
+        Cria 'count' usuários com 1 a max_pets pets. Retorna os donos
+        [(user_id, [pet_ids], (lat, lng) de casa, peso de atividade)] para add_walks.
+        """
+        next_user, next_pet = self._next_id(User), self._next_id(Pet)
+        owners = []
+        for start in range(0, count, self.chunk_size):
+            users, pets = [], []
+            for user_id in range(next_user + start, next_user + min(start + self.chunk_size, count)):
+                users.append({'id': user_id, 'email': email_for(user_id), 'name': f'Usuário {user_id}',
+                              'password_hash': self._password_hash, 'role': 'user', 'total_points': 0,
+                              'created_at': self.now - timedelta(days=self.days)})
+                pet_ids = []
+                weights = PET_COUNT_WEIGHTS[:max(max_pets, 1)]
+                pet_count = self.rng.choices(range(1, len(weights) + 1), weights)[0]
+                for _ in range(pet_count):
+                    pets.append({'id': next_pet, 'name': f'Pet {next_pet}', 'breed': 'SRD',
+                                 'owner_id': user_id, 'created_at': users[-1]['created_at']})
+                    pet_ids.append(next_pet)
+                    next_pet += 1
+                owners.append((user_id, pet_ids, self._home(), self.rng.paretovariate(1.5)))
+            db.session.execute(insert(User), users)
+            db.session.execute(insert(Pet), pets)
+            db.session.commit()
+        return owners
+
+    def _walk_row(self, owner):
+        user_id, pet_ids, (home_lat, home_lng), _ = owner
+        start = self._start_time()
+        duration = self._duration()
+        # Começa perto de casa (até ~300 m)
+        lat = home_lat + self.rng.uniform(-300, 300) / METERS_PER_DEGREE
+        lng = home_lng + self.rng.uniform(-300, 300) / METERS_PER_DEGREE
+
+        route = route_data = None
+        if self.rng.random() < self.route_ratio:
+            route, distance = generate_track(self.rng, lat, lng, start, duration, self.track_interval)
+            route_data = orjson.dumps(route).decode() if orjson else json.dumps(route, separators=(',', ':'))
+        else:
+            # Sem rota gravada: distância da velocidade média descontando as paradas
+            distance = duration * max(self.rng.gauss(WALKING_SPEED_MS, 0.2), 0.6) * self.rng.uniform(0.75, 0.95)
+        return {
+            'start_time': start, 'end_time': start + timedelta(seconds=duration),
+            'duration': duration, 'distance': distance, 'route': route, 'route_data': route_data,
+            'user_id': user_id, 'pet_id': self.rng.choice(pet_ids), 'created_at': start,
+            'start_lat': lat, 'start_lng': lng
+        }
+
+    def add_walks(self, count, owners):
+        """
+        Cria 'count' passeios finalizados distribuídos entre 'owners' (pelo peso de
+        atividade), com métricas, célula de início, entradas no livro de pontos,
+        User.total_points e o badge de primeiro passeio. Retorna quantos foram criados.
+        """
+        from src.routes.walks import calculate_calories, calculate_points
+        from src.services.walk_analytics import compute_walk_analytics, dumps_analytics
+        from src.services.points import WALK_FINISHED
+        from src.utils.geohash import encode, route_start_cell
+
+        if not owners or count <= 0:
+            return 0
+        if self._first_walk_badge_id is None:
+            self._first_walk_badge_id = db.session.query(Badge.id)\
+                                                  .filter_by(condition_type='first_walk').scalar() or 0
+        cumulative = list(accumulate(weight for *_, weight in owners))
+        # Quem já tinha o badge de primeiro passeio (vale para bases que crescem)
+        badged = {user_id for (user_id,) in db.session.query(UserBadge.user_id)
+                  .filter_by(badge_id=self._first_walk_badge_id)}
+        next_walk = self._next_id(Walk)
+
+        for start in range(0, count, self.chunk_size):
+            walks, ledger, badges = [], [], []
+            points_by_user = {}
+            for walk_id in range(next_walk + start, next_walk + min(start + self.chunk_size, count)):
+                owner = owners[bisect_right(cumulative, self.rng.random() * cumulative[-1])]
+                row = self._walk_row(owner)
+                distance, duration = row['distance'], row['duration']
+                points = calculate_points(distance, duration)
+                # Com percurso: análise e calorias por trecho, como na finalização
+                analytics = row['route'] and compute_walk_analytics(row['route'], row['start_time'], row['end_time'])
+                walks.append({
+                    'id': walk_id, 'start_time': row['start_time'], 'end_time': row['end_time'],
+                    'duration': duration, 'distance': distance,
+                    'calories': analytics['calories'] if analytics else calculate_calories(distance, duration),
+                    'average_pace': (duration / 60) / (distance / 1000) if distance else None,
+                    'route_data': row['route_data'], 'analytics': dumps_analytics(analytics),
+                    'points_earned': points,
+                    'user_id': row['user_id'], 'pet_id': row['pet_id'], 'created_at': row['created_at'],
+                    'start_cell': route_start_cell(row['route']) if row['route']
+                    else encode(row['start_lat'], row['start_lng']),
+                    'heatmap_indexed': False, 'last_flushed_seq': 0
+                })
+                ledger.append({'user_id': row['user_id'], 'walk_id': walk_id, 'delta': points,
+                               'reason': WALK_FINISHED, 'created_at': row['end_time']})
+                points_by_user[row['user_id']] = points_by_user.get(row['user_id'], 0) + points
+                if self._first_walk_badge_id and row['user_id'] not in badged:
+                    badged.add(row['user_id'])
+                    badges.append({'user_id': row['user_id'], 'badge_id': self._first_walk_badge_id,
+                                   'earned_at': row['end_time']})
+
+            db.session.execute(insert(Walk), walks)
+            db.session.execute(insert(PointsEntry), ledger)
+            if badges:
+                db.session.execute(insert(UserBadge), badges)
+            # Saldo com UPDATE atômico, um executemany por lote
+            db.session.execute(
+                update(User.__table__)
+                .where(User.__table__.c.id == bindparam('user_id_'))
+                .values(total_points=User.__table__.c.total_points + bindparam('points_')),
+                [{'user_id_': user_id, 'points_': points} for user_id, points in points_by_user.items()]
+            )
+            db.session.commit()
+        return count
+
+    def generate(self, users, walks, on_progress=None):
+        """Cria 'users' usuários e 'walks' passeios entre eles. Retorna os donos criados."""
+        owners = self.add_users(users)
+        done = 0
+        while done < walks:
+            batch = min(self.chunk_size * 10, walks - done)
+            done += self.add_walks(batch, owners)
+            if on_progress:
+                on_progress(done)
+        return owners
@@ -0,0 +1,78 @@
+# Em: backend/walkie_backend/src/utils/time_windows.py
+# (Arquivo Novo)
+#
+# Converte "hoje", "esta semana" e "este mês" no fuso do usuário em intervalos
+# UTC semiabertos [início, fim) para comparar direto com as colunas em UTC
+# (ex: Walk.created_at), sem envolver a coluna em funções e perdendo o índice.
+
+import os
+from datetime import datetime, time, timedelta, timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+DEFAULT_TIMEZONE = os.getenv('DEFAULT_TIMEZONE', 'America/Sao_Paulo')
+
+
+def is_valid_timezone(name):
+    try:
+        ZoneInfo(name)
+        return True
+    except (ZoneInfoNotFoundError, ValueError, TypeError):
+        return False
+
+
+def get_zone(name=None):
+    """Retorna o ZoneInfo do fuso informado (ou o padrão, se vazio/inválido)."""
+    if name and is_valid_timezone(name):
+        return ZoneInfo(name)
+    return ZoneInfo(DEFAULT_TIMEZONE)
+
+
+def user_zone(user):
+    return get_zone(getattr(user, 'timezone', None))
+
+
+def _to_utc_naive(local_dt):
+    return local_dt.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def local_today(zone, now=None):
+    """Data de hoje no fuso 'zone'. 'now' é um datetime UTC sem tzinfo (como as colunas)."""
+    now = now or datetime.utcnow()
+    return now.replace(tzinfo=timezone.utc).astimezone(zone).date()
+
+
+def to_local_date(utc_naive, zone):
+    """Data local de um datetime UTC sem tzinfo."""
+    return utc_naive.replace(tzinfo=timezone.utc).astimezone(zone).date()
+
+
+def local_date_range(zone, first_day, last_day):
+    """Intervalo UTC [início de first_day, início do dia seguinte a last_day) no fuso 'zone'."""
+    start = datetime.combine(first_day, time.min, tzinfo=zone)
+    end = datetime.combine(last_day + timedelta(days=1), time.min, tzinfo=zone)
+    return _to_utc_naive(start), _to_utc_naive(end)
+
+
+def day_range(zone, day=None):
+    day = day or local_today(zone)
+    return local_date_range(zone, day, day)
+
+
+def week_range(zone, day=None):
+    """Semana local de segunda a domingo que contém 'day'."""
+    day = day or local_today(zone)
+    monday = day - timedelta(days=day.weekday())
+    return local_date_range(zone, monday, monday + timedelta(days=6))
+
+
+def month_range(zone, day=None):
+    day = day or local_today(zone)
+    first = day.replace(day=1)
+    next_month = (first + timedelta(days=32)).replace(day=1)
+    return local_date_range(zone, first, next_month - timedelta(days=1))
+
+
+def in_range(column, window):
+    """Filtro sargável 'início <= coluna < fim' para um intervalo (início, fim)."""
+    start, end = window
+    return (column >= start) & (column < end)
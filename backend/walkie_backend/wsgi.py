@@ -0,0 +1,8 @@
+# Arquivo: backend/walkie_backend/wsgi.py
+# Ponto de entrada WSGI de produção (o app.run de src/main.py é só para desenvolvimento):
+#   cd backend/walkie_backend
+#   gunicorn -c gunicorn.conf.py wsgi:app
+# Workers, threads e demais opções ficam em gunicorn.conf.py (variáveis GUNICORN_*).
+from src.main import app
+
+application = app